@@ -12,6 +12,12 @@ import pandas as pd
 import matplotlib.pyplot as plt 
 import utils 
 import doctest
+from cubo import consulta_cubo
+from grupos_medicamentos import GRUPOS_DE_MEDICAMENTOS
+from consulta import Consulta
+
+# Princípios ativos separados pela função dataframe_de_zolpidem.
+PRINCIPIOS_ATIVOS_ZOLPIDEM = GRUPOS_DE_MEDICAMENTOS["ZOLPIDEM"]
 
 def dataframe_de_zolpidem(dataframe_selecionado: pd.DataFrame) -> pd.DataFrame:
     """
@@ -30,7 +36,7 @@ def dataframe_de_zolpidem(dataframe_selecionado: pd.DataFrame) -> pd.DataFrame:
 
     Examples
     ----------
-    # >>> dataframe_de_zolpidem(utils.concat_data_by_dates("2014/01", "2020/12", filtered_columns = ["ANO_VENDA", "PRINCIPIO_ATIVO"]))
+    # >>> dataframe_de_zolpidem(utils.concat_data_by_dates("2014/01", "2020/12", filtered_columns = ["ANO_VENDA", "PRINCIPIO_ATIVO"], where={"PRINCIPIO_ATIVO": PRINCIPIOS_ATIVOS_ZOLPIDEM}))
 
     Tests
     ----------
@@ -40,6 +46,13 @@ def dataframe_de_zolpidem(dataframe_selecionado: pd.DataFrame) -> pd.DataFrame:
     >>> dataframe_de_zolpidem(pd.DataFrame())  
     O dataframe não contém a coluna PRINCIPIO_ATIVO.
 
+    >>> dataframe_de_zolpidem(pd.DataFrame({"ANO_VENDA": [2016, 2015, None, 2014, 2015, 2014],
+    ...                                     "PRINCIPIO_ATIVO": ["ZOLPIDEM"] * 5 + ["DIAZEPAM"]}))
+       ANO_VENDA  REMÉDIO_VENDIDO
+    0     2015.0                2
+    1     2014.0                1
+    2     2016.0                1
+
     """
 
     # Validação do dataframe
@@ -51,8 +64,15 @@ def dataframe_de_zolpidem(dataframe_selecionado: pd.DataFrame) -> pd.DataFrame:
 
     else:
         try:
-            df_hemitartarato_de_zolpidem = (dataframe_selecionado[dataframe_selecionado["PRINCIPIO_ATIVO"] == "HEMITARTARATO DE ZOLPIDEM"]).reset_index(drop=True)
-            df_zolpidem = (dataframe_selecionado[dataframe_selecionado["PRINCIPIO_ATIVO"] == "ZOLPIDEM"]).reset_index(drop=True)
+            if "PRINCIPIO_ATIVO" not in dataframe_selecionado.columns:
+                raise KeyError
+            # Filtro do Zolpidem e contagem por ano em uma única consulta, sem copiar as linhas filtradas.
+            # Cada linha é uma venda de zolpidem.
+            df_venda_por_ano = (Consulta.do_dataframe(dataframe_selecionado)
+                                .where({"PRINCIPIO_ATIVO": PRINCIPIOS_ATIVOS_ZOLPIDEM})
+                                .agrupa_por("ANO_VENDA")
+                                .conta("REMÉDIO_VENDIDO")
+                                .executa())
 
         except KeyError:
             print("O dataframe não contém a coluna PRINCIPIO_ATIVO.") 
@@ -60,22 +80,48 @@ def dataframe_de_zolpidem(dataframe_selecionado: pd.DataFrame) -> pd.DataFrame:
              print("Outro erro encontrado!", err) 
 
         else:
-            # Gerando o dataframe que contém apenas o Zolpidem
+            if df_venda_por_ano is None:
+                return None
 
-            df = pd.concat([df_hemitartarato_de_zolpidem, df_zolpidem]).reset_index()
+            # As vendas sem ano não são contadas, como no groupby por ANO_VENDA.
+            df_venda_por_ano = df_venda_por_ano[df_venda_por_ano["ANO_VENDA"].notna()]
+            # Os anos com o mesmo número de vendas ficam em ordem crescente.
+            df_venda_por_ano = df_venda_por_ano.sort_values("ANO_VENDA")
+            return df_venda_por_ano.sort_values("REMÉDIO_VENDIDO", ascending = False, kind="stable").reset_index(drop=True)
+
+def vendas_de_zolpidem_do_cubo(path: str = "dados") -> pd.DataFrame:
+    """
+    Consulta no cubo de agregados (módulo cubo) a quantidade de vendas do Zolpidem por ano, no mesmo
+    formato retornado pela função dataframe_de_zolpidem, sem ler os dados brutos.
+
+    Parameters
+    ----------
+    path: str
+        Pasta dos dados, onde o cubo está salvo.
 
-            # Contagem por ano
+    Returns
+    ----------
+    df_venda_por_ano: pd.DataFrame
+        Dataframe das quantidades vendidas por ano, ou None caso o cubo não exista.
 
-            df["REMÉDIO_VENDIDO"] = df["PRINCIPIO_ATIVO"].replace({"HEMITARTARATO DE ZOLPIDEM": 1, "ZOLPIDEM": 1})
+    Tests
+    ----------
+    >>> vendas_de_zolpidem_do_cubo("PASTA_INEXISTENTE")
+    O cubo ainda não foi montado, tente montá-lo com a função constroi_cubo.
 
-            df_venda_por_ano = df.groupby("ANO_VENDA")["REMÉDIO_VENDIDO"].sum().sort_values(ascending = False).reset_index()
+    """
+    vendas = consulta_cubo(["ANO_VENDA"], where={"PRINCIPIO_ATIVO": PRINCIPIOS_ATIVOS_ZOLPIDEM}, path=path)
+    if vendas is None:
+        return None
 
-            return df_venda_por_ano
+    vendas = vendas.rename(columns={"VENDAS": "REMÉDIO_VENDIDO"})[["ANO_VENDA", "REMÉDIO_VENDIDO"]]
+    return vendas.sort_values("REMÉDIO_VENDIDO", ascending = False).reset_index(drop=True)
 
 def visualizacao_leonardo(dataframe_de_vendas_anuais: pd.DataFrame, caminho_pasta: str) -> pd.DataFrame:
     """
     A função recebe um dataframe que possui a quantidade de vendas do remédio Zolpidem por ano e retorna
-    um gráfico de linhas baseado no dataframe.
+    um gráfico de linhas baseado no dataframe. O dataframe pode ter os registros de venda, que são contados
+    pela função dataframe_de_zolpidem, ou as vendas já contadas, como as da função vendas_de_zolpidem_do_cubo.
 
     Parameters
     ----------
@@ -92,7 +138,10 @@ def visualizacao_leonardo(dataframe_de_vendas_anuais: pd.DataFrame, caminho_past
 
     """
 
-    df_venda_por_ano = dataframe_de_zolpidem(dataframe_de_vendas_anuais)  
+    if "REMÉDIO_VENDIDO" in dataframe_de_vendas_anuais.columns:
+        df_venda_por_ano = dataframe_de_vendas_anuais
+    else:
+        df_venda_por_ano = dataframe_de_zolpidem(dataframe_de_vendas_anuais)  
     
     # Construção do gráfico
 
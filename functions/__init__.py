@@ -5,3 +5,12 @@ from .Leonardo_vis import *
 from .matheus_vis import *
 from .luciano_vis import *
 from .sillas_vis import *
+from .cache_colunar import *
+from .esquema import *
+from .cubo import *
+from .derivados import *
+from .colunas_mapeadas import *
+from .dicionarios import *
+from .catalogo import *
+from .grupos_medicamentos import *
+from .consulta import *
\ No newline at end of file
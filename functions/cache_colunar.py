@@ -0,0 +1,694 @@
+"""Módulo que mantém um cache colunar (Parquet) dos arquivos mensais da pasta de dados.
+
+Cada arquivo "Manipulados_AAAA_mm.csv" é convertido uma única vez em um arquivo Parquet tipado e comprimido,
+salvo em uma estrutura particionada por ano e mês ("parquet/ano=AAAA/mes=mm/Manipulados.parquet").
+As colunas de texto com muitos valores são salvas com os códigos dos dicionários globais (módulo dicionarios),
+então todos os meses do cache têm as mesmas categorias.
+Junto de cada mês é salvo um índice ("Manipulados.indice.json") que relaciona cada princípio ativo e cada DCB
+aos grupos de linhas do arquivo Parquet em que aparecem, assim as leituras filtradas por essas colunas
+leem apenas os grupos que podem ter as linhas procuradas.
+Opcionalmente, cada mês também pode ser particionado por estado ("parquet/ano=AAAA/mes=mm/uf=SP/Manipulados.parquet"),
+e as leituras filtradas por UF_VENDA leem apenas as partições dos estados procurados.
+A função "concat_data_by_dates" do módulo utils lê desse cache sempre que ele existe, evitando
+interpretar novamente os csv a cada execução.
+"""
+
+import sys, os
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(esse_caminho)
+
+import json
+import numpy as np
+import pandas as pd
+import doctest
+from get_data import get_dates_between_dates, caminho_do_mes, ENCODING_DOS_DADOS
+from esquema import aplica_esquema, concatena_com_esquema, dtypes_de_leitura
+from dicionarios import atualiza_dicionarios, aplica_dicionarios
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+# Pasta do cache, dentro da pasta dos dados.
+PASTA_CACHE = "parquet"
+
+# Número de linhas de cada bloco nas leituras em blocos, do cache ou dos csv.
+TAMANHO_DO_BLOCO = 200_000
+
+# Número de linhas de cada grupo de linhas dos arquivos Parquet, a menor parte de um mês que pode ser lida sozinha.
+LINHAS_POR_GRUPO = 50_000
+
+# Colunas indexadas pelos grupos de linhas em que cada valor aparece.
+COLUNAS_INDEXADAS = ["PRINCIPIO_ATIVO", "DCB"]
+
+# Nome da partição das linhas sem UF, o mesmo usado pelo Hive.
+UF_NULA = "__HIVE_DEFAULT_PARTITION__"
+
+
+def caminho_cache_mes(ano:str, mes:str, path:str = "dados", file_names:str = "Manipulados") -> str:
+    """Retorna o caminho do arquivo do cache de um mês.
+
+    Parameters
+    ----------
+    ano : str
+        O ano do arquivo, ex: "2014".
+    mes : str
+        O mês do arquivo com dois dígitos, ex: "01".
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    str
+        O caminho do arquivo Parquet do mês.
+
+    Test
+    ----------
+    >>> caminho_cache_mes("2014", "01", "dados").replace(os.sep, "/")
+    'dados/parquet/ano=2014/mes=01/Manipulados.parquet'
+    """
+    return os.path.join(path, PASTA_CACHE, f"ano={ano}", f"mes={mes}", f"{file_names}.parquet")
+
+
+def cache_atualizado(ano:str, mes:str, path:str = "dados", file_names:str = "Manipulados") -> bool:
+    """Verifica se o mês está no cache colunar e se o cache é mais recente que o csv do mês.
+
+    Um csv alterado depois da conversão (baixado ou normalizado de novo) deixa o cache desatualizado,
+    e os leitores do cache voltam a ler o csv até que o mês seja convertido novamente.
+
+    Parameters
+    ----------
+    ano : str
+        O ano do arquivo, ex: "2014".
+    mes : str
+        O mês do arquivo com dois dígitos, ex: "01".
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    bool
+        True caso o cache do mês exista e possa ser lido, mesmo sem o csv do mês.
+
+    Test
+    ----------
+    >>> cache_atualizado("2014", "01", "PASTA_INEXISTENTE")
+    False
+    """
+    caminho_arquivo = caminho_cache_mes(ano, mes, path, file_names)
+    if pq == None or not os.path.isfile(caminho_arquivo):
+        return False
+    caminho_csv = caminho_do_mes(path, ano, mes, file_names)
+    return not os.path.isfile(caminho_csv) or os.path.getmtime(caminho_arquivo) >= os.path.getmtime(caminho_csv)
+
+
+def le_mes_do_cache(ano:str, mes:str, path:str = "dados", file_names:str = "Manipulados", colunas:list = None) -> pd.DataFrame:
+    """Lê o mês do cache colunar, caso ele exista.
+
+    Parameters
+    ----------
+    ano : str
+        O ano do arquivo, ex: "2014".
+    mes : str
+        O mês do arquivo com dois dígitos, ex: "01".
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+    colunas : list, optional
+        As colunas a serem lidas, caso None todas são lidas, by default None
+
+    Returns
+    -------
+    pd.DataFrame
+        O dataframe do mês, ou None caso o mês não esteja no cache, o cache esteja desatualizado
+        ou o pyarrow não esteja instalado.
+
+    Test
+    ----------
+    >>> le_mes_do_cache("2014", "01", "PASTA_INEXISTENTE") is None
+    True
+    """
+    caminho_arquivo = caminho_cache_mes(ano, mes, path, file_names)
+    if not cache_atualizado(ano, mes, path, file_names):
+        return None
+    return aplica_dicionarios(pq.read_table(caminho_arquivo, columns=colunas).to_pandas(), path, file_names)
+
+
+def blocos_do_cache(ano:str, mes:str, path:str = "dados", file_names:str = "Manipulados", colunas:list = None,
+                    tamanho_do_bloco:int = TAMANHO_DO_BLOCO, grupos:list = None, ufs:list = None):
+    """Lê o mês do cache colunar em blocos de linhas, sem montar o mês inteiro em um único dataframe.
+
+    O índice de cada bloco é a posição das suas linhas dentro do mês, como na leitura do csv em blocos,
+    mesmo quando apenas alguns grupos de linhas são lidos.
+    Com "ufs" e o mês particionado por estado (função particiona_por_uf), apenas as partições dos estados
+    pedidos são lidas, e as suas linhas são devolvidas na ordem original do mês.
+
+    Parameters
+    ----------
+    ano : str
+        O ano do arquivo, ex: "2014".
+    mes : str
+        O mês do arquivo com dois dígitos, ex: "01".
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+    colunas : list, optional
+        As colunas a serem lidas, caso None todas são lidas, by default None
+    tamanho_do_bloco : int, optional
+        Número máximo de linhas de cada bloco, by default TAMANHO_DO_BLOCO
+    grupos : list, optional
+        Os grupos de linhas a serem lidos, como retornados por "grupos_do_indice", caso None todos são lidos, by default None
+    ufs : list, optional
+        Os estados a serem lidos, usados apenas quando o mês está particionado por estado, by default None
+
+    Returns
+    -------
+    Generator[pd.DataFrame]
+        Um gerador dos blocos do mês, ou None caso o mês não esteja no cache ou o cache esteja desatualizado.
+
+    Test
+    ----------
+    >>> blocos_do_cache("2014", "01", "PASTA_INEXISTENTE") is None
+    True
+    """
+    particoes = particoes_uf(ano, mes, path, file_names) if ufs != None else {}
+    if particoes != {}:
+        return _blocos_das_particoes(particoes, ufs, path, file_names, colunas, tamanho_do_bloco)
+
+    caminho_arquivo = caminho_cache_mes(ano, mes, path, file_names)
+    if not cache_atualizado(ano, mes, path, file_names):
+        return None
+
+    def gera_blocos():
+        arquivo = pq.ParquetFile(caminho_arquivo)
+        if grupos == None:
+            inicio = 0
+            for lote in arquivo.iter_batches(batch_size=tamanho_do_bloco, columns=colunas):
+                bloco = aplica_dicionarios(lote.to_pandas(), path, file_names)
+                bloco.index = pd.RangeIndex(inicio, inicio + len(bloco))
+                inicio += len(bloco)
+                yield bloco
+            return
+
+        # Cada grupo é lido separadamente, a partir da posição da sua primeira linha no mês.
+        inicios = np.cumsum([0] + [arquivo.metadata.row_group(grupo).num_rows for grupo in range(arquivo.num_row_groups)])
+        for grupo in grupos:
+            inicio = int(inicios[grupo])
+            for lote in arquivo.iter_batches(batch_size=tamanho_do_bloco, row_groups=[grupo], columns=colunas):
+                bloco = aplica_dicionarios(lote.to_pandas(), path, file_names)
+                bloco.index = pd.RangeIndex(inicio, inicio + len(bloco))
+                inicio += len(bloco)
+                yield bloco
+
+    return gera_blocos()
+
+
+def caminho_indice_mes(ano:str, mes:str, path:str = "dados", file_names:str = "Manipulados") -> str:
+    """Retorna o caminho do índice de um mês do cache.
+
+    Parameters
+    ----------
+    ano : str
+        O ano do arquivo, ex: "2014".
+    mes : str
+        O mês do arquivo com dois dígitos, ex: "01".
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    str
+        O caminho do índice do mês.
+
+    Test
+    ----------
+    >>> caminho_indice_mes("2014", "01", "dados").replace(os.sep, "/")
+    'dados/parquet/ano=2014/mes=01/Manipulados.indice.json'
+    """
+    return os.path.join(path, PASTA_CACHE, f"ano={ano}", f"mes={mes}", f"{file_names}.indice.json")
+
+
+def _monta_indice(dados:pd.DataFrame, linhas_por_grupo:int = LINHAS_POR_GRUPO) -> dict:
+    """Relaciona cada valor das colunas indexadas aos grupos de linhas em que ele aparece.
+
+    Parameters
+    ----------
+    dados : pd.DataFrame
+        O dataframe do mês, na ordem em que será salvo.
+    linhas_por_grupo : int, optional
+        O número de linhas de cada grupo, by default LINHAS_POR_GRUPO
+
+    Returns
+    -------
+    dict
+        O índice, com o número de linhas, o de linhas por grupo e, para cada coluna indexada,
+        um dicionário de cada valor para a lista dos seus grupos.
+
+    Test
+    ----------
+    >>> dados = pd.DataFrame({"PRINCIPIO_ATIVO": ["ZOLPIDEM", "CLOROQUINA", "ZOLPIDEM", None]})
+    >>> _monta_indice(dados, 2)["colunas"]
+    {'PRINCIPIO_ATIVO': {'CLOROQUINA': [0], 'ZOLPIDEM': [0, 1]}}
+    """
+    indice = {"linhas": len(dados), "linhas_por_grupo": linhas_por_grupo, "colunas": {}}
+    grupo_de_cada_linha = np.arange(len(dados)) // linhas_por_grupo
+    numero_de_grupos = max(-(-len(dados) // linhas_por_grupo), 1)
+    for coluna in COLUNAS_INDEXADAS:
+        if coluna not in dados.columns:
+            continue
+        categorias = pd.Categorical(dados[coluna])
+        codigos = categorias.codes.astype(np.int64)
+        preenchidas = codigos >= 0
+        # Cada par (valor, grupo) distinto aparece uma única vez, já ordenado por valor e grupo.
+        pares = np.unique(codigos[preenchidas] * numero_de_grupos + grupo_de_cada_linha[preenchidas])
+        valores, grupos = np.divmod(pares, numero_de_grupos)
+        colunas = {}
+        for valor, grupo in zip(valores.tolist(), grupos.tolist()):
+            colunas.setdefault(str(categorias.categories[valor]), []).append(grupo)
+        indice["colunas"][coluna] = colunas
+    return indice
+
+
+def grupos_do_indice(ano:str, mes:str, where:dict, path:str = "dados", file_names:str = "Manipulados") -> list:
+    """Retorna os grupos de linhas do mês que podem ter linhas que satisfazem o predicado.
+
+    Apenas as colunas indexadas do predicado são usadas, as outras são verificadas depois da leitura.
+
+    Parameters
+    ----------
+    ano : str
+        O ano do arquivo, ex: "2014".
+    mes : str
+        O mês do arquivo com dois dígitos, ex: "01".
+    where : dict
+        O valor (ou lista de valores) aceito em cada coluna, ex: {"PRINCIPIO_ATIVO": ["ZOLPIDEM"]}.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    list
+        Os grupos de linhas em ordem, ou None caso o índice não possa ser usado (mês sem índice,
+        índice desatualizado ou nenhuma coluna indexada no predicado).
+
+    Test
+    ----------
+    >>> grupos_do_indice("2014", "01", {"PRINCIPIO_ATIVO": "ZOLPIDEM"}, "PASTA_INEXISTENTE") is None
+    True
+    """
+    # Intervalos e condições que aceitam nulos não podem ser respondidos pelo índice.
+    colunas_usadas = [coluna for coluna in where if coluna in COLUNAS_INDEXADAS and type(where[coluna]) != tuple
+                      and where[coluna] is not None and not (isinstance(where[coluna], (list, set, frozenset)) and None in where[coluna])]
+    caminho_indice = caminho_indice_mes(ano, mes, path, file_names)
+    if colunas_usadas == [] or not os.path.isfile(caminho_indice) or not cache_atualizado(ano, mes, path, file_names):
+        return None
+
+    try:
+        with open(caminho_indice, "r", encoding="utf-8") as arquivo:
+            indice = json.load(arquivo)
+        # O índice só vale para o arquivo Parquet com o mesmo número de linhas e de grupos.
+        metadados = pq.read_metadata(caminho_cache_mes(ano, mes, path, file_names))
+        numero_de_grupos = -(-indice["linhas"] // indice["linhas_por_grupo"])
+        if metadados.num_rows != indice["linhas"] or metadados.num_row_groups != numero_de_grupos:
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+
+    grupos = None
+    for coluna in colunas_usadas:
+        valores = where[coluna]
+        if not isinstance(valores, (list, set, frozenset)):
+            valores = [valores]
+        grupos_da_coluna = set()
+        for valor in valores:
+            grupos_da_coluna.update(indice["colunas"][coluna].get(str(valor), []))
+        grupos = grupos_da_coluna if grupos == None else grupos & grupos_da_coluna
+    return sorted(grupos)
+
+
+def constroi_indice(ano:str, mes:str, path:str = "dados", file_names:str = "Manipulados") -> str:
+    """Constrói o índice de um mês que já está no cache, lendo apenas as colunas indexadas.
+
+    Os meses convertidos por "converte_para_parquet" já têm o índice, esta função serve para os
+    meses convertidos antes dele existir.
+
+    Parameters
+    ----------
+    ano : str
+        O ano do arquivo, ex: "2014".
+    mes : str
+        O mês do arquivo com dois dígitos, ex: "01".
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    str
+        O caminho do índice criado, ou None caso o mês não esteja no cache.
+
+    Test
+    ----------
+    >>> constroi_indice("2014", "01", "PASTA_INEXISTENTE") is None
+    True
+    """
+    caminho_arquivo = caminho_cache_mes(ano, mes, path, file_names)
+    if pq == None or not os.path.isfile(caminho_arquivo):
+        return None
+
+    arquivo = pq.ParquetFile(caminho_arquivo)
+    colunas = [coluna for coluna in COLUNAS_INDEXADAS if coluna in arquivo.schema_arrow.names]
+    dados = arquivo.read(columns=colunas).to_pandas()
+    # Os grupos já gravados no arquivo definem o número de linhas por grupo.
+    linhas_por_grupo = arquivo.metadata.row_group(0).num_rows if arquivo.num_row_groups > 1 else max(len(dados), 1)
+    return _salva_indice(_monta_indice(dados, linhas_por_grupo), caminho_indice_mes(ano, mes, path, file_names))
+
+
+def _salva_indice(indice:dict, caminho_indice:str) -> str:
+    """Salva o índice em um arquivo temporário e o troca pelo definitivo, para que um índice incompleto nunca seja lido.
+
+    Parameters
+    ----------
+    indice : dict
+        O índice montado por "_monta_indice".
+    caminho_indice : str
+        O caminho do índice.
+
+    Returns
+    -------
+    str
+        O caminho do índice.
+    """
+    with open(caminho_indice + ".tmp", "w", encoding="utf-8") as arquivo:
+        json.dump(indice, arquivo, ensure_ascii=False)
+    os.replace(caminho_indice + ".tmp", caminho_indice)
+    return caminho_indice
+
+
+def colunas_do_cache(ano:str, mes:str, path:str = "dados", file_names:str = "Manipulados") -> list:
+    """Retorna as colunas do mês salvo no cache colunar, lendo apenas os metadados do arquivo.
+
+    Parameters
+    ----------
+    ano : str
+        O ano do arquivo, ex: "2014".
+    mes : str
+        O mês do arquivo com dois dígitos, ex: "01".
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    list
+        A lista de colunas, ou None caso o mês não esteja no cache ou o cache esteja desatualizado.
+
+    Test
+    ----------
+    >>> colunas_do_cache("2014", "01", "PASTA_INEXISTENTE") is None
+    True
+    """
+    caminho_arquivo = caminho_cache_mes(ano, mes, path, file_names)
+    if not cache_atualizado(ano, mes, path, file_names):
+        return None
+    return pq.read_schema(caminho_arquivo).names
+
+
+def converte_para_parquet(data_inicial:str, data_final:str, path:str = "dados", file_names:str = "Manipulados",
+                          compressao:str = "zstd", sobrescrever:bool = False) -> list:
+    """Converte os csv mensais entre as datas dadas para o cache colunar.
+
+    Cada mês é lido uma única vez e salvo como Parquet comprimido, já com os tipos do esquema (módulo esquema)
+    e os códigos dos dicionários globais (módulo dicionarios), junto com o índice das colunas indexadas.
+    Meses cujo cache é mais recente que o csv são ignorados, a não ser que "sobrescrever" seja True.
+
+    Parameters
+    ----------
+    data_inicial : str
+        A data do primeiro mês a ser convertido.
+    data_final : str
+        A data do último mês a ser convertido.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+    compressao : str, optional
+        Compressão usada no Parquet, by default "zstd"
+    sobrescrever : bool, optional
+        Caso True, converte novamente os meses que já estão no cache, by default False
+
+    Returns
+    -------
+    list
+        Os caminhos dos arquivos do cache criados.
+
+    Test
+    ----------
+    >>> converte_para_parquet("2013/01", "2014/01")
+    Problemas com a primeira data inserida: 2013/01
+    Formato da data está incorreto ou ela não está entre Janeiro de 2014 e Novembro de 2021, tente inserir como ANO/mês, ex: '2015/05'.
+    []
+    """
+    convertidos = []
+    datas = get_dates_between_dates(data_inicial, data_final)
+    try:
+        if datas != [] and pq == None:
+            raise ImportError
+    except ImportError:
+        print("O cache colunar precisa da biblioteca pyarrow, tente instalá-la com 'pip install pyarrow'.")
+        return convertidos
+
+    for cada_data in datas:
+        ano, mes = cada_data[:4], cada_data[-2:]
+        caminho_csv = caminho_do_mes(path, ano, mes, file_names)
+        caminho_parquet = caminho_cache_mes(ano, mes, path, file_names)
+        try:
+            if not sobrescrever and os.path.isfile(caminho_parquet) and os.path.getmtime(caminho_parquet) >= os.path.getmtime(caminho_csv):
+                continue
+
+            dados = aplica_esquema(pd.read_csv(caminho_csv, delimiter=";", encoding=ENCODING_DOS_DADOS, dtype=dtypes_de_leitura(), low_memory=False))
+            # As colunas dicionarizadas são salvas com os códigos globais, iguais em todos os meses.
+            dados = atualiza_dicionarios(dados, path, file_names)
+            os.makedirs(os.path.dirname(caminho_parquet), exist_ok=True)
+            # Escreve em um arquivo temporário para que um cache incompleto nunca seja lido.
+            dados.to_parquet(caminho_parquet + ".tmp", engine="pyarrow", compression=compressao, index=False,
+                             row_group_size=LINHAS_POR_GRUPO)
+            os.replace(caminho_parquet + ".tmp", caminho_parquet)
+            _salva_indice(_monta_indice(dados, LINHAS_POR_GRUPO), caminho_indice_mes(ano, mes, path, file_names))
+            convertidos.append(caminho_parquet)
+
+        except Exception as err:
+            print(f"Não foi possível converter '{caminho_csv}' para o cache colunar.", err)
+
+    return convertidos
+
+
+def caminho_particao_uf(ano:str, mes:str, uf:str, path:str = "dados", file_names:str = "Manipulados") -> str:
+    """Retorna o caminho do arquivo da partição de um estado em um mês.
+
+    Parameters
+    ----------
+    ano : str
+        O ano do arquivo, ex: "2014".
+    mes : str
+        O mês do arquivo com dois dígitos, ex: "01".
+    uf : str
+        A sigla do estado, ou UF_NULA para as linhas sem estado.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    str
+        O caminho do arquivo Parquet da partição.
+
+    Test
+    ----------
+    >>> caminho_particao_uf("2020", "03", "SP", "dados").replace(os.sep, "/")
+    'dados/parquet/ano=2020/mes=03/uf=SP/Manipulados.parquet'
+    """
+    return os.path.join(path, PASTA_CACHE, f"ano={ano}", f"mes={mes}", f"uf={uf}", f"{file_names}.parquet")
+
+
+def _lista_particoes_uf(ano:str, mes:str, path:str = "dados", file_names:str = "Manipulados") -> dict:
+    """Lista as partições por estado salvas do mês, sem verificar se estão atualizadas.
+
+    Returns
+    -------
+    dict
+        O caminho da partição de cada estado.
+    """
+    pasta_mes = os.path.dirname(caminho_cache_mes(ano, mes, path, file_names))
+    if not os.path.isdir(pasta_mes):
+        return {}
+    particoes = {}
+    for nome in sorted(os.listdir(pasta_mes)):
+        uf = nome[len("uf="):]
+        if nome.startswith("uf=") and os.path.isfile(caminho_particao_uf(ano, mes, uf, path, file_names)):
+            particoes[uf] = caminho_particao_uf(ano, mes, uf, path, file_names)
+    return particoes
+
+
+def particoes_uf(ano:str, mes:str, path:str = "dados", file_names:str = "Manipulados") -> dict:
+    """Retorna as partições por estado do mês, caso elas existam e sejam mais recentes que o csv do mês.
+
+    Parameters
+    ----------
+    ano : str
+        O ano do arquivo, ex: "2014".
+    mes : str
+        O mês do arquivo com dois dígitos, ex: "01".
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    dict
+        O caminho da partição de cada estado, vazio caso o mês não esteja particionado ou as partições
+        estejam desatualizadas.
+
+    Test
+    ----------
+    >>> particoes_uf("2014", "01", "PASTA_INEXISTENTE")
+    {}
+    """
+    if pq == None:
+        return {}
+    particoes = _lista_particoes_uf(ano, mes, path, file_names)
+    caminho_csv = caminho_do_mes(path, ano, mes, file_names)
+    if particoes != {} and os.path.isfile(caminho_csv):
+        if min(os.path.getmtime(caminho) for caminho in particoes.values()) < os.path.getmtime(caminho_csv):
+            return {}
+    return particoes
+
+
+def _blocos_das_particoes(particoes:dict, ufs:list, path:str, file_names:str, colunas:list, tamanho_do_bloco:int):
+    """Lê as partições dos estados pedidos e as devolve em blocos, na ordem original das linhas do mês.
+
+    Cada partição guarda como índice a posição das suas linhas no mês, então as partições lidas são
+    concatenadas e reordenadas por esse índice.
+
+    Returns
+    -------
+    Generator[pd.DataFrame]
+        Um gerador dos blocos das partições.
+    """
+    nomes = [UF_NULA if uf is None or uf != uf else str(uf) for uf in ufs]
+    partes = [pq.read_table(particoes[nome], columns=colunas, use_pandas_metadata=True).to_pandas()
+              for nome in dict.fromkeys(nomes) if nome in particoes]
+    if partes == []:
+        return
+    dados = concatena_com_esquema(partes)
+    if len(partes) > 1:
+        dados = dados.sort_index(kind="stable")
+    dados = aplica_dicionarios(dados, path, file_names)
+    for inicio in range(0, len(dados), tamanho_do_bloco):
+        yield dados.iloc[inicio:inicio + tamanho_do_bloco]
+
+
+def particiona_por_uf(data_inicial:str, data_final:str, path:str = "dados", file_names:str = "Manipulados",
+                      compressao:str = "zstd", sobrescrever:bool = False) -> list:
+    """Particiona os meses entre as datas dadas por estado, salvando cada estado em uma pasta "uf=XX" do mês.
+
+    Cada mês é lido do cache colunar, ou do seu csv caso não esteja no cache, e as linhas de cada estado
+    são salvas com os tipos do esquema, os códigos dos dicionários globais e, como índice, a sua posição
+    no mês. Meses com partições mais recentes que o csv são ignorados, a não ser que "sobrescrever" seja True.
+
+    Parameters
+    ----------
+    data_inicial : str
+        A data do primeiro mês a ser particionado.
+    data_final : str
+        A data do último mês a ser particionado.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+    compressao : str, optional
+        Compressão usada no Parquet, by default "zstd"
+    sobrescrever : bool, optional
+        Caso True, particiona novamente os meses que já estão particionados, by default False
+
+    Returns
+    -------
+    list
+        Os caminhos das partições criadas.
+
+    Test
+    ----------
+    >>> particiona_por_uf("2013/01", "2014/01")
+    Problemas com a primeira data inserida: 2013/01
+    Formato da data está incorreto ou ela não está entre Janeiro de 2014 e Novembro de 2021, tente inserir como ANO/mês, ex: '2015/05'.
+    []
+    """
+    criadas = []
+    datas = get_dates_between_dates(data_inicial, data_final)
+    try:
+        if datas != [] and pq == None:
+            raise ImportError
+    except ImportError:
+        print("O cache colunar precisa da biblioteca pyarrow, tente instalá-la com 'pip install pyarrow'.")
+        return criadas
+
+    for cada_data in datas:
+        ano, mes = cada_data[:4], cada_data[-2:]
+        caminho_csv = caminho_do_mes(path, ano, mes, file_names)
+        try:
+            if not sobrescrever and particoes_uf(ano, mes, path, file_names) != {}:
+                continue
+
+            dados = le_mes_do_cache(ano, mes, path, file_names)
+            if dados is None:
+                dados = pd.read_csv(caminho_csv, delimiter=";", encoding=ENCODING_DOS_DADOS, dtype=dtypes_de_leitura(), low_memory=False)
+                dados = atualiza_dicionarios(aplica_esquema(dados), path, file_names)
+            if "UF_VENDA" not in dados.columns:
+                raise KeyError("UF_VENDA")
+
+            antigas = _lista_particoes_uf(ano, mes, path, file_names)
+            novas = {}
+            for uf, parte in dados.groupby("UF_VENDA", observed=True, dropna=False, sort=False):
+                nome = UF_NULA if pd.isna(uf) else str(uf)
+                caminho_particao = caminho_particao_uf(ano, mes, nome, path, file_names)
+                os.makedirs(os.path.dirname(caminho_particao), exist_ok=True)
+                # O índice guarda a posição de cada linha no mês.
+                parte.to_parquet(caminho_particao + ".tmp", engine="pyarrow", compression=compressao, index=True,
+                                 row_group_size=LINHAS_POR_GRUPO)
+                os.replace(caminho_particao + ".tmp", caminho_particao)
+                novas[nome] = caminho_particao
+
+            # Estados que não aparecem mais no mês não podem continuar com partições antigas.
+            for nome, caminho_particao in antigas.items():
+                if nome not in novas:
+                    os.remove(caminho_particao)
+            criadas.extend(novas.values())
+
+        except Exception as err:
+            print(f"Não foi possível particionar '{caminho_csv}' por estado.", err)
+
+    return criadas
+
+
+if __name__ == "__main__":
+    # Converte toda a pasta de dados para o cache colunar.
+    """
+    converte_para_parquet("2014/01", "2021/11")
+    """
+
+    doctest.testmod(verbose=True)
@@ -0,0 +1,392 @@
+"""Módulo que mantém o catálogo dos meses disponíveis na pasta dos dados.
+
+O catálogo ("Manipulados.catalogo.json") guarda, para cada mês, o número de linhas, o tamanho do arquivo,
+as colunas e as estatísticas de cada coluna: valor mínimo e máximo, número de nulos e, para as colunas
+com poucos valores diferentes, o conjunto dos valores. As leituras filtradas do módulo utils usam essas
+estatísticas para pular, sem abri-los, os meses que não podem ter as linhas procuradas, como um princípio
+ativo que não foi vendido no mês. O catálogo também permite estimar a memória de uma leitura antes de fazê-la.
+Cada mês guarda a versão do arquivo (módulo derivados) usada no cálculo, e um mês alterado depois disso
+é ignorado até que o catálogo seja atualizado.
+"""
+
+import sys, os
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(esse_caminho)
+
+import json
+import numpy as np
+import pandas as pd
+import doctest
+from get_data import get_dates_between_dates, caminho_do_mes, ENCODING_DOS_DADOS
+from cache_colunar import blocos_do_cache, caminho_cache_mes, TAMANHO_DO_BLOCO
+from esquema import ESQUEMA, aplica_esquema, dtypes_de_leitura
+from derivados import versao_do_mes
+
+# Número máximo de valores diferentes de uma coluna para que o conjunto dos seus valores seja guardado.
+LIMITE_DE_VALORES_DISTINTOS = 5000
+
+# Bytes usados por valor de cada tipo do esquema, usados na estimativa de memória.
+BYTES_POR_TIPO = {"int8": 1, "int16": 2, "float32": 4, "Int8": 2, "Int16": 3}
+
+# Catálogos já lidos, com a data de modificação do arquivo na leitura.
+_catalogos_lidos = {}
+
+
+def caminho_do_catalogo(path:str = "dados", file_names:str = "Manipulados") -> str:
+    """Retorna o caminho do arquivo do catálogo.
+
+    Parameters
+    ----------
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    str
+        O caminho do catálogo.
+
+    Test
+    ----------
+    >>> caminho_do_catalogo("dados").replace(os.sep, "/")
+    'dados/Manipulados.catalogo.json'
+    """
+    return os.path.join(path, f"{file_names}.catalogo.json")
+
+
+def le_catalogo(path:str = "dados", file_names:str = "Manipulados") -> dict:
+    """Lê o catálogo, reaproveitando a leitura anterior caso o arquivo não tenha mudado.
+
+    Parameters
+    ----------
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    dict
+        A entrada de cada mês, com os meses como "AAAAmm", vazio caso o catálogo ainda não exista.
+
+    Test
+    ----------
+    >>> le_catalogo("PASTA_INEXISTENTE")
+    {}
+    """
+    caminho = caminho_do_catalogo(path, file_names)
+    if not os.path.isfile(caminho):
+        return {}
+
+    versao = os.stat(caminho).st_mtime_ns
+    if caminho not in _catalogos_lidos or _catalogos_lidos[caminho][0] != versao:
+        with open(caminho, "r", encoding="utf-8") as arquivo:
+            _catalogos_lidos[caminho] = (versao, json.load(arquivo))
+    return _catalogos_lidos[caminho][1]
+
+
+def _valor_python(valor):
+    """Converte um valor do numpy para o tipo do Python equivalente, que pode ser salvo em json.
+
+    Test
+    ----------
+    >>> type(_valor_python(np.int16(3)))
+    <class 'int'>
+    """
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+
+def cataloga_mes(ano:str, mes:str, path:str = "dados", file_names:str = "Manipulados") -> dict:
+    """Calcula a entrada do catálogo de um mês, lendo-o em blocos.
+
+    Parameters
+    ----------
+    ano : str
+        O ano do arquivo, ex: "2014".
+    mes : str
+        O mês do arquivo com dois dígitos, ex: "01".
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    dict
+        A entrada do mês, com "versao", "linhas", "bytes", "colunas" e "estatisticas", que tem para cada coluna
+        "min", "max", "nulos" e "valores" (None quando a coluna tem mais de LIMITE_DE_VALORES_DISTINTOS valores),
+        ou None caso o mês não esteja na pasta dos dados.
+
+    Test
+    ----------
+    >>> cataloga_mes("2014", "01", "PASTA_INEXISTENTE") is None
+    True
+    """
+    versao = versao_do_mes(ano, mes, path, file_names)
+    if versao == None:
+        return None
+
+    caminho_arquivo = caminho_do_mes(path, ano, mes, file_names)
+    if not os.path.isfile(caminho_arquivo):
+        caminho_arquivo = caminho_cache_mes(ano, mes, path, file_names)
+    blocos = blocos_do_cache(ano, mes, path, file_names)
+    if blocos is None:
+        blocos = pd.read_csv(caminho_arquivo, delimiter=";", encoding=ENCODING_DOS_DADOS, dtype=dtypes_de_leitura(),
+                             chunksize=TAMANHO_DO_BLOCO, low_memory=False)
+
+    linhas = 0
+    colunas = []
+    estatisticas = {}
+    for bloco in blocos:
+        bloco = aplica_esquema(bloco)
+        if colunas == []:
+            colunas = list(bloco.columns)
+        linhas += len(bloco)
+        for coluna in bloco.columns:
+            estatistica = estatisticas.setdefault(coluna, {"min": None, "max": None, "nulos": 0, "valores": set()})
+            serie = bloco[coluna]
+            estatistica["nulos"] += int(serie.isna().sum())
+            unicos = [_valor_python(valor) for valor in serie.dropna().unique().tolist()]
+            if unicos == []:
+                continue
+            try:
+                minimo, maximo = min(unicos), max(unicos)
+                if estatistica["min"] != None:
+                    minimo, maximo = min(minimo, estatistica["min"]), max(maximo, estatistica["max"])
+                estatistica["min"], estatistica["max"] = minimo, maximo
+            except TypeError:
+                # Valores de tipos que não podem ser comparados não têm mínimo e máximo.
+                estatistica["min"] = estatistica["max"] = None
+            if estatistica["valores"] != None:
+                estatistica["valores"].update(unicos)
+                if len(estatistica["valores"]) > LIMITE_DE_VALORES_DISTINTOS:
+                    estatistica["valores"] = None
+
+    for estatistica in estatisticas.values():
+        if estatistica["valores"] != None:
+            estatistica["valores"] = sorted(estatistica["valores"], key=str)
+
+    return {"versao": versao, "linhas": linhas, "bytes": os.path.getsize(caminho_arquivo),
+            "colunas": colunas, "estatisticas": estatisticas}
+
+
+def atualiza_catalogo(data_inicial:str = "2014/01", data_final:str = "2021/11", path:str = "dados",
+                      file_names:str = "Manipulados") -> dict:
+    """Atualiza o catálogo, calculando apenas os meses novos ou alterados desde a última atualização.
+
+    Meses que não estão mais na pasta dos dados são retirados do catálogo.
+
+    Parameters
+    ----------
+    data_inicial : str, optional
+        A data do primeiro mês, by default "2014/01"
+    data_final : str, optional
+        A data do último mês, by default "2021/11"
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    dict
+        O catálogo atualizado.
+
+    Test
+    ----------
+    >>> atualiza_catalogo("2014/01", "2014/02", "PASTA_INEXISTENTE")
+    {}
+    """
+    catalogo = dict(le_catalogo(path, file_names))
+    alterado = False
+    for cada_data in get_dates_between_dates(data_inicial, data_final):
+        versao = versao_do_mes(cada_data[:4], cada_data[-2:], path, file_names)
+        if versao == None:
+            alterado = catalogo.pop(cada_data, None) != None or alterado
+        elif catalogo.get(cada_data, {}).get("versao") != versao:
+            try:
+                catalogo[cada_data] = cataloga_mes(cada_data[:4], cada_data[-2:], path, file_names)
+                alterado = True
+            except Exception as err:
+                print(f"Não foi possível catalogar '{caminho_do_mes(path, cada_data[:4], cada_data[-2:], file_names)}'.", err)
+
+    if alterado:
+        caminho = caminho_do_catalogo(path, file_names)
+        with open(caminho + ".tmp", "w", encoding="utf-8") as arquivo:
+            json.dump(dict(sorted(catalogo.items())), arquivo, ensure_ascii=False)
+        os.replace(caminho + ".tmp", caminho)
+    return catalogo
+
+
+def entrada_do_catalogo(ano:str, mes:str, path:str = "dados", file_names:str = "Manipulados") -> dict:
+    """Retorna a entrada do catálogo de um mês, caso ela corresponda à versão atual do seu arquivo.
+
+    Parameters
+    ----------
+    ano : str
+        O ano do arquivo, ex: "2014".
+    mes : str
+        O mês do arquivo com dois dígitos, ex: "01".
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    dict
+        A entrada do mês, ou None caso o mês não esteja no catálogo ou tenha sido alterado depois dele.
+
+    Test
+    ----------
+    >>> entrada_do_catalogo("2014", "01", "PASTA_INEXISTENTE") is None
+    True
+    """
+    entrada = le_catalogo(path, file_names).get(ano + mes)
+    if entrada == None or entrada["versao"] != versao_do_mes(ano, mes, path, file_names):
+        return None
+    return entrada
+
+
+def _valor_pode_estar(estatistica:dict, valor) -> bool:
+    """Verifica, pelas estatísticas de uma coluna, se o valor pode estar nela.
+
+    Test
+    ----------
+    >>> estatistica = {"min": 1, "max": 12, "nulos": 0, "valores": None}
+    >>> _valor_pode_estar(estatistica, 5), _valor_pode_estar(estatistica, 13)
+    (True, False)
+    >>> _valor_pode_estar({"min": "A", "max": "C", "nulos": 0, "valores": ["A", "C"]}, "B")
+    False
+    """
+    if estatistica["valores"] != None:
+        return valor in estatistica["valores"]
+    if estatistica["min"] == None:
+        return True
+    try:
+        return estatistica["min"] <= valor <= estatistica["max"]
+    except TypeError:
+        return True
+
+
+def _intervalo_pode_estar(estatistica:dict, minimo, maximo) -> bool:
+    """Verifica, pelo mínimo e pelo máximo de uma coluna, se algum valor dela pode estar no intervalo.
+
+    Test
+    ----------
+    >>> estatistica = {"min": 18, "max": 40, "nulos": 0, "valores": None}
+    >>> _intervalo_pode_estar(estatistica, 30, None), _intervalo_pode_estar(estatistica, 41, 60)
+    (True, False)
+    """
+    if estatistica["min"] == None:
+        return True
+    try:
+        return (maximo is None or estatistica["min"] <= maximo) and (minimo is None or estatistica["max"] >= minimo)
+    except TypeError:
+        return True
+
+
+def mes_pode_satisfazer(ano:str, mes:str, where, path:str = "dados", file_names:str = "Manipulados") -> bool:
+    """Verifica, pelo catálogo, se o mês pode ter alguma linha que satisfaz o predicado.
+
+    Apenas os predicados em dicionário (no formato da função mascara_de_filtros do módulo utils) são verificados:
+    os valores pelos conjuntos de valores ou pelo mínimo e máximo, os intervalos pelo mínimo e máximo e o None
+    pelo número de nulos.
+    Sem uma entrada atual do catálogo o mês sempre pode satisfazer o predicado.
+
+    Parameters
+    ----------
+    ano : str
+        O ano do arquivo, ex: "2014".
+    mes : str
+        O mês do arquivo com dois dígitos, ex: "01".
+    where : dict or callable
+        A condição de cada coluna, ou uma função.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    bool
+        False caso nenhuma linha do mês possa satisfazer o predicado.
+
+    Test
+    ----------
+    >>> mes_pode_satisfazer("2014", "01", {"PRINCIPIO_ATIVO": "ZOLPIDEM"}, "PASTA_INEXISTENTE")
+    True
+    """
+    if type(where) != dict:
+        return True
+    entrada = entrada_do_catalogo(ano, mes, path, file_names)
+    if entrada == None:
+        return True
+
+    for coluna, valores in where.items():
+        estatistica = entrada["estatisticas"].get(coluna)
+        if estatistica == None:
+            continue
+        if type(valores) == tuple:
+            if not _intervalo_pode_estar(estatistica, *valores):
+                return False
+            continue
+        if not isinstance(valores, (list, set, frozenset)):
+            valores = [valores]
+        if not any(estatistica["nulos"] > 0 if valor is None else _valor_pode_estar(estatistica, valor) for valor in valores):
+            return False
+    return True
+
+
+def estima_memoria(data_inicial:str, data_final:str, colunas:list = None, path:str = "dados",
+                   file_names:str = "Manipulados") -> int:
+    """Estima, pelo catálogo, os bytes ocupados pelos dados entre as datas dadas depois de lidos.
+
+    Cada coluna do esquema ocupa os bytes do seu tipo por linha, as categóricas ocupam os bytes dos seus códigos
+    e as colunas fora do esquema são contadas como objetos (8 bytes). Meses sem uma entrada atual no catálogo
+    não são contados.
+
+    Parameters
+    ----------
+    data_inicial : str
+        A data do primeiro mês.
+    data_final : str
+        A data do último mês.
+    colunas : list, optional
+        As colunas que serão lidas, caso None todas as colunas, by default None
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    int
+        A estimativa, em bytes.
+
+    Test
+    ----------
+    >>> estima_memoria("2014/01", "2014/12", path="PASTA_INEXISTENTE")
+    0
+    """
+    total = 0
+    for cada_data in get_dates_between_dates(data_inicial, data_final):
+        entrada = entrada_do_catalogo(cada_data[:4], cada_data[-2:], path, file_names)
+        if entrada == None:
+            continue
+        for coluna in entrada["colunas"]:
+            if colunas != None and coluna not in colunas:
+                continue
+            tipo = ESQUEMA.get(coluna)
+            if tipo == "category":
+                valores = entrada["estatisticas"][coluna]["valores"]
+                bytes_por_linha = 1 if valores != None and len(valores) < 128 else 2 if valores != None else 4
+            else:
+                bytes_por_linha = BYTES_POR_TIPO.get(tipo, 8)
+            total += bytes_por_linha * entrada["linhas"]
+    return total
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
@@ -0,0 +1,381 @@
+"""Módulo que mantém toda a base em um único arquivo colunar (Arrow IPC) lido por mapeamento de memória.
+
+O arquivo "dados/colunas/Manipulados.arrow" guarda os meses em ordem cronológica. As colunas de texto são
+guardadas como códigos inteiros de um dicionário único para toda a base, assim os meses compartilham os mesmos
+códigos. Como o arquivo é aberto com mapeamento de memória, os dados só são lidos do disco quando usados, as
+fatias por período são apenas visões do arquivo (sem cópia) e vários processos na mesma máquina compartilham
+as mesmas páginas do arquivo na memória do sistema, sem que cada um tenha a sua própria cópia.
+
+Junto do arquivo são salvos a posição de cada mês ("Manipulados.meses.json") e as posições das linhas
+ordenadas por princípio ativo ("Manipulados.PRINCIPIO_ATIVO.npy"), que também é lido por mapeamento de memória.
+"""
+
+import sys, os
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(esse_caminho)
+
+import json
+import numpy as np
+import pandas as pd
+import doctest
+from get_data import get_dates_between_dates, caminho_do_mes
+from utils import iter_data_by_dates
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = None
+
+# Pasta das colunas mapeadas, dentro da pasta dos dados.
+PASTA_COLUNAS = "colunas"
+
+# Tabelas já abertas nesta execução, pelo caminho e pela data de modificação do arquivo.
+_tabelas_abertas = {}
+
+
+def caminhos_das_colunas(path:str = "dados", file_names:str = "Manipulados") -> dict:
+    """Retorna os caminhos dos arquivos das colunas mapeadas.
+
+    Parameters
+    ----------
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    dict
+        O caminho da tabela ("tabela"), das posições dos meses e dos princípios ativos ("posicoes")
+        e das linhas ordenadas por princípio ativo ("principios").
+
+    Test
+    ----------
+    >>> caminhos_das_colunas("dados")["tabela"].replace(os.sep, "/")
+    'dados/colunas/Manipulados.arrow'
+    """
+    pasta = os.path.join(path, PASTA_COLUNAS)
+    return {"tabela": os.path.join(pasta, f"{file_names}.arrow"),
+            "posicoes": os.path.join(pasta, f"{file_names}.meses.json"),
+            "principios": os.path.join(pasta, f"{file_names}.PRINCIPIO_ATIVO.npy")}
+
+
+def _lote_com_dicionarios(bloco:pd.DataFrame, esquema, dicionarios:dict):
+    """Converte um bloco em um lote do Arrow, com as colunas categóricas codificadas pelos dicionários da base.
+
+    Os valores ainda não vistos são adicionados ao fim do dicionário da coluna, assim os códigos
+    já usados nunca mudam.
+
+    Parameters
+    ----------
+    bloco : pd.DataFrame
+        O bloco de linhas, com os tipos do esquema (módulo esquema).
+    esquema : pa.Schema
+        O esquema do arquivo.
+    dicionarios : dict
+        Para cada coluna categórica, a lista dos seus valores na ordem dos códigos. É atualizado pela função.
+
+    Returns
+    -------
+    pa.RecordBatch
+        O lote pronto para ser escrito.
+    """
+    colunas = []
+    for campo in esquema:
+        serie = bloco[campo.name]
+        if campo.name in dicionarios:
+            dicionario = dicionarios[campo.name]
+            categorias = serie.astype("category").cat
+            novos = categorias.categories[pd.Index(dicionario, dtype=object).get_indexer(categorias.categories) == -1]
+            dicionario.extend(str(valor) for valor in novos)
+            # Converte os códigos do bloco nos códigos do dicionário da base.
+            conversao = pd.Index(dicionario, dtype=object).get_indexer(categorias.categories.astype(str)).astype(np.int32)
+            codigos = categorias.codes.to_numpy()
+            indices = pa.array(np.where(codigos >= 0, conversao[codigos], 0).astype(np.int32), mask=codigos < 0)
+            colunas.append(pa.DictionaryArray.from_arrays(indices, pa.array(dicionario, pa.string())))
+        else:
+            colunas.append(pa.Array.from_pandas(serie, type=campo.type))
+    return pa.RecordBatch.from_arrays(colunas, schema=esquema)
+
+
+def constroi_colunas_mapeadas(data_inicial:str, data_final:str, path:str = "dados", file_names:str = "Manipulados") -> str:
+    """Escreve os meses entre as datas dadas no arquivo colunar, lendo cada mês em blocos.
+
+    Parameters
+    ----------
+    data_inicial : str
+        A data do primeiro mês.
+    data_final : str
+        A data do último mês.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    str
+        O caminho do arquivo escrito, ou None caso nenhum mês tenha sido escrito ou a escrita tenha falhado.
+
+    Test
+    ----------
+    >>> constroi_colunas_mapeadas("2013/01", "2014/01")
+    Problemas com a primeira data inserida: 2013/01
+    Formato da data está incorreto ou ela não está entre Janeiro de 2014 e Novembro de 2021, tente inserir como ANO/mês, ex: '2015/05'.
+    """
+    datas = get_dates_between_dates(data_inicial, data_final)
+    try:
+        if datas == []:
+            return None
+        if pa == None:
+            raise ImportError
+    except ImportError:
+        print("As colunas mapeadas precisam da biblioteca pyarrow, tente instalá-la com 'pip install pyarrow'.")
+        return None
+
+    caminhos = caminhos_das_colunas(path, file_names)
+    os.makedirs(os.path.dirname(caminhos["tabela"]), exist_ok=True)
+
+    esquema, escritor, arquivo = None, None, None
+    dicionarios, meses, linhas = {}, {}, 0
+    escrito = False
+    try:
+        for ano, mes, bloco in iter_data_by_dates(data_inicial, data_final, path, file_names):
+            if esquema is None:
+                # O esquema do primeiro bloco vale para o arquivo todo, com os metadados do pandas para restaurar os tipos.
+                campos = []
+                for nome, tipo in bloco.dtypes.items():
+                    if isinstance(tipo, pd.CategoricalDtype):
+                        dicionarios[nome] = []
+                        campos.append(pa.field(nome, pa.dictionary(pa.int32(), pa.string())))
+                    else:
+                        campos.append(pa.field(nome, pa.Array.from_pandas(bloco[nome].iloc[:0]).type))
+                esquema = pa.schema(campos, metadata=pa.Schema.from_pandas(bloco.iloc[:0], preserve_index=False).metadata)
+                arquivo = pa.OSFile(caminhos["tabela"] + ".tmp", "wb")
+                escritor = ipc.new_file(arquivo, esquema, options=ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+
+            if list(bloco.columns) != esquema.names:
+                print(f"As colunas de '{caminho_do_mes(path, ano, mes, file_names)}' são diferentes das do primeiro mês, o mês não foi incluído.")
+                continue
+            escritor.write_batch(_lote_com_dicionarios(bloco, esquema, dicionarios))
+            inicio, _ = meses.get(ano + mes, (linhas, linhas))
+            linhas += len(bloco)
+            meses[ano + mes] = (inicio, linhas)
+        escrito = escritor is not None
+    except Exception as err:
+        # Um mês com tipos diferentes dos do primeiro bloco não pode ser escrito no mesmo arquivo.
+        print("Não foi possível escrever as colunas mapeadas:", err)
+    finally:
+        if escritor is not None:
+            escritor.close()
+        if arquivo is not None:
+            arquivo.close()
+
+    if not escrito:
+        # O arquivo temporário incompleto é descartado, e o arquivo anterior, se existir, é mantido.
+        if os.path.isfile(caminhos["tabela"] + ".tmp"):
+            os.remove(caminhos["tabela"] + ".tmp")
+        return None
+    os.replace(caminhos["tabela"] + ".tmp", caminhos["tabela"])
+
+    # Posições das linhas ordenadas pelo código do princípio ativo, e o intervalo de cada princípio ativo nelas.
+    principios = {}
+    if "PRINCIPIO_ATIVO" in dicionarios:
+        tabela = abre_colunas_mapeadas(path, file_names)
+        codigos = np.concatenate([pedaco.indices.to_numpy(zero_copy_only=False) for pedaco in tabela.column("PRINCIPIO_ATIVO").chunks]
+                                 or [np.zeros(0, np.int32)])
+        preenchidos = ~np.concatenate([pedaco.is_null().to_numpy(zero_copy_only=False) for pedaco in tabela.column("PRINCIPIO_ATIVO").chunks]
+                                      or [np.zeros(0, bool)])
+        codigos = np.where(preenchidos, codigos, -1)
+        ordem = np.argsort(codigos, kind="stable").astype(np.int64)
+        limites = np.searchsorted(codigos[ordem], np.arange(len(dicionarios["PRINCIPIO_ATIVO"]) + 1))
+        principios = {valor: (int(limites[codigo]), int(limites[codigo + 1]))
+                      for codigo, valor in enumerate(dicionarios["PRINCIPIO_ATIVO"])}
+        np.save(caminhos["principios"] + ".tmp.npy", ordem)
+        os.replace(caminhos["principios"] + ".tmp.npy", caminhos["principios"])
+
+    with open(caminhos["posicoes"] + ".tmp", "w", encoding="utf-8") as arquivo_posicoes:
+        json.dump({"meses": meses, "PRINCIPIO_ATIVO": principios}, arquivo_posicoes, ensure_ascii=False)
+    os.replace(caminhos["posicoes"] + ".tmp", caminhos["posicoes"])
+
+    return caminhos["tabela"]
+
+
+def abre_colunas_mapeadas(path:str = "dados", file_names:str = "Manipulados"):
+    """Abre o arquivo colunar por mapeamento de memória, sem ler os dados do disco.
+
+    Parameters
+    ----------
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    pa.Table
+        A tabela com toda a base, ou None caso o arquivo não exista.
+
+    Test
+    ----------
+    >>> abre_colunas_mapeadas("PASTA_INEXISTENTE") is None
+    True
+    """
+    caminho_tabela = caminhos_das_colunas(path, file_names)["tabela"]
+    if pa == None or not os.path.isfile(caminho_tabela):
+        return None
+
+    versao = os.stat(caminho_tabela).st_mtime_ns
+    if caminho_tabela not in _tabelas_abertas or _tabelas_abertas[caminho_tabela][0] != versao:
+        _tabelas_abertas[caminho_tabela] = (versao, ipc.open_file(pa.memory_map(caminho_tabela, "r")).read_all())
+    return _tabelas_abertas[caminho_tabela][1]
+
+
+def _le_posicoes(path:str, file_names:str) -> dict:
+    """Lê a posição de cada mês e de cada princípio ativo no arquivo colunar.
+
+    Parameters
+    ----------
+    path : str
+        A pasta dos dados.
+    file_names : str
+        O nome padrão dos arquivos.
+
+    Returns
+    -------
+    dict
+        As posições, ou None caso o arquivo não exista.
+    """
+    caminho_posicoes = caminhos_das_colunas(path, file_names)["posicoes"]
+    if not os.path.isfile(caminho_posicoes):
+        return None
+    with open(caminho_posicoes, "r", encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def _resultado(tabela, colunas:list, como_tabela:bool):
+    """Seleciona as colunas da tabela e a converte para o pandas, caso pedido.
+
+    Parameters
+    ----------
+    tabela : pa.Table
+        A tabela selecionada.
+    colunas : list
+        As colunas pedidas, caso None todas.
+    como_tabela : bool
+        Caso True, a tabela do Arrow é retornada sem conversão.
+
+    Returns
+    -------
+    pd.DataFrame or pa.Table
+        O resultado da seleção.
+    """
+    if colunas != None:
+        tabela = tabela.select(colunas)
+    if como_tabela:
+        return tabela
+    return tabela.to_pandas()
+
+
+def fatia_por_meses(data_inicial:str, data_final:str, path:str = "dados", file_names:str = "Manipulados",
+                    colunas:list = None, como_tabela:bool = False):
+    """Retorna os meses entre as datas dadas, como uma fatia contínua do arquivo colunar.
+
+    A fatia do Arrow é uma visão do arquivo mapeado, sem cópia. Apenas a conversão para o pandas copia as
+    colunas pedidas, por isso "como_tabela" permite trabalhar diretamente com a tabela do Arrow.
+
+    Parameters
+    ----------
+    data_inicial : str
+        A data do primeiro mês.
+    data_final : str
+        A data do último mês.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+    colunas : list, optional
+        As colunas pedidas, caso None todas, by default None
+    como_tabela : bool, optional
+        Caso True, retorna a tabela do Arrow em vez de um dataframe, by default False
+
+    Returns
+    -------
+    pd.DataFrame or pa.Table
+        As linhas dos meses pedidos, ou None caso o arquivo colunar não exista.
+
+    Test
+    ----------
+    >>> fatia_por_meses("2014/01", "2014/02", "PASTA_INEXISTENTE")
+    As colunas mapeadas ainda não foram construídas, tente construí-las com a função constroi_colunas_mapeadas.
+    """
+    tabela, posicoes = abre_colunas_mapeadas(path, file_names), _le_posicoes(path, file_names)
+    try:
+        if tabela is None or posicoes == None:
+            raise FileNotFoundError
+    except FileNotFoundError:
+        print("As colunas mapeadas ainda não foram construídas, tente construí-las com a função constroi_colunas_mapeadas.")
+        return None
+
+    # Os meses estão em ordem cronológica, então o período é o intervalo do primeiro ao último mês presente.
+    intervalos = [posicoes["meses"][cada_data] for cada_data in get_dates_between_dates(data_inicial, data_final)
+                  if cada_data in posicoes["meses"]]
+    if intervalos == []:
+        return _resultado(tabela.slice(0, 0), colunas, como_tabela)
+    inicio, fim = intervalos[0][0], intervalos[-1][1]
+    return _resultado(tabela.slice(inicio, fim - inicio), colunas, como_tabela)
+
+
+def fatia_por_principios_ativos(principios_ativos:list, path:str = "dados", file_names:str = "Manipulados",
+                                colunas:list = None, como_tabela:bool = False):
+    """Retorna as linhas dos princípios ativos dados, em ordem cronológica.
+
+    As posições das linhas de cada princípio ativo são lidas do arquivo ".npy" mapeado, então apenas
+    as linhas pedidas são lidas da tabela.
+
+    Parameters
+    ----------
+    principios_ativos : list
+        Os princípios ativos procurados, ex: ["ZOLPIDEM", "HEMITARTARATO DE ZOLPIDEM"].
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+    colunas : list, optional
+        As colunas pedidas, caso None todas, by default None
+    como_tabela : bool, optional
+        Caso True, retorna a tabela do Arrow em vez de um dataframe, by default False
+
+    Returns
+    -------
+    pd.DataFrame or pa.Table
+        As linhas dos princípios ativos, ou None caso o arquivo colunar não exista.
+
+    Test
+    ----------
+    >>> fatia_por_principios_ativos(["ZOLPIDEM"], "PASTA_INEXISTENTE")
+    As colunas mapeadas ainda não foram construídas, tente construí-las com a função constroi_colunas_mapeadas.
+    """
+    tabela, posicoes = abre_colunas_mapeadas(path, file_names), _le_posicoes(path, file_names)
+    caminho_principios = caminhos_das_colunas(path, file_names)["principios"]
+    try:
+        if tabela is None or posicoes == None or not os.path.isfile(caminho_principios):
+            raise FileNotFoundError
+    except FileNotFoundError:
+        print("As colunas mapeadas ainda não foram construídas, tente construí-las com a função constroi_colunas_mapeadas.")
+        return None
+
+    ordem = np.load(caminho_principios, mmap_mode="r")
+    intervalos = [posicoes["PRINCIPIO_ATIVO"][principio] for principio in principios_ativos if principio in posicoes["PRINCIPIO_ATIVO"]]
+    linhas = np.sort(np.concatenate([ordem[inicio:fim] for inicio, fim in intervalos] or [np.zeros(0, np.int64)]))
+    return _resultado(tabela.take(pa.array(linhas)), colunas, como_tabela)
+
+
+if __name__ == "__main__":
+    # Constrói as colunas mapeadas de toda a base.
+    """
+    constroi_colunas_mapeadas("2014/01", "2021/11")
+    """
+
+    doctest.testmod(verbose=True)
@@ -0,0 +1,387 @@
+"""Módulo com a consulta preguiçosa aos dados mensais, que escolhe como ler os dados antes de lê-los.
+
+Em vez de ler os meses com "concat_data_by_dates", filtrar e agrupar o resultado, cada passo gerando um
+dataframe completo, a classe "Consulta" apenas registra as operações e as executa de uma só vez:
+
+    Consulta("2014/01", "2020/12").where({"PRINCIPIO_ATIVO": GRUPOS_DE_MEDICAMENTOS["ZOLPIDEM"]}).agrupa_por("ANO_VENDA").conta().executa()
+
+Na execução, o plano é escolhido pelas operações registradas: contagens e somas por chaves do cubo
+(módulo cubo) são respondidas pelo cubo quando ele está atualizado; nas outras consultas, apenas as colunas
+usadas são lidas, os filtros são passados para a leitura (catálogo, índice e partições do cache colunar) e a
+agregação é feita bloco a bloco, sem guardar as linhas lidas. A mesma consulta também pode ser feita sobre um
+dataframe já carregado ("Consulta.do_dataframe").
+"""
+
+import sys, os
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(esse_caminho)
+
+import pandas as pd
+import doctest
+from get_data import get_dates_between_dates
+from esquema import concatena_com_esquema
+from utils import iter_data_by_dates, _mascara_where
+from cubo import le_cubo, cubo_atualizado, CHAVES_DO_CUBO, COLUNAS_DERIVADAS_DO_CUBO
+from dicionarios import adiciona_principio_ativo_base
+
+
+class Consulta:
+    """Consulta preguiçosa aos dados mensais entre duas datas, ou a um dataframe já carregado.
+
+    Os métodos "where", "seleciona", "agrupa_por", "conta" e "soma" retornam uma nova consulta com a
+    operação registrada, sem ler nenhum dado, e podem ser encadeados. Os dados só são lidos por "executa".
+
+    Parameters
+    ----------
+    data_inicial : str
+        A data do primeiro mês, ex: "2014/01".
+    data_final : str
+        A data do último mês, ex: "2020/12".
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Test
+    ----------
+    >>> dados = pd.DataFrame({"ANO_VENDA": [2014, 2014, 2015], "UF_VENDA": ["SP", "RJ", "SP"]})
+    >>> Consulta.do_dataframe(dados).where({"UF_VENDA": "SP"}).agrupa_por("ANO_VENDA").conta().executa()
+       ANO_VENDA  VENDAS
+    0       2014       1
+    1       2015       1
+    """
+
+    def __init__(self, data_inicial:str, data_final:str, path:str = "dados", file_names:str = "Manipulados"):
+        self.data_inicial = data_inicial
+        self.data_final = data_final
+        self.path = path
+        self.file_names = file_names
+        self._dados = None
+        self._filtros = []
+        self._colunas = None
+        self._chaves = None
+        self._agregacao = None
+        self._erro = None
+
+    @classmethod
+    def do_dataframe(cls, dados:pd.DataFrame) -> "Consulta":
+        """Cria uma consulta sobre um dataframe já carregado, em vez dos dados mensais.
+
+        Parameters
+        ----------
+        dados : pd.DataFrame
+            O dataframe consultado.
+
+        Returns
+        -------
+        Consulta
+            A consulta sem nenhuma operação registrada.
+
+        Test
+        ----------
+        >>> Consulta.do_dataframe(3).executa()
+        DataFrame inválido, tente inserir outro DataFrame.
+        """
+        consulta = cls(None, None)
+        consulta._dados = dados
+        if type(dados) != pd.DataFrame:
+            consulta._erro = "DataFrame inválido, tente inserir outro DataFrame."
+        return consulta
+
+    def _com(self, **alteracoes) -> "Consulta":
+        """Retorna uma cópia da consulta com os atributos alterados, mantendo a consulta original como está."""
+        copia = Consulta(self.data_inicial, self.data_final, self.path, self.file_names)
+        copia.__dict__.update(self.__dict__)
+        copia.__dict__.update(alteracoes)
+        return copia
+
+    def _invalida(self, mensagem:str) -> "Consulta":
+        """Retorna uma cópia da consulta marcada como inválida, cuja execução apenas mostra a mensagem do primeiro erro."""
+        return self._com(_erro=self._erro or mensagem)
+
+    def where(self, filtro) -> "Consulta":
+        """Registra um filtro das linhas, combinado com "e" aos filtros já registrados.
+
+        Parameters
+        ----------
+        filtro : dict or Callable
+            A condição de cada coluna, no formato da função _mascara_where do módulo utils
+            (ex: {"PRINCIPIO_ATIVO": ["ZOLPIDEM"], "IDADE": (60, None)}), ou uma função que recebe
+            o dataframe e retorna uma série booleana.
+
+        Returns
+        -------
+        Consulta
+            A nova consulta, com o filtro registrado.
+
+        Test
+        ----------
+        >>> Consulta("2014/01", "2014/01").where(["UF_VENDA"]).executa()
+        O filtro de linhas deve ser um dicionário com colunas do dataframe ou uma função, tente inserir novamente.
+        """
+        if not callable(filtro) and type(filtro) != dict:
+            return self._invalida("O filtro de linhas deve ser um dicionário com colunas do dataframe ou uma função, tente inserir novamente.")
+        return self._com(_filtros=self._filtros + [filtro])
+
+    def seleciona(self, colunas:list) -> "Consulta":
+        """Registra as colunas retornadas pela consulta sem agregação.
+
+        Parameters
+        ----------
+        colunas : list
+            As colunas retornadas, na ordem pedida.
+
+        Returns
+        -------
+        Consulta
+            A nova consulta, com as colunas registradas.
+        """
+        if type(colunas) != list or any(type(coluna) != str for coluna in colunas):
+            return self._invalida("As colunas devem ser uma lista de strings das colunas do dataframe, tente inserir novamente.")
+        return self._com(_colunas=list(colunas))
+
+    def agrupa_por(self, chaves) -> "Consulta":
+        """Registra as colunas pelas quais a agregação é feita.
+
+        Parameters
+        ----------
+        chaves : str or list
+            A coluna, ou a lista de colunas, de cada grupo.
+
+        Returns
+        -------
+        Consulta
+            A nova consulta, com as chaves registradas.
+        """
+        chaves = [chaves] if type(chaves) == str else chaves
+        if type(chaves) != list or any(type(chave) != str for chave in chaves):
+            return self._invalida("As chaves devem ser uma coluna ou uma lista de colunas do dataframe, tente inserir novamente.")
+        return self._com(_chaves=list(chaves))
+
+    def conta(self, nome:str = "VENDAS") -> "Consulta":
+        """Registra a contagem das linhas de cada grupo. Cada linha da base é uma venda.
+
+        Parameters
+        ----------
+        nome : str, optional
+            O nome da coluna da contagem, by default "VENDAS"
+
+        Returns
+        -------
+        Consulta
+            A nova consulta, com a contagem registrada.
+        """
+        return self._com(_agregacao=("conta", None, nome))
+
+    def soma(self, coluna:str, nome:str = None) -> "Consulta":
+        """Registra a soma de uma coluna em cada grupo.
+
+        Parameters
+        ----------
+        coluna : str
+            A coluna somada, ex: "QTD_UNIDADE_FARMACOTECNICA".
+        nome : str, optional
+            O nome da coluna da soma, caso None o nome da coluna somada, by default None
+
+        Returns
+        -------
+        Consulta
+            A nova consulta, com a soma registrada.
+        """
+        if type(coluna) != str:
+            return self._invalida("A coluna somada deve ser o nome de uma coluna do dataframe, tente inserir novamente.")
+        return self._com(_agregacao=("soma", coluna, nome or coluna))
+
+    def _filtro_da_leitura(self) -> tuple:
+        """Separa os filtros passados para a leitura (um único dicionário) dos aplicados depois, em cada bloco.
+
+        Returns
+        -------
+        tuple
+            O dicionário passado para a leitura, ou None, e a lista dos filtros restantes.
+        """
+        empurrado = {}
+        restantes = []
+        for filtro in self._filtros:
+            # Duas condições na mesma coluna não cabem em um único dicionário, e a segunda fica para depois.
+            if type(filtro) == dict and not any(coluna in empurrado for coluna in filtro):
+                empurrado.update(filtro)
+            else:
+                restantes.append(filtro)
+        return (empurrado if empurrado != {} else None), restantes
+
+    def _colunas_usadas(self) -> list:
+        """Retorna as colunas lidas pela consulta, ou None caso um filtro por função exija todas as colunas."""
+        if any(callable(filtro) for filtro in self._filtros):
+            return None
+        if self._agregacao != None:
+            usadas = list(self._chaves or []) + ([self._agregacao[1]] if self._agregacao[1] != None else [])
+        elif self._colunas != None:
+            usadas = list(self._colunas)
+        else:
+            return None
+        for filtro in self._filtros:
+            usadas += [coluna for coluna in filtro if coluna not in usadas]
+        return usadas
+
+    def _cubo_responde(self) -> bool:
+        """Verifica se a consulta pode ser respondida pelo cubo: uma contagem (ou soma das unidades) por chaves
+        do cubo, com filtros por dicionário nessas chaves, e o cubo atualizado em todos os meses da consulta."""
+        if self._dados is not None or self._agregacao == None:
+            return False
+        if self._agregacao[0] == "soma" and self._agregacao[1] != "QTD_UNIDADE_FARMACOTECNICA":
+            return False
+        colunas = list(self._chaves or []) + [coluna for filtro in self._filtros if type(filtro) == dict for coluna in filtro]
+        if any(callable(filtro) for filtro in self._filtros) or any(coluna not in CHAVES_DO_CUBO + COLUNAS_DERIVADAS_DO_CUBO for coluna in colunas):
+            return False
+        return cubo_atualizado(self.data_inicial, self.data_final, self.path, self.file_names)
+
+    def plano(self) -> dict:
+        """Descreve como a consulta será executada, sem ler nenhum dado.
+
+        Returns
+        -------
+        dict
+            A origem dos dados ("dataframe", "cubo" ou "meses"), as colunas lidas (None para todas),
+            o filtro passado para a leitura e o número de filtros aplicados depois da leitura.
+
+        Test
+        ----------
+        >>> consulta = Consulta("2014/01", "2014/02", "PASTA_INEXISTENTE").where({"UF_VENDA": "SP"}).where({"UF_VENDA": "RJ"})
+        >>> consulta.agrupa_por("ANO_VENDA").conta().plano()
+        {'origem': 'meses', 'colunas': ['ANO_VENDA', 'UF_VENDA'], 'where': {'UF_VENDA': 'SP'}, 'filtros_depois_da_leitura': 1}
+        """
+        if self._dados is not None:
+            return {"origem": "dataframe", "colunas": self._colunas_usadas(), "where": None, "filtros_depois_da_leitura": len(self._filtros)}
+        if get_dates_between_dates(self.data_inicial, self.data_final) != [] and self._cubo_responde():
+            return {"origem": "cubo", "colunas": None, "where": None, "filtros_depois_da_leitura": len(self._filtros)}
+        empurrado, restantes = self._filtro_da_leitura()
+        return {"origem": "meses", "colunas": self._colunas_usadas(), "where": empurrado, "filtros_depois_da_leitura": len(restantes)}
+
+    def _agrega(self, dados:pd.DataFrame, coluna_contada:str = None) -> pd.DataFrame:
+        """Agrega as linhas pelas chaves da consulta, contando as linhas ou somando a coluna pedida.
+
+        Parameters
+        ----------
+        dados : pd.DataFrame
+            As linhas a serem agregadas, ou agregações parciais.
+        coluna_contada : str, optional
+            Coluna com as contagens já feitas, somada em vez de contar as linhas, by default None
+
+        Returns
+        -------
+        pd.DataFrame
+            As chaves e a coluna da agregação.
+        """
+        tipo, coluna, nome = self._agregacao
+        if coluna_contada != None:
+            tipo, coluna = "soma", coluna_contada
+        if tipo == "soma" and dados[coluna].dtype == "float32":
+            # As somas são feitas em float64, como as do cubo, para não perder precisão.
+            dados = dados.assign(**{coluna: dados[coluna].astype("float64")})
+        if self._chaves in (None, []):
+            valor = len(dados) if tipo == "conta" else dados[coluna].sum()
+            return pd.DataFrame({nome: [valor]})
+
+        grupos = dados.groupby(self._chaves, observed=True, dropna=False, sort=False)
+        agregado = grupos.size() if tipo == "conta" else grupos[coluna].sum()
+        return agregado.rename(nome).reset_index()
+
+    def _linhas_e_blocos(self):
+        """Gera os blocos de linhas lidos pela consulta, já com todos os filtros aplicados."""
+        if self._dados is not None:
+            colunas = self._colunas_usadas()
+            mascara = None
+            for filtro in self._filtros:
+                atual = _mascara_where(self._dados, filtro)
+                mascara = atual if mascara is None else mascara & atual
+            dados = self._dados if colunas == None else self._dados[colunas]
+            yield dados if mascara is None else dados[mascara]
+            return
+
+        empurrado, restantes = self._filtro_da_leitura()
+        for _, _, bloco in iter_data_by_dates(self.data_inicial, self.data_final, self.path, self.file_names,
+                                              filtered_columns=self._colunas_usadas(), where=empurrado):
+            for filtro in restantes:
+                bloco = bloco[_mascara_where(bloco, filtro)]
+            yield bloco
+
+    def executa(self) -> pd.DataFrame:
+        """Executa a consulta, lendo os dados uma única vez.
+
+        Returns
+        -------
+        pd.DataFrame
+            Sem agregação, as linhas que satisfazem os filtros, com as colunas selecionadas. Com agregação,
+            as chaves e a coluna da agregação, ordenadas pelas chaves. None caso a consulta seja inválida.
+
+        Test
+        ----------
+        >>> Consulta("2014/01", "2014/01", "PASTA_INEXISTENTE").seleciona("UF_VENDA").executa()
+        As colunas devem ser uma lista de strings das colunas do dataframe, tente inserir novamente.
+        """
+        try:
+            if self._erro != None:
+                raise ValueError
+        except ValueError:
+            print(self._erro)
+            return None
+
+        if self._dados is None:
+            # As datas inválidas já são informadas pela função get_dates_between_dates.
+            datas = get_dates_between_dates(self.data_inicial, self.data_final)
+            if datas == []:
+                return None
+
+        try:
+            resultado = self._executa_plano(datas if self._dados is None else None)
+        except KeyError:
+            print("Uma ou mais colunas da consulta não estão nas colunas do dataframe, tente verificar as colunas da consulta.")
+            return None
+
+        if self._agregacao == None:
+            return resultado if self._colunas == None else resultado[self._colunas]
+        if self._chaves not in (None, []) and len(resultado) > 0:
+            # As chaves categóricas são ordenadas pelos valores, e não pela ordem das categorias (a do dicionário, no cache).
+            resultado = resultado.sort_values(self._chaves, kind="stable",
+                                              key=lambda serie: serie.astype(serie.cat.categories.dtype)
+                                              if isinstance(serie.dtype, pd.CategoricalDtype) else serie)
+            resultado = resultado.reset_index(drop=True)
+        return resultado
+
+    def _executa_plano(self, datas:list) -> pd.DataFrame:
+        """Lê os dados pelo plano escolhido e aplica os filtros e a agregação, sem ordenar o resultado.
+
+        Parameters
+        ----------
+        datas : list
+            Os meses da consulta, como "AAAAmm", ou None na consulta a um dataframe.
+
+        Returns
+        -------
+        pd.DataFrame
+            As linhas filtradas, ou a agregação da consulta.
+        """
+        if self._cubo_responde():
+            cubo = le_cubo(self.path)
+            periodo = cubo["ANO_VENDA"].astype("int32") * 100 + cubo["MES_VENDA"].astype("int32")
+            cubo = cubo[periodo.between(int(datas[0]), int(datas[-1]))]
+            if "PRINCIPIO_ATIVO_BASE" in list(self._chaves or []) + [coluna for filtro in self._filtros for coluna in filtro]:
+                cubo = adiciona_principio_ativo_base(cubo)
+            for filtro in self._filtros:
+                cubo = cubo[_mascara_where(cubo, filtro)]
+            coluna_contada = "VENDAS" if self._agregacao[0] == "conta" else self._agregacao[1]
+            return self._agrega(cubo, coluna_contada)
+
+        if self._agregacao == None:
+            return concatena_com_esquema(list(self._linhas_e_blocos()))
+
+        # A agregação é feita em cada bloco, e apenas as agregações parciais são guardadas.
+        parciais = [self._agrega(bloco) for bloco in self._linhas_e_blocos()]
+        if parciais == []:
+            return pd.DataFrame(columns=list(self._chaves or []) + [self._agregacao[2]])
+        return self._agrega(concatena_com_esquema(parciais), self._agregacao[2])
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
@@ -0,0 +1,398 @@
+"""Módulo que mantém o cubo de agregados mensais usado pelas visualizações.
+
+Todas as visualizações contam vendas por ano, mês, estado e princípio ativo. O cubo guarda essas contagens
+já calculadas, junto com a soma de "QTD_UNIDADE_FARMACOTECNICA", agrupadas por ANO_VENDA, MES_VENDA,
+UF_VENDA, PRINCIPIO_ATIVO e SEXO, em um único arquivo Parquet ("dados/cubo.parquet"). Ele é montado
+uma única vez a partir dos dados brutos, e a função "consulta_cubo" responde as contagens das
+visualizações sem ler novamente os csv. Quando um mês novo é publicado, "atualiza_cubo" calcula apenas
+esse mês (módulo derivados).
+"""
+
+import sys, os
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(esse_caminho)
+
+import pandas as pd
+import doctest
+from get_data import get_dates_between_dates, caminho_do_mes
+from esquema import aplica_esquema, concatena_com_esquema
+from utils import _blocos_do_mes, _mascara_where
+from derivados import atualiza_por_mes, meses_desatualizados, SUFIXO_VERSOES
+from dicionarios import adiciona_principio_ativo_base
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+# Colunas que identificam cada linha do cubo.
+CHAVES_DO_CUBO = ["ANO_VENDA", "MES_VENDA", "UF_VENDA", "PRINCIPIO_ATIVO", "SEXO"]
+
+# Colunas que podem ser consultadas sem estarem no cubo, geradas a partir das chaves na consulta.
+COLUNAS_DERIVADAS_DO_CUBO = ["PRINCIPIO_ATIVO_BASE"]
+
+# Colunas de valores do cubo: o número de vendas (linhas da base) e a soma das unidades vendidas.
+VALORES_DO_CUBO = ["VENDAS", "QTD_UNIDADE_FARMACOTECNICA"]
+
+# Nome do arquivo do cubo, dentro da pasta dos dados.
+ARQUIVO_CUBO = "cubo.parquet"
+
+# Cubos já lidos nesta execução, pelo caminho e pela data de modificação do arquivo.
+_cubos_lidos = {}
+
+
+def caminho_do_cubo(path:str = "dados") -> str:
+    """Retorna o caminho do arquivo do cubo.
+
+    Parameters
+    ----------
+    path : str, optional
+        A pasta dos dados, by default "dados"
+
+    Returns
+    -------
+    str
+        O caminho do arquivo do cubo.
+
+    Test
+    ----------
+    >>> caminho_do_cubo("dados").replace(os.sep, "/")
+    'dados/cubo.parquet'
+    """
+    return os.path.join(path, ARQUIVO_CUBO)
+
+
+def _agrega(dados:pd.DataFrame) -> pd.DataFrame:
+    """Agrupa as linhas pelas chaves do cubo, contando as vendas e somando as unidades.
+
+    Parameters
+    ----------
+    dados : pd.DataFrame
+        Dataframe com as chaves do cubo e a coluna "QTD_UNIDADE_FARMACOTECNICA", ou com as colunas de valores do cubo.
+
+    Returns
+    -------
+    pd.DataFrame
+        O dataframe agregado, com as chaves e os valores do cubo como colunas.
+
+    Test
+    ----------
+    >>> dados = pd.DataFrame({"ANO_VENDA": [2014] * 3, "MES_VENDA": [1] * 3, "UF_VENDA": ["SP", "SP", "RJ"],
+    ...                       "PRINCIPIO_ATIVO": ["ZOLPIDEM"] * 3, "SEXO": [1, 1, None], "QTD_UNIDADE_FARMACOTECNICA": [30, 60, 10]})
+    >>> _agrega(dados)[["UF_VENDA", "SEXO", "VENDAS", "QTD_UNIDADE_FARMACOTECNICA"]].values.tolist()
+    [['SP', 1.0, 2, 90.0], ['RJ', nan, 1, 10.0]]
+    """
+    if "VENDAS" not in dados.columns:
+        # Cada linha da base é uma venda.
+        dados = dados[CHAVES_DO_CUBO].assign(VENDAS=1, QTD_UNIDADE_FARMACOTECNICA=dados["QTD_UNIDADE_FARMACOTECNICA"].astype("float64"))
+    agregado = dados.groupby(CHAVES_DO_CUBO, observed=True, dropna=False, sort=False)[VALORES_DO_CUBO].sum().reset_index()
+    agregado["VENDAS"] = agregado["VENDAS"].astype("int64")
+    return agregado
+
+
+def _tipos_do_cubo(cubo:pd.DataFrame) -> pd.DataFrame:
+    """Aplica o esquema às chaves do cubo, mantendo os valores somados em 64 bits.
+
+    O esquema guarda "QTD_UNIDADE_FARMACOTECNICA" como float32, suficiente para cada venda, mas as somas
+    do cubo passam de 2^24 e perderiam precisão. Por isso "VENDAS" fica como int64 e as unidades como float64.
+
+    Parameters
+    ----------
+    cubo : pd.DataFrame
+        Dataframe com as chaves e os valores do cubo.
+
+    Returns
+    -------
+    pd.DataFrame
+        O cubo com as chaves nos tipos do esquema e os valores em 64 bits.
+
+    Test
+    ----------
+    >>> cubo = pd.DataFrame({"UF_VENDA": ["SP"], "VENDAS": [2], "QTD_UNIDADE_FARMACOTECNICA": [16777217.0]})
+    >>> cubo = _tipos_do_cubo(cubo)
+    >>> cubo.dtypes.astype(str).tolist(), cubo["QTD_UNIDADE_FARMACOTECNICA"].tolist()
+    (['category', 'int64', 'float64'], [16777217.0])
+    """
+    chaves = [coluna for coluna in cubo.columns if coluna not in VALORES_DO_CUBO]
+    valores = {"VENDAS": cubo["VENDAS"].astype("int64"),
+               "QTD_UNIDADE_FARMACOTECNICA": cubo["QTD_UNIDADE_FARMACOTECNICA"].astype("float64")}
+    return aplica_esquema(cubo[chaves]).assign(**valores)[list(cubo.columns)]
+
+
+def agrega_mes(ano:str, mes:str, path:str = "dados", file_names:str = "Manipulados") -> pd.DataFrame:
+    """Calcula as linhas do cubo de um mês, lendo o mês em blocos.
+
+    Parameters
+    ----------
+    ano : str
+        O ano do arquivo, ex: "2014".
+    mes : str
+        O mês do arquivo com dois dígitos, ex: "01".
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    pd.DataFrame
+        As linhas do cubo do mês, ou None caso o mês não possa ser lido.
+
+    Test
+    ----------
+    >>> agrega_mes("2014", "01", "PASTA_INEXISTENTE")
+    Não foi possível converter 'PASTA_INEXISTENTE/Manipulados_2014_01.csv' em dataframe
+    [Errno 2] No such file or directory: 'PASTA_INEXISTENTE/Manipulados_2014_01.csv'
+    """
+    # Os blocos são lidos diretamente, e não por iter_data_by_dates, para que um erro de leitura no meio do
+    # mês não seja confundido com um mês sem vendas.
+    try:
+        parciais = [_agrega(bloco) for bloco in _blocos_do_mes(path, file_names, ano, mes,
+                                                                CHAVES_DO_CUBO + ["QTD_UNIDADE_FARMACOTECNICA"])]
+    except Exception as err:
+        print(f"Não foi possível converter '{caminho_do_mes(path, ano, mes, file_names)}' em dataframe")
+        print(err)
+        return None
+    if parciais == []:
+        return pd.DataFrame(columns=CHAVES_DO_CUBO + VALORES_DO_CUBO)
+    return _tipos_do_cubo(_agrega(concatena_com_esquema(parciais)))
+
+
+def constroi_cubo(data_inicial:str, data_final:str, path:str = "dados", file_names:str = "Manipulados") -> str:
+    """Monta o cubo do zero com os meses entre as datas dadas e o salva na pasta dos dados.
+
+    Parameters
+    ----------
+    data_inicial : str
+        A data do primeiro mês do cubo.
+    data_final : str
+        A data do último mês do cubo.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    str
+        O caminho do cubo salvo, ou None caso ele não tenha sido salvo.
+
+    Test
+    ----------
+    >>> constroi_cubo("2013/01", "2014/01")
+    Problemas com a primeira data inserida: 2013/01
+    Formato da data está incorreto ou ela não está entre Janeiro de 2014 e Novembro de 2021, tente inserir como ANO/mês, ex: '2015/05'.
+    """
+    caminho_cubo = caminho_do_cubo(path)
+    if get_dates_between_dates(data_inicial, data_final) == []:
+        return None
+    if os.path.isfile(caminho_cubo + SUFIXO_VERSOES):
+        os.remove(caminho_cubo + SUFIXO_VERSOES)
+
+    if atualiza_cubo(data_inicial, data_final, path, file_names) == None or not os.path.isfile(caminho_cubo):
+        return None
+    return caminho_cubo
+
+
+def atualiza_cubo(data_inicial:str, data_final:str, path:str = "dados", file_names:str = "Manipulados") -> list:
+    """Atualiza o cubo calculando apenas os meses entre as datas dadas que são novos ou que mudaram desde a última vez.
+
+    Parameters
+    ----------
+    data_inicial : str
+        A data do primeiro mês do cubo.
+    data_final : str
+        A data do último mês do cubo.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    list
+        Os meses calculados, como "AAAAmm", ou None caso o pyarrow não esteja instalado.
+
+    Test
+    ----------
+    >>> atualiza_cubo("2014/01", "2014/01", "PASTA_INEXISTENTE")
+    []
+    """
+    try:
+        if pq == None:
+            raise ImportError
+    except ImportError:
+        print("O cubo precisa da biblioteca pyarrow, tente instalá-la com 'pip install pyarrow'.")
+        return None
+
+    return atualiza_por_mes(caminho_do_cubo(path), data_inicial, data_final,
+                            lambda ano, mes: agrega_mes(ano, mes, path, file_names),
+                            lambda caminho_cubo: pd.read_parquet(caminho_cubo, engine="pyarrow"),
+                            _escreve_cubo, path, file_names)
+
+
+def salva_cubo(cubo:pd.DataFrame, path:str = "dados") -> str:
+    """Salva o cubo ordenado por ano e mês, em um arquivo temporário trocado pelo definitivo.
+
+    Parameters
+    ----------
+    cubo : pd.DataFrame
+        O dataframe do cubo.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+
+    Returns
+    -------
+    str
+        O caminho do cubo salvo.
+    """
+    return _escreve_cubo(cubo, caminho_do_cubo(path))
+
+
+def _escreve_cubo(cubo:pd.DataFrame, caminho_cubo:str) -> str:
+    """Escreve o cubo no caminho dado, em um arquivo temporário trocado pelo definitivo.
+
+    Parameters
+    ----------
+    cubo : pd.DataFrame
+        O dataframe do cubo.
+    caminho_cubo : str
+        O caminho do arquivo do cubo.
+
+    Returns
+    -------
+    str
+        O caminho do cubo salvo.
+    """
+    if len(cubo.columns) == 0:
+        cubo = pd.DataFrame(columns=CHAVES_DO_CUBO + VALORES_DO_CUBO)
+    cubo = _tipos_do_cubo(cubo.sort_values(["ANO_VENDA", "MES_VENDA"], kind="stable").reset_index(drop=True))
+    cubo.to_parquet(caminho_cubo + ".tmp", engine="pyarrow", compression="zstd", index=False)
+    os.replace(caminho_cubo + ".tmp", caminho_cubo)
+    return caminho_cubo
+
+
+def le_cubo(path:str = "dados") -> pd.DataFrame:
+    """Lê o cubo salvo na pasta dos dados, reaproveitando a leitura anterior caso o arquivo não tenha mudado.
+
+    Parameters
+    ----------
+    path : str, optional
+        A pasta dos dados, by default "dados"
+
+    Returns
+    -------
+    pd.DataFrame
+        O cubo, ou None caso ele ainda não tenha sido montado.
+
+    Test
+    ----------
+    >>> le_cubo("PASTA_INEXISTENTE") is None
+    True
+    """
+    caminho_cubo = caminho_do_cubo(path)
+    if pq == None or not os.path.isfile(caminho_cubo):
+        return None
+
+    versao = os.stat(caminho_cubo).st_mtime_ns
+    if caminho_cubo not in _cubos_lidos or _cubos_lidos[caminho_cubo][0] != versao:
+        # Os cubos salvos por versões anteriores guardam as unidades como float32.
+        _cubos_lidos[caminho_cubo] = (versao, _tipos_do_cubo(pd.read_parquet(caminho_cubo, engine="pyarrow")))
+    return _cubos_lidos[caminho_cubo][1]
+
+
+def cubo_atualizado(data_inicial:str, data_final:str, path:str = "dados", file_names:str = "Manipulados") -> bool:
+    """Verifica se o cubo existe e se todos os meses entre as datas dadas estão atualizados nele.
+
+    Os meses baixados ou alterados depois da última atualização do cubo (função atualiza_cubo) ainda não
+    estão no cubo, e as consultas desses meses devem ser feitas nos dados brutos.
+
+    Parameters
+    ----------
+    data_inicial : str
+        A data do primeiro mês.
+    data_final : str
+        A data do último mês.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    bool
+        True caso o cubo possa responder as consultas entre as datas dadas.
+
+    Test
+    ----------
+    >>> cubo_atualizado("2014/01", "2014/01", "PASTA_INEXISTENTE")
+    False
+    """
+    if le_cubo(path) is None:
+        return False
+    return meses_desatualizados(caminho_do_cubo(path), data_inicial, data_final, path, file_names) == []
+
+
+def consulta_cubo(agrupar_por:list, where:dict = None, path:str = "dados") -> pd.DataFrame:
+    """Soma as vendas e as unidades do cubo pelas colunas pedidas.
+
+    Parameters
+    ----------
+    agrupar_por : list
+        As chaves do cubo pelas quais os valores são somados, ex: ["ANO_VENDA", "UF_VENDA"]. A coluna
+        PRINCIPIO_ATIVO_BASE também pode ser usada, e soma juntos os sais e as grafias de cada substância.
+    where : dict, optional
+        O valor (ou lista de valores) aceito em cada chave, ex: {"PRINCIPIO_ATIVO": ["ZOLPIDEM"]}, by default None
+    path : str, optional
+        A pasta dos dados, by default "dados"
+
+    Returns
+    -------
+    pd.DataFrame
+        Dataframe com as colunas pedidas, "VENDAS" e "QTD_UNIDADE_FARMACOTECNICA", ordenado pelas colunas pedidas,
+        ou None caso o cubo não exista ou a consulta seja inválida.
+
+    Test
+    ----------
+    >>> consulta_cubo(["ANO_VENDA"], path="PASTA_INEXISTENTE")
+    O cubo ainda não foi montado, tente montá-lo com a função constroi_cubo.
+
+    >>> consulta_cubo(["IDADE"], path="PASTA_INEXISTENTE")
+    As colunas da consulta devem ser chaves do cubo: ANO_VENDA, MES_VENDA, UF_VENDA, PRINCIPIO_ATIVO, SEXO, PRINCIPIO_ATIVO_BASE.
+    """
+    try:
+        if type(agrupar_por) != list or any(coluna not in CHAVES_DO_CUBO + COLUNAS_DERIVADAS_DO_CUBO
+                                            for coluna in agrupar_por + list(where or {})):
+            raise ValueError
+    except ValueError:
+        print("As colunas da consulta devem ser chaves do cubo: " + ", ".join(CHAVES_DO_CUBO + COLUNAS_DERIVADAS_DO_CUBO) + ".")
+        return None
+
+    cubo = le_cubo(path)
+    try:
+        if cubo is None:
+            raise FileNotFoundError
+    except FileNotFoundError:
+        print("O cubo ainda não foi montado, tente montá-lo com a função constroi_cubo.")
+        return None
+
+    if "PRINCIPIO_ATIVO_BASE" in agrupar_por + list(where or {}):
+        # A base é calculada nas categorias do princípio ativo, e não em cada linha do cubo.
+        cubo = adiciona_principio_ativo_base(cubo)
+    if where != None:
+        cubo = cubo[_mascara_where(cubo, where)]
+    if agrupar_por == []:
+        return cubo[VALORES_DO_CUBO].sum().to_frame().T
+
+    consulta = cubo.groupby(agrupar_por, observed=True, dropna=False)[VALORES_DO_CUBO].sum().reset_index()
+    return consulta
+
+
+if __name__ == "__main__":
+    # Monta o cubo de toda a base, ou apenas adiciona os meses novos a um cubo já montado.
+    """
+    constroi_cubo("2014/01", "2021/11")
+    atualiza_cubo("2014/01", "2021/11")
+    """
+
+    doctest.testmod(verbose=True)
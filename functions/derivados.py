@@ -0,0 +1,188 @@
+"""Módulo que mantém atualizados, mês a mês, os dados derivados da base (o cubo, os csv filtrados das visualizações).
+
+Cada dado derivado tem as colunas ANO_VENDA e MES_VENDA e é salvo junto de um arquivo de versões
+("<arquivo>.versoes.json"), que guarda a versão de cada mês da base usada para calculá-lo. A versão de um
+mês é o tamanho e a data de modificação do seu csv, comprimido ou não (ou do seu arquivo no cache colunar,
+caso o csv não exista), então quando um mês novo é publicado ou um mês é baixado novamente, apenas esse mês fica desatualizado
+e apenas ele é calculado de novo.
+"""
+
+import sys, os
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(esse_caminho)
+
+import json
+import pandas as pd
+import doctest
+from get_data import get_dates_between_dates, caminho_do_mes
+from esquema import concatena_com_esquema
+from cache_colunar import caminho_cache_mes, cache_atualizado, converte_para_parquet
+
+# Final do nome do arquivo de versões de cada dado derivado.
+SUFIXO_VERSOES = ".versoes.json"
+
+
+def versao_do_mes(ano:str, mes:str, path:str = "dados", file_names:str = "Manipulados") -> str:
+    """Retorna a versão do mês da base, pelo tamanho e pela data de modificação do seu arquivo.
+
+    Parameters
+    ----------
+    ano : str
+        O ano do arquivo, ex: "2014".
+    mes : str
+        O mês do arquivo com dois dígitos, ex: "01".
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    str
+        A versão do mês, ou None caso o mês não esteja na pasta dos dados.
+
+    Test
+    ----------
+    >>> versao_do_mes("2014", "01", "PASTA_INEXISTENTE") is None
+    True
+    """
+    for caminho_arquivo in [caminho_do_mes(path, ano, mes, file_names), caminho_cache_mes(ano, mes, path, file_names)]:
+        if os.path.isfile(caminho_arquivo):
+            informacoes = os.stat(caminho_arquivo)
+            return f"{informacoes.st_size}-{informacoes.st_mtime_ns}"
+    return None
+
+
+def le_versoes(caminho_derivado:str) -> dict:
+    """Lê as versões dos meses usados no dado derivado.
+
+    Parameters
+    ----------
+    caminho_derivado : str
+        O caminho do arquivo do dado derivado.
+
+    Returns
+    -------
+    dict
+        A versão de cada mês, com os meses como "AAAAmm", vazio caso o dado derivado não exista.
+
+    Test
+    ----------
+    >>> le_versoes("PASTA_INEXISTENTE/cubo.parquet")
+    {}
+    """
+    if not os.path.isfile(caminho_derivado) or not os.path.isfile(caminho_derivado + SUFIXO_VERSOES):
+        return {}
+    try:
+        with open(caminho_derivado + SUFIXO_VERSOES, "r", encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return {}
+
+
+def meses_desatualizados(caminho_derivado:str, data_inicial:str, data_final:str, path:str = "dados",
+                         file_names:str = "Manipulados") -> list:
+    """Retorna os meses entre as datas dadas cuja versão na base é diferente da usada no dado derivado.
+
+    Parameters
+    ----------
+    caminho_derivado : str
+        O caminho do arquivo do dado derivado.
+    data_inicial : str
+        A data do primeiro mês.
+    data_final : str
+        A data do último mês.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    list
+        Os meses desatualizados, como "AAAAmm". Meses que não estão na pasta dos dados não são incluídos.
+    """
+    versoes = le_versoes(caminho_derivado)
+    desatualizados = []
+    for cada_data in get_dates_between_dates(data_inicial, data_final):
+        versao = versao_do_mes(cada_data[:4], cada_data[-2:], path, file_names)
+        if versao != None and versoes.get(cada_data) != versao:
+            desatualizados.append(cada_data)
+    return desatualizados
+
+
+def atualiza_por_mes(caminho_derivado:str, data_inicial:str, data_final:str, calcula_mes, le_derivado, salva_derivado,
+                     path:str = "dados", file_names:str = "Manipulados") -> list:
+    """Atualiza o dado derivado calculando apenas os meses desatualizados.
+
+    As linhas antigas dos meses desatualizados são descartadas e as novas são adicionadas, o resto do dado
+    derivado é mantido como está. As versões são salvas depois do dado derivado, então uma atualização
+    interrompida é refeita na próxima vez. Um mês cujo cache colunar é mais antigo que o csv é convertido
+    novamente antes do cálculo, assim o cálculo lê o csv novo e as próximas leituras voltam a usar o cache.
+
+    Parameters
+    ----------
+    caminho_derivado : str
+        O caminho do arquivo do dado derivado.
+    data_inicial : str
+        A data do primeiro mês.
+    data_final : str
+        A data do último mês.
+    calcula_mes : Callable[[str, str], pd.DataFrame]
+        Função que recebe o ano e o mês ("2014", "01") e retorna as linhas do dado derivado desse mês,
+        ou None caso o mês não possa ser calculado.
+    le_derivado : Callable[[str], pd.DataFrame]
+        Função que lê o dado derivado do seu caminho.
+    salva_derivado : Callable[[pd.DataFrame, str], object]
+        Função que salva o dado derivado no seu caminho.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    list
+        Os meses desatualizados encontrados, como "AAAAmm".
+    """
+    desatualizados = meses_desatualizados(caminho_derivado, data_inicial, data_final, path, file_names)
+    if desatualizados == []:
+        return desatualizados
+
+    versoes = le_versoes(caminho_derivado)
+    partes = []
+    if versoes != {}:
+        derivado = le_derivado(caminho_derivado)
+        chaves = derivado["ANO_VENDA"].astype("int32") * 100 + derivado["MES_VENDA"].astype("int32")
+        descartadas = [int(cada_data[:4]) * 100 + int(cada_data[-2:]) for cada_data in desatualizados]
+        partes.append(derivado[~chaves.isin(descartadas)])
+
+    novas_versoes = {}
+    for cada_data in desatualizados:
+        ano, mes = cada_data[:4], cada_data[-2:]
+        if os.path.isfile(caminho_cache_mes(ano, mes, path, file_names)) and not cache_atualizado(ano, mes, path, file_names):
+            converte_para_parquet(f"{ano}/{mes}", f"{ano}/{mes}", path, file_names, sobrescrever=True)
+        # A versão é lida antes do cálculo, assim um mês alterado durante o cálculo continua desatualizado.
+        versao = versao_do_mes(cada_data[:4], cada_data[-2:], path, file_names)
+        parte = calcula_mes(cada_data[:4], cada_data[-2:])
+        # Um mês que não pôde ser calculado continua desatualizado.
+        if parte is not None:
+            novas_versoes[cada_data] = versao
+            partes.append(parte)
+
+    partes = [cada_parte for cada_parte in partes if len(cada_parte.columns) > 0]
+    atualizado = concatena_com_esquema(partes)
+    if len(atualizado.columns) > 0:
+        atualizado = atualizado.sort_values(["ANO_VENDA", "MES_VENDA"], kind="stable").reset_index(drop=True)
+    salva_derivado(atualizado, caminho_derivado)
+
+    versoes.update(novas_versoes)
+    with open(caminho_derivado + SUFIXO_VERSOES + ".tmp", "w", encoding="utf-8") as arquivo:
+        json.dump(versoes, arquivo, indent=4, sort_keys=True)
+    os.replace(caminho_derivado + SUFIXO_VERSOES + ".tmp", caminho_derivado + SUFIXO_VERSOES)
+
+    return desatualizados
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
@@ -0,0 +1,280 @@
+"""Módulo que mantém os dicionários globais das colunas de texto com muitos valores diferentes.
+
+Cada coluna de "COLUNAS_DICIONARIZADAS" tem um dicionário salvo na pasta dos dados
+("dicionarios/Manipulados.PRINCIPIO_ATIVO.json"), que é a lista de todos os valores já vistos na base.
+O código de um valor é a sua posição na lista, e os valores novos são sempre adicionados ao final, então
+o código de um valor nunca muda. O cache colunar salva cada mês com as categorias do dicionário, assim
+todos os meses têm os mesmos códigos e a concatenação e os agrupamentos trabalham apenas com inteiros.
+
+A coluna PRINCIPIO_ATIVO_BASE, que não existe nos csv, é gerada junto dos dicionários: cada princípio ativo
+do dicionário é normalizado uma única vez (sem acentos e sem o sal, "DIFOSFATO DE CLOROQUINA" vira
+"CLOROQUINA"), e as linhas recebem o código da sua substância base pela tabela dessa normalização.
+"""
+
+import sys, os
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(esse_caminho)
+
+import json
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+import doctest
+
+# Pasta dos dicionários, dentro da pasta dos dados.
+PASTA_DICIONARIOS = "dicionarios"
+
+# Colunas que usam os dicionários globais.
+COLUNAS_DICIONARIZADAS = ["MUNICIPIO_VENDA", "PRINCIPIO_ATIVO", "PRINCIPIO_ATIVO_BASE", "DCB", "CID10"]
+
+# Sais retirados do nome do princípio ativo para chegar à substância base, antes ("SULFATO DE ...") ou depois do nome.
+SAIS_DOS_PRINCIPIOS = ["ACETATO", "BENZOATO", "BESILATO", "BROMETO", "BROMIDRATO", "CIPIONATO", "CITRATO",
+                       "CLORETO", "CLORIDRATO", "DECANOATO", "ENANTATO", "FOSFATO", "FUMARATO", "HIDROBROMETO",
+                       "IODIDRATO", "LACTATO", "MALEATO", "MESILATO", "NITRATO", "OXALATO", "PROPIONATO",
+                       "SUCCINATO", "SULFATO", "TARTARATO", "UNDECILATO"]
+
+# Os sais podem ter um prefixo de quantidade, como em "DIFOSFATO" e "HEMITARTARATO".
+_SAL = "(?:DI|TRI|HEMI|SESQUI|MONO)?(?:" + "|".join(SAIS_DOS_PRINCIPIOS) + ")"
+_SAL_ANTES = re.compile(r"^(?:" + _SAL + r" DE )+")
+_SAL_DEPOIS = re.compile(r"(?: " + _SAL + r")+$")
+
+# Dicionários já lidos, com a data de modificação do arquivo na leitura.
+_dicionarios_lidos = {}
+
+# Substância base de cada princípio ativo já normalizado.
+_bases_normalizadas = {}
+
+
+def caminho_dicionario(coluna:str, path:str = "dados", file_names:str = "Manipulados") -> str:
+    """Retorna o caminho do arquivo do dicionário de uma coluna.
+
+    Parameters
+    ----------
+    coluna : str
+        O nome da coluna.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    str
+        O caminho do arquivo json do dicionário.
+
+    Test
+    ----------
+    >>> caminho_dicionario("DCB", "dados").replace(os.sep, "/")
+    'dados/dicionarios/Manipulados.DCB.json'
+    """
+    return os.path.join(path, PASTA_DICIONARIOS, f"{file_names}.{coluna}.json")
+
+
+def le_dicionario(coluna:str, path:str = "dados", file_names:str = "Manipulados") -> list:
+    """Lê o dicionário de uma coluna, reaproveitando a leitura anterior caso o arquivo não tenha mudado.
+
+    Parameters
+    ----------
+    coluna : str
+        O nome da coluna.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    list
+        Os valores da coluna na ordem dos seus códigos, vazia caso o dicionário ainda não exista.
+
+    Test
+    ----------
+    >>> le_dicionario("DCB", "PASTA_INEXISTENTE")
+    []
+    """
+    caminho = caminho_dicionario(coluna, path, file_names)
+    if not os.path.isfile(caminho):
+        return []
+
+    versao = os.stat(caminho).st_mtime_ns
+    if caminho not in _dicionarios_lidos or _dicionarios_lidos[caminho][0] != versao:
+        with open(caminho, "r", encoding="utf-8") as arquivo:
+            _dicionarios_lidos[caminho] = (versao, json.load(arquivo))
+    return _dicionarios_lidos[caminho][1]
+
+
+def _salva_dicionario(valores:list, caminho:str) -> str:
+    """Salva o dicionário no caminho dado, passando por um arquivo temporário.
+
+    Parameters
+    ----------
+    valores : list
+        Os valores da coluna na ordem dos seus códigos.
+    caminho : str
+        O caminho do arquivo json do dicionário.
+
+    Returns
+    -------
+    str
+        O caminho do dicionário salvo.
+    """
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho + ".tmp", "w", encoding="utf-8") as arquivo:
+        json.dump(valores, arquivo, ensure_ascii=False)
+    os.replace(caminho + ".tmp", caminho)
+    return caminho
+
+
+def normaliza_principio_ativo(principio:str) -> str:
+    """Retorna a substância base de um princípio ativo, sem acentos, sem pontuação e sem o sal.
+
+    Parameters
+    ----------
+    principio : str
+        O princípio ativo, como aparece na coluna PRINCIPIO_ATIVO.
+
+    Returns
+    -------
+    str
+        A substância base, ou o próprio valor caso ele não seja um texto (como os nulos).
+
+    Test
+    ----------
+    >>> normaliza_principio_ativo("DIFOSFATO DE CLOROQUINA"), normaliza_principio_ativo("hemitartarato de  zolpidem")
+    ('CLOROQUINA', 'ZOLPIDEM')
+
+    >>> normaliza_principio_ativo("Codeína"), normaliza_principio_ativo("SERTRALINA, CLORIDRATO")
+    ('CODEINA', 'SERTRALINA')
+    """
+    if type(principio) != str:
+        return principio
+    if principio not in _bases_normalizadas:
+        sem_acentos = unicodedata.normalize("NFKD", principio).encode("ascii", "ignore").decode("ascii")
+        base = " ".join(re.sub(r"[^A-Z0-9]+", " ", sem_acentos.upper()).split())
+        # Um nome que é apenas o sal (como "SULFATO DE") é mantido como está.
+        sem_sal = _SAL_DEPOIS.sub("", _SAL_ANTES.sub("", base))
+        _bases_normalizadas[principio] = sem_sal if sem_sal != "" else base
+    return _bases_normalizadas[principio]
+
+
+def adiciona_principio_ativo_base(dados:pd.DataFrame) -> pd.DataFrame:
+    """Adiciona ao dataframe a coluna categórica PRINCIPIO_ATIVO_BASE, com a substância base de cada linha.
+
+    A normalização é feita apenas nas categorias de PRINCIPIO_ATIVO, e os códigos das linhas são
+    convertidos pela tabela resultante, sem percorrer os textos das linhas.
+
+    Parameters
+    ----------
+    dados : pd.DataFrame
+        O dataframe com a coluna PRINCIPIO_ATIVO.
+
+    Returns
+    -------
+    pd.DataFrame
+        O dataframe com a coluna PRINCIPIO_ATIVO_BASE, ou o próprio dataframe caso ele não tenha a coluna PRINCIPIO_ATIVO.
+
+    Test
+    ----------
+    >>> dados = pd.DataFrame({"PRINCIPIO_ATIVO": ["ZOLPIDEM", None, "HEMITARTARATO DE ZOLPIDEM", "SULFATO DE CLOROQUINA"]})
+    >>> adiciona_principio_ativo_base(dados)["PRINCIPIO_ATIVO_BASE"].tolist()
+    ['ZOLPIDEM', nan, 'ZOLPIDEM', 'CLOROQUINA']
+    """
+    if "PRINCIPIO_ATIVO" not in dados.columns:
+        return dados
+    serie = dados["PRINCIPIO_ATIVO"]
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype("category")
+
+    # Código da base de cada categoria, com uma posição a mais no final para o código -1 dos nulos.
+    codigos_das_bases, bases = pd.factorize(pd.Index([normaliza_principio_ativo(valor) for valor in serie.cat.categories], dtype=object))
+    codigos = np.append(codigos_das_bases, -1)[serie.cat.codes.to_numpy()]
+    return dados.assign(PRINCIPIO_ATIVO_BASE=pd.Categorical.from_codes(codigos, categories=bases))
+
+
+def atualiza_dicionarios(dados:pd.DataFrame, path:str = "dados", file_names:str = "Manipulados") -> pd.DataFrame:
+    """Adiciona aos dicionários os valores novos do dataframe e converte as suas colunas para os códigos globais.
+
+    Parameters
+    ----------
+    dados : pd.DataFrame
+        O dataframe de um mês, com as colunas dicionarizadas categóricas ou de texto.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    pd.DataFrame
+        O dataframe com as colunas dicionarizadas categóricas, com as categorias na ordem do dicionário,
+        e com a coluna PRINCIPIO_ATIVO_BASE caso ele tenha a coluna PRINCIPIO_ATIVO.
+    """
+    if "PRINCIPIO_ATIVO_BASE" not in dados.columns:
+        dados = adiciona_principio_ativo_base(dados)
+
+    convertidas = {}
+    for coluna in COLUNAS_DICIONARIZADAS:
+        if coluna not in dados.columns:
+            continue
+        serie = dados[coluna]
+        if not isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype("category")
+
+        dicionario = le_dicionario(coluna, path, file_names)
+        conhecidos = set(dicionario)
+        novos = [valor for valor in serie.cat.categories.tolist() if valor not in conhecidos]
+        if novos != []:
+            dicionario = dicionario + sorted(novos, key=str)
+            _salva_dicionario(dicionario, caminho_dicionario(coluna, path, file_names))
+        convertidas[coluna] = serie.cat.set_categories(dicionario)
+
+    if convertidas == {}:
+        return dados
+    return dados.assign(**convertidas)
+
+
+def aplica_dicionarios(dados:pd.DataFrame, path:str = "dados", file_names:str = "Manipulados") -> pd.DataFrame:
+    """Completa as categorias das colunas dicionarizadas com os valores atuais dos dicionários.
+
+    Um mês salvo antes de outros meses terem adicionado valores ao dicionário tem como categorias apenas
+    o começo do dicionário. Como os códigos são estáveis, basta adicionar as categorias que faltam, sem
+    alterar os códigos já lidos. Colunas com valores fora do dicionário são mantidas como estão.
+
+    Parameters
+    ----------
+    dados : pd.DataFrame
+        O dataframe lido do cache colunar.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    pd.DataFrame
+        O dataframe com as categorias de cada coluna dicionarizada iguais ao seu dicionário.
+
+    Test
+    ----------
+    >>> dados = pd.DataFrame({"DCB": pd.Categorical(["A"])})
+    >>> aplica_dicionarios(dados, "PASTA_INEXISTENTE") is dados
+    True
+    """
+    convertidas = {}
+    for coluna in COLUNAS_DICIONARIZADAS:
+        if coluna not in dados.columns or not isinstance(dados[coluna].dtype, pd.CategoricalDtype):
+            continue
+        dicionario = le_dicionario(coluna, path, file_names)
+        categorias = dados[coluna].cat.categories
+        if len(categorias) >= len(dicionario) or categorias.tolist() != dicionario[:len(categorias)]:
+            continue
+        convertidas[coluna] = dados[coluna].cat.add_categories(dicionario[len(categorias):])
+
+    if convertidas == {}:
+        return dados
+    return dados.assign(**convertidas)
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
@@ -0,0 +1,199 @@
+"""Módulo com o esquema de tipos das colunas da base de dados de medicamentos manipulados.
+
+Os tipos seguem o dicionário de dados da ANVISA (dados/metadados/Documentacao_e_Dicionario_de_Dados_SNGPC_Manipulados.pdf):
+colunas de texto que se repetem muito (UF, município, princípio ativo, unidades, conselho, CID10) são categóricas,
+os códigos numéricos pequenos (mês, tipo de receituário, sexo, unidade da idade) são inteiros de 8 bits, o ano e a
+idade são inteiros de 16 bits e as quantidades são float32. Como o dicionário prevê campos não preenchidos,
+as colunas inteiras que podem ser nulas usam os inteiros anuláveis do pandas ("Int8", "Int16").
+Todos os leitores dos módulos utils, get_data e cache_colunar aplicam esse esquema.
+"""
+
+import sys, os
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(esse_caminho)
+
+import pandas as pd
+import doctest
+from pandas.api.types import union_categoricals
+
+ESQUEMA = {"ANO_VENDA": "int16",
+           "MES_VENDA": "int8",
+           "UF_VENDA": "category",
+           "MUNICIPIO_VENDA": "category",
+           "DCB": "category",
+           "PRINCIPIO_ATIVO": "category",
+           "QTD_ATIVO_POR_UNID_FARMACOTEC": "float32",
+           "UNIDADE_MEDIDA_PRINCIPIO_ATIVO": "category",
+           "QTD_UNIDADE_FARMACOTECNICA": "float32",
+           "TIPO_UNIDADE_FARMACOTECNICA": "category",
+           "CONSELHO_PRESCRITOR": "category",
+           "UF_CONSELHO_PRESCRITOR": "category",
+           "TIPO_RECEITUARIO": "Int8",
+           "CID10": "category",
+           "SEXO": "Int8",
+           "IDADE": "Int16",
+           "UNIDADE_IDADE": "Int8",
+           # Coluna gerada no cache colunar, com a substância base de cada princípio ativo (módulo dicionarios).
+           "PRINCIPIO_ATIVO_BASE": "category"}
+
+
+def dtypes_de_leitura(colunas:list = None) -> dict:
+    """Retorna os tipos que podem ser passados diretamente ao "pd.read_csv".
+
+    Apenas as colunas categóricas são convertidas durante a leitura, assim os textos repetidos
+    nunca chegam a ser guardados como objetos Python. As colunas numéricas são convertidas
+    depois, por "aplica_esquema", para que valores inesperados não impeçam a leitura.
+
+    Parameters
+    ----------
+    colunas : list, optional
+        As colunas que serão lidas, caso None todas as colunas do esquema, by default None
+
+    Returns
+    -------
+    dict
+        Dicionário com o tipo de cada coluna categórica.
+
+    Test
+    ----------
+    >>> dtypes_de_leitura(["ANO_VENDA", "UF_VENDA"])
+    {'UF_VENDA': 'category'}
+    """
+    return {coluna: tipo for coluna, tipo in ESQUEMA.items()
+            if tipo == "category" and (colunas == None or coluna in colunas)}
+
+
+def _converte_numerico(serie:pd.Series, tipo:str) -> pd.Series:
+    """Converte uma série para o tipo numérico do esquema, aceitando vírgula como separador decimal.
+
+    Parameters
+    ----------
+    serie : pd.Series
+        A série a ser convertida.
+    tipo : str
+        O tipo numérico do esquema.
+
+    Returns
+    -------
+    pd.Series
+        A série convertida.
+
+    Test
+    ----------
+    >>> _converte_numerico(pd.Series(["0,5", "2"]), "float32").tolist()
+    [0.5, 2.0]
+    """
+    if serie.dtype == object:
+        serie = pd.to_numeric(serie.str.replace(",", ".", regex=False))
+    return serie.astype(tipo)
+
+
+def aplica_esquema(dados:pd.DataFrame) -> pd.DataFrame:
+    """Converte as colunas do dataframe que estão no esquema para os seus tipos.
+
+    Colunas fora do esquema são mantidas como estão, assim como as colunas que não puderem ser
+    convertidas (por exemplo um texto em uma coluna numérica).
+
+    Parameters
+    ----------
+    dados : pd.DataFrame
+        O dataframe a ser convertido.
+
+    Returns
+    -------
+    pd.DataFrame
+        O dataframe com os tipos do esquema.
+
+    Test
+    ----------
+    >>> dados = aplica_esquema(pd.DataFrame({"MES_VENDA": [1, 2], "IDADE": [30, None], "UF_VENDA": ["SP", "SP"], "OUTRA": [1, 2]}))
+    >>> dados.dtypes.tolist()
+    [dtype('int8'), Int16Dtype(), CategoricalDtype(categories=['SP'], ordered=False, categories_dtype=object), dtype('int64')]
+
+    >>> aplica_esquema(3)
+    Dataframe inválido, tente inserir outro dataframe.
+    """
+    try:
+        if type(dados) != pd.DataFrame:
+            raise TypeError
+    except TypeError:
+        print("Dataframe inválido, tente inserir outro dataframe.")
+    else:
+        convertidas = {}
+        for coluna in dados.columns:
+            tipo = ESQUEMA.get(coluna)
+            if tipo == None or dados[coluna].dtype == tipo:
+                continue
+            try:
+                if tipo == "category":
+                    convertidas[coluna] = dados[coluna].astype("category")
+                else:
+                    convertidas[coluna] = _converte_numerico(dados[coluna], tipo)
+            except (ValueError, TypeError):
+                continue
+
+        if convertidas == {}:
+            return dados
+        return dados.assign(**convertidas)
+
+
+def concatena_com_esquema(dataframes:list) -> pd.DataFrame:
+    """Concatena dataframes mantendo as colunas categóricas como categóricas.
+
+    Cada mês lido gera suas próprias categorias, e o "pd.concat" transforma em objeto as colunas
+    categóricas com categorias diferentes. Aqui as categorias de cada coluna são unidas antes da
+    concatenação, para que o resultado continue categórico. Quando todos têm as mesmas categorias,
+    como os meses do cache que usam os dicionários globais, a ordem das categorias é mantida.
+
+    Todos os dataframes são concatenados de uma só vez, coluna a coluna, então cada valor é copiado uma única vez.
+
+    Parameters
+    ----------
+    dataframes : list
+        Lista de dataframes com as mesmas colunas.
+
+    Returns
+    -------
+    pd.DataFrame
+        Os dataframes concatenados na ordem da lista.
+
+    Test
+    ----------
+    >>> primeiro = pd.DataFrame({"UF_VENDA": pd.Categorical(["SP"])})
+    >>> segundo = pd.DataFrame({"UF_VENDA": pd.Categorical(["RJ", "SP"])})
+    >>> concatenado = concatena_com_esquema([primeiro, segundo])
+    >>> concatenado["UF_VENDA"].cat.categories.tolist(), concatenado["UF_VENDA"].tolist()
+    (['RJ', 'SP'], ['SP', 'RJ', 'SP'])
+    """
+    # Dataframes sem linhas (como um mês sem nenhuma linha filtrada) não têm os tipos das colunas.
+    com_linhas = [cada_df for cada_df in dataframes if len(cada_df) > 0]
+    if com_linhas != []:
+        dataframes = com_linhas
+
+    if len(dataframes) == 0:
+        return pd.DataFrame()
+    elif len(dataframes) == 1:
+        return dataframes[0]
+
+    colunas = list(dataframes[0].columns)
+    if any(list(cada_df.columns) != colunas for cada_df in dataframes):
+        # Com colunas diferentes, o pandas alinha as colunas e completa os valores faltantes.
+        return pd.concat(dataframes)
+
+    # Concatena coluna a coluna, as categóricas pela união das suas categorias.
+    concatenadas = {}
+    for coluna in colunas:
+        series = [cada_df[coluna] for cada_df in dataframes]
+        if all(isinstance(serie.dtype, pd.CategoricalDtype) for serie in series):
+            # Com as mesmas categorias (meses do cache com o mesmo dicionário) os códigos são apenas copiados.
+            mesmas_categorias = all(serie.dtype == series[0].dtype for serie in series)
+            concatenadas[coluna] = union_categoricals(series, sort_categories=not mesmas_categorias)
+        else:
+            concatenadas[coluna] = pd.concat(series, ignore_index=True).array
+
+    indice = dataframes[0].index.append([cada_df.index for cada_df in dataframes[1:]])
+    return pd.DataFrame(concatenadas, index=indice, columns=colunas)
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
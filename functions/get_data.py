@@ -10,7 +10,45 @@ sys.path.append(esse_caminho)
 
 import pandas as pd
 import os
+import io
+import gzip
+import json
+import time
+import csv
+import codecs
+import hashlib
+import itertools
+import threading
 import doctest
+import requests
+from esquema import ESQUEMA, aplica_esquema, concatena_com_esquema, dtypes_de_leitura
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Endereço de cada arquivo mensal da base, a data deve estar no formato "AAAAmm".
+URL_DADOS = "https://dados.anvisa.gov.br/dados/SNGPC/Manipulados/EDA_Manipulados_{data}.csv"
+
+# Codificação dos arquivos do servidor, a mesma decodificação byte a byte usada pelo "unicode_escape" da leitura original.
+ENCODING_ORIGEM = "latin-1"
+
+# Codificação dos arquivos salvos na pasta dos dados, a única usada pelos leitores locais.
+ENCODING_DOS_DADOS = "utf-8"
+
+# Extensão que o arquivo de saída deve ter para cada compressão suportada.
+EXTENSOES_COMPRESSAO = {None: ".csv", "gzip": ".csv.gz", "zstd": ".csv.zst"}
+
+# Ordem em que as extensões de um arquivo mensal são procuradas na pasta dos dados.
+EXTENSOES_DOS_MESES = [".csv", ".csv.zst", ".csv.gz"]
+
+# Arquivo, dentro da pasta dos dados, que registra o estado de cada mês já sincronizado.
+NOME_MANIFESTO = "manifesto.json"
+
+# Guarda uma sessão HTTP por thread, para reaproveitar as conexões (keep-alive) entre os meses.
+_sessoes = threading.local()
 
 
 def validacao_datas(data_inicial:str, data_final:str) -> True:
@@ -174,7 +212,284 @@ def get_dates_between_dates(data_inicial:str, data_final:str) -> list:
         return lista_datas
 
 
-def download_csv_by_dates(data_inicial:str, data_final:str = None, output_file:str = None) -> pd.DataFrame:
+def caminho_do_mes(caminho:str, ano:str, mes:str, file_names:str = "Manipulados") -> str:
+    """Retorna o caminho do arquivo de um mês na pasta dos dados, comprimido ou não.
+
+    Os meses podem ser salvos como "Manipulados_AAAA_mm.csv", "Manipulados_AAAA_mm.csv.zst" ou
+    "Manipulados_AAAA_mm.csv.gz", e o primeiro que existir, nessa ordem, é usado. Como o "pd.read_csv"
+    reconhece a compressão pela extensão e descomprime o arquivo conforme o lê, todos os leitores da base
+    aceitam os meses comprimidos apenas usando esse caminho.
+
+    Parameters
+    ----------
+    caminho : str
+        A pasta dos dados.
+    ano : str
+        O ano do arquivo, ex: "2014".
+    mes : str
+        O mês do arquivo com dois dígitos, ex: "01".
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    str
+        O caminho do arquivo do mês, ou o caminho do csv sem compressão caso o mês não esteja na pasta.
+
+    Test
+    ----------
+    >>> caminho_do_mes("PASTA_INEXISTENTE", "2014", "01").replace(os.sep, "/")
+    'PASTA_INEXISTENTE/Manipulados_2014_01.csv'
+    """
+    for extensao in EXTENSOES_DOS_MESES:
+        caminho_arquivo = os.path.join(caminho, f"{file_names}_{ano}_{mes}{extensao}")
+        if os.path.isfile(caminho_arquivo):
+            return caminho_arquivo
+    return os.path.join(caminho, f"{file_names}_{ano}_{mes}.csv")
+
+
+def _abre_saida(caminho_arquivo:str, compressao:str = None):
+    """Abre um arquivo binário para escrita, comprimindo o conteúdo conforme ele é escrito.
+
+    Parameters
+    ----------
+    caminho_arquivo : str
+        O caminho do arquivo de saída.
+    compressao : str, optional
+        "gzip", "zstd" ou None para não comprimir, by default None
+
+    Returns
+    -------
+    Um objeto de arquivo binário aberto para escrita.
+    """
+    if compressao == "gzip":
+        return gzip.open(caminho_arquivo, "wb", compresslevel=6)
+    elif compressao == "zstd":
+        return zstandard.ZstdCompressor(level=6).stream_writer(open(caminho_arquivo, "wb"))
+    return open(caminho_arquivo, "wb")
+
+
+def detecta_encoding(amostra:bytes) -> str:
+    """Detecta a codificação de um arquivo da base pelos seus primeiros bytes.
+
+    Os arquivos da base estão em UTF-8 ou em ENCODING_ORIGEM. Como um texto em latin-1 com acentos
+    praticamente nunca é um UTF-8 válido, a amostra é decodificada como UTF-8 e, caso falhe, o arquivo
+    é considerado ENCODING_ORIGEM. Um caractere cortado no fim da amostra não invalida o UTF-8.
+
+    Parameters
+    ----------
+    amostra : bytes
+        Os primeiros bytes do arquivo.
+
+    Returns
+    -------
+    str
+        A codificação do arquivo.
+
+    Test
+    ----------
+    >>> detecta_encoding("SÃO PAULO".encode("utf-8")), detecta_encoding("SÃO PAULO".encode("latin-1"))
+    ('utf-8', 'latin-1')
+    >>> detecta_encoding("GOIÂ".encode("utf-8")[:-1])
+    'utf-8'
+    >>> detecta_encoding(codecs.BOM_UTF8 + b"ANO_VENDA")
+    'utf-8-sig'
+    """
+    if amostra.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(amostra, final=False)
+    except UnicodeDecodeError:
+        return ENCODING_ORIGEM
+    return "utf-8"
+
+
+def _linhas_dos_blocos(blocos, encoding:str):
+    """Decodifica os blocos de bytes e os separa em linhas, mesmo quando uma linha está dividida entre blocos.
+
+    A codificação é detectada só nos primeiros bytes, então um arquivo considerado UTF-8 pode ter um acento
+    em ENCODING_ORIGEM mais adiante. Nesse caso o resto do arquivo, a partir do primeiro byte inválido, é
+    decodificado em ENCODING_ORIGEM, e o texto anterior a ele continua decodificado como UTF-8.
+
+    Parameters
+    ----------
+    blocos : Iterable[bytes]
+        Os blocos de bytes do arquivo.
+    encoding : str
+        A codificação do arquivo.
+
+    Returns
+    -------
+    Generator[str]
+        As linhas do arquivo, terminadas em quebra de linha.
+
+    Test
+    ----------
+    >>> list(_linhas_dos_blocos([b"A;B\\n1;", b"2\\n3;4"], "utf-8"))
+    ['A;B\\n', '1;2\\n', '3;4']
+    >>> list(_linhas_dos_blocos([b"A\\nGOI\\xc3\\x82NIA\\n", "SÃO PAULO\\n".encode("latin-1")], "utf-8"))
+    ['A\\n', 'GOIÂNIA\\n', 'SÃO PAULO\\n']
+    >>> list(_linhas_dos_blocos(["GOIÂNIA\\n".encode("utf-8") + "SÃO PAULO\\n".encode("latin-1")], "utf-8"))
+    ['GOIÂNIA\\n', 'SÃO PAULO\\n']
+    """
+    decodificador = codecs.getincrementaldecoder(encoding)()
+    resto = ""
+    for bloco in itertools.chain(blocos, [None]):
+        try:
+            decodificado = decodificador.decode(bloco) if bloco is not None else decodificador.decode(b"", final=True)
+        except UnicodeDecodeError as erro:
+            if codecs.lookup(encoding).name == codecs.lookup(ENCODING_ORIGEM).name:
+                raise
+            # O erro guarda os bytes que o decodificador tentou ler (os pendentes do bloco anterior e o bloco atual):
+            # os anteriores ao primeiro byte inválido são UTF-8 válido, e o resto do arquivo é lido em ENCODING_ORIGEM.
+            encoding = ENCODING_ORIGEM
+            decodificador = codecs.getincrementaldecoder(encoding)()
+            decodificado = (erro.object[:erro.start].decode("utf-8")
+                            + decodificador.decode(erro.object[erro.start:], final=bloco is None))
+        texto = resto + decodificado
+        linhas = texto.split("\n")
+        resto = linhas.pop()
+        for linha in linhas:
+            yield linha + "\n"
+    if resto:
+        yield resto
+
+
+def _abre_entrada(caminho_arquivo:str):
+    """Abre um arquivo binário para leitura, descomprimindo o conteúdo conforme ele é lido.
+
+    Parameters
+    ----------
+    caminho_arquivo : str
+        O caminho do arquivo, a compressão é reconhecida pela extensão ".csv.gz" ou ".csv.zst".
+
+    Returns
+    -------
+    Um objeto de arquivo binário aberto para leitura.
+    """
+    if caminho_arquivo.endswith(EXTENSOES_COMPRESSAO["gzip"]):
+        return gzip.open(caminho_arquivo, "rb")
+    elif caminho_arquivo.endswith(EXTENSOES_COMPRESSAO["zstd"]):
+        return zstandard.ZstdDecompressor().stream_reader(open(caminho_arquivo, "rb"), closefd=True)
+    return open(caminho_arquivo, "rb")
+
+
+def _copia_mes(blocos, saida, pular_cabecalho:bool = False, encoding:str = None, cabecalho_esperado:list = None) -> int:
+    """Copia um arquivo mensal para a saída, normalizado e em UTF-8.
+
+    Essa é a etapa de entrada dos dados: cada mês é decodificado uma única vez, com a codificação detectada
+    nos primeiros bytes (função detecta_encoding, com a troca para ENCODING_ORIGEM caso um bloco seguinte não
+    seja UTF-8 válido), os espaços nas pontas de todos os campos são removidos e os textos das colunas
+    categóricas do esquema (municípios, princípios ativos, DCB, ...) passam para maiúsculas. Assim todos os leitores locais usam apenas a codificação ENCODING_DOS_DADOS, e um mesmo
+    município ou princípio ativo é escrito da mesma forma em todos os meses.
+
+    Parameters
+    ----------
+    blocos : Iterable[bytes]
+        Os blocos de bytes do arquivo original.
+    saida
+        Arquivo binário aberto para escrita.
+    pular_cabecalho : bool, optional
+        Caso True, a primeira linha (o cabeçalho) não é copiada, by default False
+    encoding : str, optional
+        A codificação do arquivo original, caso None ela é detectada, by default None
+    cabecalho_esperado : list, optional
+        As colunas dos meses já copiados para a mesma saída. Caso seja uma lista vazia, ela recebe o
+        cabeçalho do arquivo; caso tenha colunas, os campos de cada linha são reordenados para essa
+        ordem, by default None
+
+    Returns
+    -------
+    int
+        O número de linhas de dados copiadas, sem contar o cabeçalho.
+
+    Raises
+    ------
+    ValueError
+        O arquivo não tem as mesmas colunas do cabeçalho esperado.
+
+    Test
+    ----------
+    >>> saida = io.BytesIO()
+    >>> _copia_mes([b"ANO;UF\\n2014;S", b"P\\n2014;GO"], saida, pular_cabecalho=True)
+    2
+    >>> saida.getvalue()
+    b'2014;SP\\n2014;GO\\n'
+
+    >>> saida = io.BytesIO()
+    >>> _copia_mes(["ANO_VENDA;MUNICIPIO_VENDA\\r\\n2014; São Paulo \\r\\n".encode("latin-1")], saida)
+    1
+    >>> saida.getvalue().decode("utf-8")
+    'ANO_VENDA;MUNICIPIO_VENDA\\n2014;SÃO PAULO\\n'
+
+    >>> saida = io.BytesIO()
+    >>> _copia_mes([b"ANO;MUNICIPIO_VENDA\\n2014;GOIANIA\\n", "2014;São Paulo\\n".encode("latin-1")], saida)
+    2
+    >>> saida.getvalue().decode("utf-8")
+    'ANO;MUNICIPIO_VENDA\\n2014;GOIANIA\\n2014;SÃO PAULO\\n'
+
+    >>> saida, cabecalho = io.BytesIO(), []
+    >>> _copia_mes([b"ANO;UF\\n2014;SP\\n"], saida, cabecalho_esperado=cabecalho)
+    1
+    >>> _copia_mes([b"UF;ANO\\nGO;2015\\n"], saida, pular_cabecalho=True, cabecalho_esperado=cabecalho)
+    1
+    >>> saida.getvalue()
+    b'ANO;UF\\n2014;SP\\n2015;GO\\n'
+    >>> _copia_mes([b"ANO;MUNICIPIO\\n2015;GOIANIA\\n"], saida, pular_cabecalho=True, cabecalho_esperado=cabecalho)
+    Traceback (most recent call last):
+    ...
+    ValueError: As colunas do mês (ANO, MUNICIPIO) não são as mesmas do primeiro mês (ANO, UF)
+    """
+    blocos = iter(blocos)
+    primeiro = next(blocos, b"")
+    if encoding == None:
+        encoding = detecta_encoding(primeiro)
+    leitor = csv.reader(_linhas_dos_blocos(itertools.chain([primeiro], blocos), encoding), delimiter=";")
+
+    cabecalho = next(leitor, None)
+    if cabecalho == None:
+        return 0
+    cabecalho = [campo.strip() for campo in cabecalho]
+    ordem = None
+    if cabecalho_esperado == []:
+        cabecalho_esperado.extend(cabecalho)
+    elif cabecalho_esperado != None and cabecalho != cabecalho_esperado:
+        if sorted(cabecalho) != sorted(cabecalho_esperado):
+            raise ValueError(f"As colunas do mês ({', '.join(cabecalho)}) não são as mesmas do primeiro mês ({', '.join(cabecalho_esperado)})")
+        # Mesmas colunas em outra ordem: os campos são reordenados para a ordem do primeiro mês.
+        ordem = [cabecalho.index(coluna) for coluna in cabecalho_esperado]
+        cabecalho = list(cabecalho_esperado)
+    categoricas = [indice for indice, coluna in enumerate(cabecalho) if ESQUEMA.get(coluna) == "category"]
+
+    # As linhas são escritas em um buffer de texto, que é convertido e enviado à saída a cada 1 MB.
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, delimiter=";", lineterminator="\n")
+    if not pular_cabecalho:
+        escritor.writerow(cabecalho)
+
+    linhas = 0
+    for linha in leitor:
+        if linha == []:
+            continue
+        linha = [campo.strip() for campo in linha]
+        if ordem != None:
+            linha = [linha[indice] if indice < len(linha) else "" for indice in ordem]
+        for indice in categoricas:
+            if indice < len(linha):
+                linha[indice] = linha[indice].upper()
+        escritor.writerow(linha)
+        linhas += 1
+        if buffer.tell() >= 1024 * 1024:
+            saida.write(buffer.getvalue().encode(ENCODING_DOS_DADOS))
+            buffer.seek(0)
+            buffer.truncate()
+    saida.write(buffer.getvalue().encode(ENCODING_DOS_DADOS))
+
+    return linhas
+
+
+def download_csv_by_dates(data_inicial:str, data_final:str = None, output_file:str = None, url_base:str = URL_DADOS,
+                          compressao:str = None, retorna_dataframe:bool = True) -> pd.DataFrame:
     """Função para baixar os dados da base de dados pelas datas selecionadas.
 
     Como todos os dados da base de dados em csv podem ser baixados a partir dos links: 
@@ -186,6 +501,11 @@ def download_csv_by_dates(data_inicial:str, data_final:str = None, output_file:s
     a base de dados contém registros desde Janeiro de 2014 até Novembro de 2021, por isso,
     é feita uma validação de datas através da função validacao_datas, e nem sempre o servidor possui resposta.
 
+    Quando o output_file é definido, os bytes de cada mês são escritos diretamente no arquivo, em blocos e já
+    convertidos para UTF-8 e normalizados (função _copia_mes), sem passar por um dataframe, podendo ainda ser comprimidos com gzip ou zstd
+    (o arquivo deve então terminar em ".csv.gz" ou ".csv.zst"). O dataframe só é montado, lendo o arquivo salvo,
+    caso retorna_dataframe seja True. O dataframe retornado segue os tipos do módulo esquema.
+
     Parameters
     ----------
     data_inicial : str
@@ -194,16 +514,23 @@ def download_csv_by_dates(data_inicial:str, data_final:str = None, output_file:s
         A data do último registro buscado, by default None
     output_file : str, optional
         O caminho e nome do arquivo de saída, by default None
+    url_base : str, optional
+        Endereço dos arquivos mensais, com "{data}" no lugar da data "AAAAmm", by default URL_DADOS
+    compressao : str, optional
+        Compressão do arquivo de saída, "gzip", "zstd" ou None, by default None
+    retorna_dataframe : bool, optional
+        Caso False e o output_file seja definido, retorna apenas o caminho do arquivo salvo, by default True
 
     Returns
     -------
     pd.DataFrame
-        O dataframe dos registros da base de dados da data ou datas inseridas.
+        O dataframe dos registros da base de dados da data ou datas inseridas, ou o caminho do
+        arquivo de saída caso retorna_dataframe seja False.
 
     Raises
     ------
     ValueError
-        O arquivo de saída não é uma string ou não acaba em .csv
+        A compressão não é suportada, ou o arquivo de saída não é uma string ou não acaba em .csv
         
     Test
     ----------
@@ -220,6 +547,12 @@ def download_csv_by_dates(data_inicial:str, data_final:str = None, output_file:s
     >>> download_csv_by_dates("2021/01", output_file="caminho/test.txt")
     O arquivo de saída deve ser uma string e terminar em .csv, ex: 'caminho/meu_arquivo.csv'
 
+    >>> download_csv_by_dates("2021/01", output_file="caminho/test.csv", compressao="gzip")
+    O arquivo de saída deve ser uma string e terminar em .csv.gz, ex: 'caminho/meu_arquivo.csv.gz'
+
+    >>> download_csv_by_dates("2021/01", output_file="caminho/test.csv.bz2", compressao="bz2")
+    Compressão inválida, as compressões suportadas são 'gzip' e 'zstd'.
+
     """
     try:
         # Valida a data antes de prosseguir com o código.
@@ -229,35 +562,121 @@ def download_csv_by_dates(data_inicial:str, data_final:str = None, output_file:s
         else:
             if validacao_datas(data_inicial, data_inicial) != True:
                 raise BaseException
-        # Valida o arquivo de saída.
-        if output_file != None:
-            if type(output_file) != str:
-                raise ValueError
-            elif output_file[-4:] != ".csv":
-                raise ValueError
+    except BaseException:
+        return
 
-        dataset = pd.read_csv(f"https://dados.anvisa.gov.br/dados/SNGPC/Manipulados/EDA_Manipulados_{data_inicial}.csv", delimiter=";", encoding="unicode_escape", low_memory=False)
+    # Valida a compressão e o arquivo de saída antes de qualquer download.
+    try:
+        if compressao not in EXTENSOES_COMPRESSAO or (compressao == "zstd" and zstandard == None):
+            raise ValueError
+    except ValueError:
+        print("Compressão inválida, as compressões suportadas são 'gzip' e 'zstd'.")
+        return
+    extensao = EXTENSOES_COMPRESSAO[compressao]
+    try:
+        if output_file != None and (type(output_file) != str or not output_file.endswith(extensao)):
+            raise ValueError
+    except ValueError:
+        print(f"O arquivo de saída deve ser uma string e terminar em {extensao}, ex: 'caminho/meu_arquivo{extensao}'")
+        return
 
-        if data_final != None:
-            dates = get_dates_between_dates(data_inicial, data_final)
-            # Concatena os arquivos de diferentes datas se necessário.
-            for index in range(1, len(dates)):
-                new_year_data = pd.read_csv(f"https://dados.anvisa.gov.br/dados/SNGPC/Manipulados/EDA_Manipulados_{dates[index]}.csv", delimiter=";", low_memory=False)
-                dataset = pd.concat([dataset, new_year_data])
+    try:
+        dates = get_dates_between_dates(data_inicial, data_final if data_final != None else data_inicial)
 
-        dataset.to_csv(output_file, sep=";", index=False)
-        
-        return dataset
+        if output_file == None:
+            # Sem arquivo de saída, cada mês é lido diretamente do servidor.
+            # Guarda os meses em ordem e os concatena uma única vez.
+            datasets = []
+            for cada_data in dates:
+                # Cada mês passa pela mesma normalização dos arquivos salvos antes de ser interpretado.
+                normalizado = io.BytesIO()
+                with _sessao_da_thread().get(url_base.format(data=cada_data), stream=True, timeout=120) as resposta:
+                    resposta.raise_for_status()
+                    _copia_mes(resposta.iter_content(chunk_size=1024 * 1024), normalizado)
+                normalizado.seek(0)
+                new_year_data = pd.read_csv(normalizado, delimiter=";", encoding=ENCODING_DOS_DADOS,
+                                            dtype=dtypes_de_leitura(), low_memory=False)
+                datasets.append(aplica_esquema(new_year_data))
+
+            return concatena_com_esquema(datasets)
+
+        # Escreve em um arquivo temporário para não deixar uma saída incompleta caso o download falhe.
+        # Os meses seguintes são escritos na ordem de colunas do primeiro mês (parâmetro cabecalho_esperado).
+        caminho_parcial = output_file + ".part"
+        cabecalho = []
+        try:
+            with _abre_saida(caminho_parcial, compressao) as saida:
+                for index, cada_data in enumerate(dates):
+                    with _sessao_da_thread().get(url_base.format(data=cada_data), stream=True, timeout=120) as resposta:
+                        resposta.raise_for_status()
+                        _copia_mes(resposta.iter_content(chunk_size=1024 * 1024), saida, pular_cabecalho=index > 0,
+                                   cabecalho_esperado=cabecalho)
+            os.replace(caminho_parcial, output_file)
+        finally:
+            if os.path.exists(caminho_parcial):
+                os.remove(caminho_parcial)
+
+        if retorna_dataframe == False:
+            return output_file
+
+        return aplica_esquema(pd.read_csv(output_file, delimiter=";", encoding=ENCODING_DOS_DADOS, dtype=dtypes_de_leitura(), low_memory=False))
 
-    except ValueError:
-        print("O arquivo de saída deve ser uma string e terminar em .csv, ex: 'caminho/meu_arquivo.csv'")
     except Exception as err:
         print("Houve um erro:", err, end=". ")
-    except BaseException:
-        return
 
 
-def download_data_sep_by_months(data_incial:str, data_final:str, caminho:str) -> None:
+def _sessao_da_thread() -> requests.Session:
+    """Retorna a sessão HTTP da thread atual, criando-a na primeira chamada.
+
+    Cada thread do download concorrente mantém a sua própria sessão, assim as conexões
+    com o servidor são reaproveitadas (keep-alive) entre os meses baixados pela mesma thread.
+
+    Returns
+    -------
+    requests.Session
+        A sessão HTTP da thread atual.
+    """
+    if not hasattr(_sessoes, "sessao"):
+        _sessoes.sessao = requests.Session()
+    return _sessoes.sessao
+
+
+def _baixa_mes(data:str, caminho_arquivo:str, url_base:str = URL_DADOS, compressao:str = None) -> float:
+    """Baixa o arquivo de um único mês usando a sessão HTTP da thread e o salva no caminho indicado.
+
+    Parameters
+    ----------
+    data : str
+        A data do mês a ser baixado, no formato "AAAAmm".
+    caminho_arquivo : str
+        O caminho e nome do arquivo de saída.
+    url_base : str, optional
+        Endereço dos arquivos mensais, com "{data}" no lugar da data, by default URL_DADOS
+    compressao : str, optional
+        Compressão do arquivo salvo, "gzip", "zstd" ou None, by default None
+
+    Returns
+    -------
+    float
+        O tempo, em segundos, gasto para baixar e salvar o mês.
+
+    Raises
+    ------
+    requests.HTTPError
+        O servidor não respondeu com sucesso.
+    """
+    inicio = time.perf_counter()
+    with _sessao_da_thread().get(url_base.format(data=data), stream=True, timeout=120) as resposta:
+        resposta.raise_for_status()
+        with _abre_saida(caminho_arquivo + ".part", compressao) as saida:
+            _copia_mes(resposta.iter_content(chunk_size=1024 * 1024), saida)
+    os.replace(caminho_arquivo + ".part", caminho_arquivo)
+
+    return time.perf_counter() - inicio
+
+
+def download_data_sep_by_months(data_incial:str, data_final:str, caminho:str, workers:int = None, url_base:str = URL_DADOS,
+                                compressao:str = None) -> None:
     """Baixa arquivos da base de dados separadamente por meses
 
     Devido as limitações do github para arquivos de tamanhos grandes, essa função baixa os arquivos
@@ -266,6 +685,13 @@ def download_data_sep_by_months(data_incial:str, data_final:str, caminho:str) ->
     "validacao_datas". A função está também limitada ao pleno funcionamento do site
     https://dados.gov.br/dados/conjuntos-dados/venda-de-medicamentos-controlados-e-antimicrobianos---medicamentos-manipulados
 
+    Caso "workers" seja definido, os meses são baixados de forma concorrente por um número limitado de threads,
+    cada uma reaproveitando sua conexão com o servidor, e o progresso e o tempo de cada arquivo são exibidos
+    conforme os downloads terminam.
+
+    Caso "compressao" seja definida, cada mês é comprimido conforme é baixado e salvo como
+    "Manipulados_AAAA_mm.csv.zst" (zstd) ou "Manipulados_AAAA_mm.csv.gz" (gzip), que são lidos
+    normalmente pelas funções do módulo utils e pelo cache colunar.
 
     Parameters
     ----------
@@ -275,6 +701,12 @@ def download_data_sep_by_months(data_incial:str, data_final:str, caminho:str) ->
         A data do último registro a ser baixado.
     caminho : str
         O caminho em que os arquivos serão baixados.
+    workers : int, optional
+        Número máximo de downloads simultâneos, caso None os meses são baixados um por vez, by default None
+    url_base : str, optional
+        Endereço dos arquivos mensais, com "{data}" no lugar da data "AAAAmm", by default URL_DADOS
+    compressao : str, optional
+        Compressão dos arquivos salvos, "gzip", "zstd" ou None, by default None
 
     Test
     ----------
@@ -285,6 +717,12 @@ def download_data_sep_by_months(data_incial:str, data_final:str, caminho:str) ->
     Problemas com a primeira data inserida: 2013/01
     Formato da data está incorreto ou ela não está entre Janeiro de 2014 e Novembro de 2021, tente inserir como ANO/mês, ex: '2015/05'.
 
+    >>> download_data_sep_by_months("2014/01", "2014/01", "dados", workers=0)
+    O número de workers deve ser um inteiro positivo.
+
+    >>> download_data_sep_by_months("2014/01", "2014/01", "dados", compressao="bz2")
+    Compressão inválida, as compressões suportadas são 'gzip' e 'zstd'.
+
     """
     # Pega as datas selecionadas e faz a validação.
     datas_selecionadas = get_dates_between_dates(data_incial, data_final)
@@ -295,22 +733,442 @@ def download_data_sep_by_months(data_incial:str, data_final:str, caminho:str) ->
             raise ValueError
         if type(caminho) != str:
             raise TypeError
+        if workers != None and (type(workers) != int or workers < 1):
+            raise NameError
+        if compressao not in EXTENSOES_COMPRESSAO or (compressao == "zstd" and zstandard == None):
+            raise LookupError
     except TypeError:
         print("Caminho deve ser uma string, tente iserir outro caminho.")
+    except NameError:
+        print("O número de workers deve ser um inteiro positivo.")
+    except LookupError:
+        print("Compressão inválida, as compressões suportadas são 'gzip' e 'zstd'.")
+    except ValueError:
+        return
+    else:
+        extensao = EXTENSOES_COMPRESSAO[compressao]
+        if workers == None:
+            for cada_data in datas_selecionadas:
+                nome_arquivo = f"Manipulados_{cada_data[:4]}_{cada_data[-2:]}{extensao}"
+                try:
+                    # Tenta baixar os arquivos e se eles não forem baixados levanda a exceção.
+                    dados = download_csv_by_dates(cada_data, output_file=os.path.join(caminho, nome_arquivo), url_base=url_base,
+                                                  compressao=compressao, retorna_dataframe=False)
+                    if type(dados) == type(None):
+                        raise Exception
+                    print(nome_arquivo, "Adicionado com Sucesso!")
+
+                except Exception as err:
+                    print(f"Falha ao baixar {nome_arquivo}. {err}")
+        else:
+            inicio = time.perf_counter()
+            total = len(datas_selecionadas)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # Associa cada download ao nome do arquivo para exibir o progresso.
+                futuros = {}
+                for cada_data in datas_selecionadas:
+                    nome_arquivo = f"Manipulados_{cada_data[:4]}_{cada_data[-2:]}{extensao}"
+                    futuro = executor.submit(_baixa_mes, cada_data, os.path.join(caminho, nome_arquivo), url_base, compressao)
+                    futuros[futuro] = nome_arquivo
+
+                for concluidos, futuro in enumerate(as_completed(futuros), start=1):
+                    nome_arquivo = futuros[futuro]
+                    try:
+                        segundos = futuro.result()
+                        print(f"[{concluidos}/{total}] {nome_arquivo} Adicionado com Sucesso! ({segundos:.2f}s)")
+                    except Exception as err:
+                        print(f"[{concluidos}/{total}] Falha ao baixar {nome_arquivo}. {err}")
+
+            print(f"Download concluído em {time.perf_counter() - inicio:.2f}s.")
+
+
+def _le_manifesto(caminho:str) -> dict:
+    """Lê o manifesto da pasta de dados, retornando um dicionário vazio caso ele não exista.
+
+    Parameters
+    ----------
+    caminho : str
+        A pasta onde os dados e o manifesto estão salvos.
+
+    Returns
+    -------
+    dict
+        Dicionário com os metadados de cada arquivo mensal, indexado pelo nome do arquivo.
+    """
+    try:
+        with open(os.path.join(caminho, NOME_MANIFESTO), "r", encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _salva_manifesto(caminho:str, manifesto:dict) -> None:
+    """Salva o manifesto na pasta de dados, escrevendo primeiro em um arquivo temporário para
+    que uma interrupção nunca deixe o manifesto corrompido.
+
+    Parameters
+    ----------
+    caminho : str
+        A pasta onde os dados e o manifesto estão salvos.
+    manifesto : dict
+        Dicionário com os metadados de cada arquivo mensal.
+    """
+    caminho_manifesto = os.path.join(caminho, NOME_MANIFESTO)
+    with open(caminho_manifesto + ".tmp", "w", encoding="utf-8") as arquivo:
+        json.dump(manifesto, arquivo, indent=4, sort_keys=True)
+    os.replace(caminho_manifesto + ".tmp", caminho_manifesto)
+
+
+def _sha256_arquivo(caminho_arquivo:str) -> str:
+    """Calcula o checksum SHA-256 de um arquivo lendo-o em blocos.
+
+    Parameters
+    ----------
+    caminho_arquivo : str
+        O caminho do arquivo.
+
+    Returns
+    -------
+    str
+        O checksum em hexadecimal.
+    """
+    checksum = hashlib.sha256()
+    with open(caminho_arquivo, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(1024 * 1024), b""):
+            checksum.update(bloco)
+    return checksum.hexdigest()
+
+
+def _arquivo_confere(caminho_arquivo:str, entrada:dict, verifica:bool = False) -> bool:
+    """Verifica se o arquivo local ainda corresponde ao que foi registrado no manifesto.
+
+    O tamanho e a data de modificação registrados bastam para confirmar o arquivo, assim uma sincronização
+    sem mudanças não lê os dados. O checksum só é calculado quando a data de modificação não é a registrada
+    (ou não foi registrada) ou quando a verificação completa é pedida.
+
+    Parameters
+    ----------
+    caminho_arquivo : str
+        O caminho do arquivo local.
+    entrada : dict
+        A entrada do manifesto referente ao arquivo.
+    verifica : bool, optional
+        Caso True, o checksum é sempre conferido, by default False
+
+    Returns
+    -------
+    bool
+        True caso o arquivo exista e seu tamanho e checksum sejam os registrados.
+    """
+    if entrada == None or not os.path.isfile(caminho_arquivo):
+        return False
+    if os.path.getsize(caminho_arquivo) != entrada.get("tamanho"):
+        return False
+    if not verifica and os.path.getmtime(caminho_arquivo) == entrada.get("modificado"):
+        return True
+    return _sha256_arquivo(caminho_arquivo) == entrada.get("sha256")
+
+
+def _baixa_com_retomada(url:str, caminho_parcial:str, cabecalhos:dict, tentativas:int, espera:float) -> dict:
+    """Baixa um arquivo para "caminho_parcial", retomando com HTTP Range o que já foi baixado antes.
+
+    Os validadores (ETag e Last-Modified) da versão sendo baixada ficam salvos ao lado do arquivo parcial,
+    e são enviados no cabeçalho If-Range, assim o servidor só continua a transferência se o arquivo
+    não mudou, caso contrário ele envia o arquivo inteiro novamente. Falhas de conexão são repetidas
+    com espera exponencial. O arquivo é pedido sem codificação de transferência (Accept-Encoding: identity),
+    pois os tamanhos e os intervalos de bytes se referem ao arquivo original.
+
+    Parameters
+    ----------
+    url : str
+        O endereço do arquivo.
+    caminho_parcial : str
+        O caminho do arquivo parcial.
+    cabecalhos : dict
+        Cabeçalhos condicionais (If-None-Match, If-Modified-Since) da versão local do arquivo.
+    tentativas : int
+        Número máximo de tentativas.
+    espera : float
+        Espera, em segundos, antes da segunda tentativa, que dobra a cada nova falha.
+
+    Returns
+    -------
+    dict
+        Os validadores e o tamanho do arquivo baixado, ou None caso o servidor informe que o arquivo não mudou.
+
+    Raises
+    ------
+    requests.RequestException
+        Todas as tentativas falharam.
+    """
+    caminho_validadores = caminho_parcial + ".json"
+    for tentativa in range(tentativas):
+        try:
+            enviados = dict(cabecalhos)
+            enviados["Accept-Encoding"] = "identity"
+            tamanho_parcial = os.path.getsize(caminho_parcial) if os.path.isfile(caminho_parcial) else 0
+            if tamanho_parcial > 0 and os.path.isfile(caminho_validadores):
+                with open(caminho_validadores, "r", encoding="utf-8") as arquivo:
+                    validadores = json.load(arquivo)
+                if validadores.get("etag") or validadores.get("last_modified"):
+                    enviados["Range"] = f"bytes={tamanho_parcial}-"
+                    enviados["If-Range"] = validadores.get("etag") or validadores.get("last_modified")
+
+            with _sessao_da_thread().get(url, headers=enviados, stream=True, timeout=120) as resposta:
+                if resposta.status_code == 304:
+                    return None
+                if resposta.status_code == 416:
+                    # O arquivo parcial não corresponde mais ao remoto, recomeça do zero.
+                    os.remove(caminho_parcial)
+                    raise requests.RequestException("Intervalo inválido para o arquivo parcial")
+                resposta.raise_for_status()
+
+                validadores = {"etag": resposta.headers.get("ETag"), "last_modified": resposta.headers.get("Last-Modified")}
+                with open(caminho_validadores, "w", encoding="utf-8") as arquivo:
+                    json.dump(validadores, arquivo)
+
+                if resposta.status_code == 206:
+                    modo = "ab"
+                    # O servidor pode informar o tamanho total como "*", quando ele é desconhecido.
+                    tamanho_total = resposta.headers.get("Content-Range", "").split("/")[-1]
+                    tamanho_total = int(tamanho_total) if tamanho_total.isdigit() else None
+                else:
+                    modo = "wb"
+                    tamanho_total = resposta.headers.get("Content-Length")
+                    tamanho_total = int(tamanho_total) if tamanho_total != None else None
+
+                with open(caminho_parcial, modo) as arquivo:
+                    for bloco in resposta.iter_content(chunk_size=1024 * 1024):
+                        arquivo.write(bloco)
+
+            if tamanho_total != None and os.path.getsize(caminho_parcial) != tamanho_total:
+                raise requests.RequestException("Transferência incompleta")
+
+            os.remove(caminho_validadores)
+            validadores["tamanho_remoto"] = os.path.getsize(caminho_parcial)
+            return validadores
+
+        except requests.RequestException:
+            if tentativa == tentativas - 1:
+                raise
+            time.sleep(espera * 2 ** tentativa)
+
+
+def _sincroniza_mes(data:str, caminho:str, entrada:dict, tentativas:int, espera:float, url_base:str, compressao:str = None,
+                    verifica:bool = False) -> dict:
+    """Sincroniza um único mês, baixando-o apenas se ele for novo, tiver mudado no servidor ou
+    se o arquivo local não conferir com o manifesto.
+
+    Parameters
+    ----------
+    data : str
+        A data do mês, no formato "AAAAmm".
+    caminho : str
+        A pasta onde os dados estão salvos.
+    entrada : dict
+        A entrada do manifesto referente ao mês, ou None caso ele nunca tenha sido sincronizado.
+    tentativas : int
+        Número máximo de tentativas do download.
+    espera : float
+        Espera inicial, em segundos, entre as tentativas.
+    url_base : str
+        Endereço dos arquivos mensais, com "{data}" no lugar da data.
+    compressao : str, optional
+        Compressão do arquivo salvo, "gzip", "zstd" ou None, by default None
+    verifica : bool, optional
+        Caso True, o checksum do arquivo local é sempre conferido, by default False
+
+    Returns
+    -------
+    dict
+        A nova entrada do manifesto, ou None caso o mês já esteja atualizado.
+    """
+    caminho_arquivo = os.path.join(caminho, f"Manipulados_{data[:4]}_{data[-2:]}{EXTENSOES_COMPRESSAO[compressao]}")
+    cabecalhos = {}
+    if _arquivo_confere(caminho_arquivo, entrada, verifica):
+        if entrada.get("etag"):
+            cabecalhos["If-None-Match"] = entrada["etag"]
+        if entrada.get("last_modified"):
+            cabecalhos["If-Modified-Since"] = entrada["last_modified"]
+
+    validadores = _baixa_com_retomada(url_base.format(data=data), caminho_arquivo + ".part", cabecalhos, tentativas, espera)
+    if validadores == None:
+        return None
+
+    # Converte o arquivo baixado para UTF-8 em blocos, comprimindo-o e contando as linhas durante a cópia.
+    with open(caminho_arquivo + ".part", "rb") as origem, _abre_saida(caminho_arquivo + ".tmp", compressao) as saida:
+        linhas = _copia_mes(iter(lambda: origem.read(1024 * 1024), b""), saida)
+    os.replace(caminho_arquivo + ".tmp", caminho_arquivo)
+    os.remove(caminho_arquivo + ".part")
+
+    validadores.update({"tamanho": os.path.getsize(caminho_arquivo),
+                        "modificado": os.path.getmtime(caminho_arquivo),
+                        "sha256": _sha256_arquivo(caminho_arquivo),
+                        "linhas": linhas})
+    return validadores
+
+
+def sincroniza_dados(data_inicial:str, data_final:str, caminho:str, workers:int = None, tentativas:int = 3,
+                     espera:float = 1.0, url_base:str = URL_DADOS, compressao:str = None, verifica:bool = False) -> dict:
+    """Sincroniza incrementalmente a pasta de dados com o servidor da base de dados.
+
+    Diferente de "download_data_sep_by_months", que sempre baixa todos os meses, essa função usa o
+    manifesto da pasta ("manifesto.json"), que guarda tamanho, data de modificação, checksum, ETag/Last-Modified
+    e número de linhas de cada mês, para baixar apenas os meses novos ou alterados no servidor. Meses cujo arquivo
+    local não confere com o manifesto também são baixados novamente; o checksum só é recalculado quando o
+    tamanho ou a data de modificação mudaram, ou com "verifica". Downloads interrompidos são
+    retomados de onde pararam e falhas são repetidas com espera exponencial.
+    Com "compressao", os meses são salvos comprimidos, como em "download_data_sep_by_months", e o
+    tamanho e o checksum do manifesto passam a ser os do arquivo comprimido.
+
+    Parameters
+    ----------
+    data_inicial : str
+        A data do primeiro mês a ser sincronizado.
+    data_final : str
+        A data do último mês a ser sincronizado.
+    caminho : str
+        A pasta onde os dados e o manifesto ficam salvos.
+    workers : int, optional
+        Número máximo de meses sincronizados simultaneamente, by default None
+    tentativas : int, optional
+        Número máximo de tentativas de cada download, by default 3
+    espera : float, optional
+        Espera, em segundos, antes da segunda tentativa, que dobra a cada falha, by default 1.0
+    url_base : str, optional
+        Endereço dos arquivos mensais, com "{data}" no lugar da data "AAAAmm", by default URL_DADOS
+    compressao : str, optional
+        Compressão dos arquivos salvos, "gzip", "zstd" ou None, by default None
+    verifica : bool, optional
+        Caso True, o checksum de todos os arquivos locais é conferido, by default False
+
+    Returns
+    -------
+    dict
+        O estado de cada arquivo ao final da sincronização: "baixado", "inalterado" ou "falhou".
+
+    Test
+    ----------
+    >>> sincroniza_dados("2014/01", "2014/01", 3)
+    Caminho deve ser uma string de uma pasta existente, tente iserir outro caminho.
+
+    >>> sincroniza_dados("2013/01", "2014/01", "dados")
+    Problemas com a primeira data inserida: 2013/01
+    Formato da data está incorreto ou ela não está entre Janeiro de 2014 e Novembro de 2021, tente inserir como ANO/mês, ex: '2015/05'.
+
+    """
+    datas_selecionadas = get_dates_between_dates(data_inicial, data_final)
+    try:
+        if datas_selecionadas == []:
+            raise ValueError
+        if type(caminho) != str or not os.path.isdir(caminho):
+            raise TypeError
+        if workers != None and (type(workers) != int or workers < 1):
+            raise NameError
+        if compressao not in EXTENSOES_COMPRESSAO or (compressao == "zstd" and zstandard == None):
+            raise LookupError
+    except TypeError:
+        print("Caminho deve ser uma string de uma pasta existente, tente iserir outro caminho.")
+    except NameError:
+        print("O número de workers deve ser um inteiro positivo.")
+    except LookupError:
+        print("Compressão inválida, as compressões suportadas são 'gzip' e 'zstd'.")
     except ValueError:
         return
     else:
-        for cada_data in datas_selecionadas:
-            nome_arquivo = f"Manipulados_{cada_data[:4]}_{cada_data[-2:]}.csv"
-            try:
-                # Tenta baixar os arquivos e se eles não forem baixados levanda a exceção.
-                dados = download_csv_by_dates(cada_data, output_file=os.path.join(caminho, nome_arquivo))
-                if type(dados) == type(None):
-                    raise Exception
-                print(nome_arquivo, "Adicionado com Sucesso!")
-
-            except Exception as err:
-                print(f"Falha ao baixar {nome_arquivo}. {err}")
+        inicio = time.perf_counter()
+        manifesto = _le_manifesto(caminho)
+        estados = {}
+        with ThreadPoolExecutor(max_workers=workers or 1) as executor:
+            futuros = {}
+            for cada_data in datas_selecionadas:
+                nome_arquivo = f"Manipulados_{cada_data[:4]}_{cada_data[-2:]}{EXTENSOES_COMPRESSAO[compressao]}"
+                futuro = executor.submit(_sincroniza_mes, cada_data, caminho, manifesto.get(nome_arquivo), tentativas, espera,
+                                         url_base, compressao, verifica)
+                futuros[futuro] = nome_arquivo
+
+            # O manifesto só é alterado por esta thread, e é salvo a cada mês concluído.
+            for futuro in as_completed(futuros):
+                nome_arquivo = futuros[futuro]
+                try:
+                    entrada = futuro.result()
+                except Exception as err:
+                    estados[nome_arquivo] = "falhou"
+                    print(f"Falha ao sincronizar {nome_arquivo}. {err}")
+                    continue
+
+                if entrada == None:
+                    estados[nome_arquivo] = "inalterado"
+                else:
+                    estados[nome_arquivo] = "baixado"
+                    manifesto[nome_arquivo] = entrada
+                    _salva_manifesto(caminho, manifesto)
+                    print(nome_arquivo, "Adicionado com Sucesso!")
+
+        inalterados = list(estados.values()).count("inalterado")
+        print(f"Sincronização concluída em {time.perf_counter() - inicio:.2f}s, {inalterados} arquivo(s) já estavam atualizados.")
+        return estados
+
+
+def normaliza_dados(data_inicial:str, data_final:str, caminho:str, file_names:str = "Manipulados") -> list:
+    """Normaliza os arquivos mensais já salvos na pasta dos dados, como é feito nos meses baixados.
+
+    Os arquivos baixados por versões anteriores, ou copiados de outro lugar, podem estar em latin-1 e com
+    textos escritos de formas diferentes. Cada mês é decodificado com a codificação detectada e reescrito em
+    UTF-8, com os textos normalizados e mantendo a sua compressão. Como a normalização de um arquivo já
+    normalizado não o altera, a função pode ser executada novamente sem problemas. As entradas dos meses
+    no manifesto são atualizadas, para que a sincronização não os baixe novamente.
+
+    Parameters
+    ----------
+    data_inicial : str
+        A data do primeiro mês.
+    data_final : str
+        A data do último mês.
+    caminho : str
+        A pasta dos dados.
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    list
+        Os caminhos dos arquivos normalizados.
+
+    Test
+    ----------
+    >>> normaliza_dados("2013/01", "2014/01", "dados")
+    Problemas com a primeira data inserida: 2013/01
+    Formato da data está incorreto ou ela não está entre Janeiro de 2014 e Novembro de 2021, tente inserir como ANO/mês, ex: '2015/05'.
+    []
+    """
+    normalizados = []
+    manifesto = _le_manifesto(caminho)
+    for cada_data in get_dates_between_dates(data_inicial, data_final):
+        caminho_arquivo = caminho_do_mes(caminho, cada_data[:4], cada_data[-2:], file_names)
+        if not os.path.isfile(caminho_arquivo):
+            continue
+        compressao = [cada_compressao for cada_compressao, extensao in EXTENSOES_COMPRESSAO.items()
+                      if cada_compressao != None and caminho_arquivo.endswith(extensao)]
+        compressao = compressao[0] if compressao != [] else None
+        try:
+            with _abre_entrada(caminho_arquivo) as origem, _abre_saida(caminho_arquivo + ".tmp", compressao) as saida:
+                linhas = _copia_mes(iter(lambda: origem.read(1024 * 1024), b""), saida)
+            os.replace(caminho_arquivo + ".tmp", caminho_arquivo)
+        except Exception as err:
+            print(f"Não foi possível normalizar '{caminho_arquivo}'.", err)
+            continue
+
+        nome_arquivo = os.path.basename(caminho_arquivo)
+        if nome_arquivo in manifesto:
+            manifesto[nome_arquivo].update({"tamanho": os.path.getsize(caminho_arquivo),
+                                            "modificado": os.path.getmtime(caminho_arquivo),
+                                            "sha256": _sha256_arquivo(caminho_arquivo),
+                                            "linhas": linhas})
+            _salva_manifesto(caminho, manifesto)
+        normalizados.append(caminho_arquivo)
+
+    return normalizados
 
 
 if __name__ == "__main__":
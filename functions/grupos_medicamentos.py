@@ -0,0 +1,193 @@
+"""Módulo que registra os grupos de medicamentos analisados (anabolizantes, antidepressivos, cloroquina...).
+
+Cada grupo é uma lista de princípios ativos, registrada uma única vez em "GRUPOS_DE_MEDICAMENTOS". Para
+testar se as linhas pertencem a um grupo, o grupo é compilado contra o dicionário global da coluna
+PRINCIPIO_ATIVO (módulo dicionarios): os seus princípios ativos viram uma tabela indexada pelos códigos
+do dicionário, e a máscara de uma coluna categórica é apenas a leitura dessa tabela nos códigos das linhas.
+Como os códigos do dicionário nunca mudam, a tabela só é compilada de novo quando o dicionário cresce.
+"""
+
+import sys, os
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(esse_caminho)
+
+import numpy as np
+import pandas as pd
+import doctest
+from dicionarios import le_dicionario, caminho_dicionario
+
+# Princípios ativos de cada grupo de medicamentos.
+GRUPOS_DE_MEDICAMENTOS = {
+    "ANABOLIZANTES": ["TESTOSTERONA", "ESTANOZOLOL", "NANDROLONA"],
+    "ANTIDEPRESSIVOS": ["SELEGILINA", "SERTRALINA", "AMITRIPTILINA", "CITALOPRAM",
+                        "CLOMIPRAMINA", "IPRONIAZIDA", "MOCLOBEMIDA", "IMIPRAMINA",
+                        "TRIMIPRAMINA", "NORTRIPTILINA", "PROTRIPTILINA", "DOXEPINA",
+                        "AMOXAPINA", "DOTIEPINA", "OUDOSULEPINA", "FLUOXETINA",
+                        "FLUVOXAMINA", "PAROXETINA", "ESCITALOPRAM", "NORCITALOPRAM",
+                        "TIANEPTINA", "MIANSERINA", "DULOXETINA", "MIRTAZAPINA", "MAPROTILINA",
+                        "NEFAZODONA", "MILNACIPRANA", "TRAZODONA", "DESVENLAFAXINA", "VENLAFAXINA",
+                        "BUPROPIONA"],
+    "BENZODIAZEPINICOS": ["ALPRAZOLAM", "BROMAZEPAM", "CLOBAZAM", "CLONAZEPAM", "CLOXAZOLAM",
+                          "DIAZEPAM", "ESTAZOLAM", "FLUNITRAZEPAM", "FLURAZEPAM", "LORAZEPAM",
+                          "MIDAZOLAM", "CLORIDRATO DE MIDAZOLAM", "MALEATO DE MIDAZOLAM", "NITRAZEPAM"],
+    "CLOROQUINA": ["CLOROQUINA", "DIFOSFATO DE CLOROQUINA", "HIDROXICLOROQUINA",
+                   "SULFATO DE HIDROXICLOROQUINA", "DICLORIDRATO DE CLOROQUINA", "SULFATO DE CLOROQUINA"],
+    "ZOLPIDEM": ["HEMITARTARATO DE ZOLPIDEM", "ZOLPIDEM"],
+}
+
+# Tabelas já compiladas, pelo grupo e pelo caminho do dicionário, com o tamanho do dicionário na compilação.
+_grupos_compilados = {}
+
+
+def principios_do_grupo(nome:str) -> list:
+    """Retorna os princípios ativos de um grupo de medicamentos.
+
+    Parameters
+    ----------
+    nome : str
+        O nome do grupo, uma das chaves de GRUPOS_DE_MEDICAMENTOS.
+
+    Returns
+    -------
+    list
+        Os princípios ativos do grupo, ou None caso o grupo não esteja registrado.
+
+    Test
+    ----------
+    >>> principios_do_grupo("ZOLPIDEM")
+    ['HEMITARTARATO DE ZOLPIDEM', 'ZOLPIDEM']
+
+    >>> principios_do_grupo("GRUPO_INEXISTENTE")
+    Grupo de medicamentos inválido, os grupos registrados são: ANABOLIZANTES, ANTIDEPRESSIVOS, BENZODIAZEPINICOS, CLOROQUINA, ZOLPIDEM.
+    """
+    try:
+        if nome not in GRUPOS_DE_MEDICAMENTOS:
+            raise KeyError
+    except KeyError:
+        print("Grupo de medicamentos inválido, os grupos registrados são: " + ", ".join(GRUPOS_DE_MEDICAMENTOS) + ".")
+        return None
+    return GRUPOS_DE_MEDICAMENTOS[nome]
+
+
+def registra_grupo(nome:str, principios:list) -> list:
+    """Registra um grupo de medicamentos novo, ou substitui os princípios ativos de um grupo existente.
+
+    Parameters
+    ----------
+    nome : str
+        O nome do grupo.
+    principios : list
+        Os princípios ativos do grupo, como aparecem na coluna PRINCIPIO_ATIVO.
+
+    Returns
+    -------
+    list
+        Os princípios ativos registrados, ou None caso a entrada seja inválida.
+
+    Test
+    ----------
+    >>> registra_grupo("OPIOIDES", ["MORFINA", "CODEÍNA"])
+    ['MORFINA', 'CODEÍNA']
+
+    >>> registra_grupo("OPIOIDES", "MORFINA")
+    Os princípios ativos devem ser uma lista de textos, tente inserir novamente.
+    >>> del GRUPOS_DE_MEDICAMENTOS["OPIOIDES"]
+    """
+    try:
+        if type(nome) != str or type(principios) != list or not all(type(principio) == str for principio in principios):
+            raise TypeError
+    except TypeError:
+        print("Os princípios ativos devem ser uma lista de textos, tente inserir novamente.")
+        return None
+
+    GRUPOS_DE_MEDICAMENTOS[nome] = list(principios)
+    # As tabelas compiladas com os princípios ativos antigos deixam de valer.
+    for chave in [chave for chave in _grupos_compilados if chave[0] == nome]:
+        del _grupos_compilados[chave]
+    return GRUPOS_DE_MEDICAMENTOS[nome]
+
+
+def codigos_do_grupo(nome:str, path:str = "dados", file_names:str = "Manipulados") -> np.ndarray:
+    """Retorna a tabela do grupo indexada pelos códigos do dicionário de PRINCIPIO_ATIVO.
+
+    A tabela tem uma posição a mais no final, sempre False, lida pelas linhas nulas (código -1).
+
+    Parameters
+    ----------
+    nome : str
+        O nome do grupo, uma das chaves de GRUPOS_DE_MEDICAMENTOS.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    np.ndarray
+        True nos códigos dos princípios ativos do grupo, ou None caso o grupo não esteja registrado.
+
+    Test
+    ----------
+    >>> codigos_do_grupo("ZOLPIDEM", "PASTA_INEXISTENTE").tolist()
+    [False]
+    """
+    principios = principios_do_grupo(nome)
+    if principios is None:
+        return None
+
+    dicionario = le_dicionario("PRINCIPIO_ATIVO", path, file_names)
+    chave = (nome, caminho_dicionario("PRINCIPIO_ATIVO", path, file_names))
+    if chave not in _grupos_compilados or _grupos_compilados[chave][0] != len(dicionario):
+        tabela = np.zeros(len(dicionario) + 1, dtype=bool)
+        codigos = pd.Index(dicionario, dtype=object).get_indexer(principios)
+        tabela[codigos[codigos >= 0]] = True
+        _grupos_compilados[chave] = (len(dicionario), tabela, pd.Index(dicionario, dtype=object))
+    return _grupos_compilados[chave][1]
+
+
+def mascara_do_grupo(coluna:pd.Series, nome:str, path:str = "dados", file_names:str = "Manipulados") -> np.ndarray:
+    """Retorna a máscara das linhas da coluna de princípios ativos que pertencem ao grupo.
+
+    Nas colunas categóricas com as categorias do dicionário (as lidas do cache colunar ou do cubo), a máscara
+    é a tabela compilada do grupo lida nos códigos das linhas. Nas outras colunas, os princípios ativos do
+    grupo são procurados nos valores da coluna.
+
+    Parameters
+    ----------
+    coluna : pd.Series
+        A coluna de princípios ativos.
+    nome : str
+        O nome do grupo, uma das chaves de GRUPOS_DE_MEDICAMENTOS.
+    path : str, optional
+        A pasta dos dados, by default "dados"
+    file_names : str, optional
+        O nome padrão dos arquivos, by default "Manipulados"
+
+    Returns
+    -------
+    np.ndarray
+        A máscara das linhas do grupo, ou None caso o grupo não esteja registrado.
+
+    Test
+    ----------
+    >>> coluna = pd.Series(["ZOLPIDEM", "DIAZEPAM", None, "HEMITARTARATO DE ZOLPIDEM"], dtype="category")
+    >>> mascara_do_grupo(coluna, "ZOLPIDEM", "PASTA_INEXISTENTE").tolist()
+    [True, False, False, True]
+    """
+    tabela = codigos_do_grupo(nome, path, file_names)
+    if tabela is None:
+        return None
+
+    if isinstance(coluna.dtype, pd.CategoricalDtype):
+        categorias = coluna.cat.categories
+        dicionario = _grupos_compilados[(nome, caminho_dicionario("PRINCIPIO_ATIVO", path, file_names))][2]
+        if len(categorias) > 0 and len(categorias) <= len(dicionario) and categorias.equals(dicionario[:len(categorias)]):
+            # Os códigos da coluna são os do dicionário, e o código -1 dos nulos lê a última posição.
+            return np.append(tabela[:len(categorias)], False)[coluna.cat.codes.to_numpy()]
+        aceitas = np.append(categorias.isin(GRUPOS_DE_MEDICAMENTOS[nome]), False)
+        return aceitas[coluna.cat.codes.to_numpy()]
+    return coluna.isin(GRUPOS_DE_MEDICAMENTOS[nome]).to_numpy()
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
@@ -9,10 +9,19 @@ sys.path.append(esse_caminho)
 
 import pandas as pd
 import utils
+from esquema import concatena_com_esquema
+from cubo import cubo_atualizado, consulta_cubo
 import matplotlib.pyplot as plt
 import doctest
 from typing import Literal, Iterable, Optional
 from numpy import datetime64
+from derivados import atualiza_por_mes
+from grupos_medicamentos import GRUPOS_DE_MEDICAMENTOS
+
+PRINCIPIOS_DE_ANTIDEPRESSIVOS = GRUPOS_DE_MEDICAMENTOS["ANTIDEPRESSIVOS"]
+
+# csv com as vendas de antidepressivos, mantido atualizado mês a mês pela função atualiza_antidepressivos.
+ARQUIVO_ANTIDEPRESSIVOS = "Manipulados_ANTIDEPRESSIVOS.csv"
 
 
 def filtra_e_contatena(coluna_do_valor: str, valores_procurados: list | str) -> pd.DataFrame:
@@ -42,14 +51,67 @@ def filtra_e_contatena(coluna_do_valor: str, valores_procurados: list | str) ->
             dataframe pandas com os dados filtrados
     '''
 
-    dataframe = utils.concat_data_by_dates(f"2014/01", f"2014/12")
-    dataframe = utils.filtra_dados_por_valores_procurados(dataframe, coluna_do_valor, valores_procurados)
+    # Cada ano é filtrado durante a leitura, e os anos filtrados são concatenados uma única vez, em ordem.
+    dataframes_anuais = []
     for year in range(2014, 2021+1):
-        novo_dataframe = utils.concat_data_by_dates(f"{year}/01", f"{year}/12")
-        novo_dataframe = utils.filtra_dados_por_valores_procurados(novo_dataframe, coluna_do_valor, valores_procurados)
-        dataframe = pd.concat((dataframe, novo_dataframe))
-    
-    return dataframe
+        # Os dados vão até Novembro de 2021.
+        ultimo_mes = "11" if year == 2021 else "12"
+        # As linhas são filtradas durante a leitura, então o ano inteiro nunca fica na memória.
+        novo_dataframe = utils.concat_data_by_dates(f"{year}/01", f"{year}/{ultimo_mes}",
+                                                    where={coluna_do_valor: valores_procurados})
+        if novo_dataframe is not None:
+            dataframes_anuais.append(novo_dataframe)
+
+    return concatena_com_esquema(dataframes_anuais)
+
+def atualiza_antidepressivos(path: str = "dados", data_inicial: str = "2014/01", data_final: str = "2021/11") -> list:
+    '''
+    Mantém o csv com as vendas de antidepressivos atualizado, filtrando apenas os meses da base
+    que são novos ou que mudaram desde a última atualização (módulo derivados).
+
+    Parâmetros:
+    ------------
+    path:
+        Tipo: str
+
+        Descrição: 
+            pasta dos dados, onde o csv dos antidepressivos também é salvo
+
+    data_inicial:
+        Tipo: str
+
+        Descrição: 
+            data do primeiro mês, como "AAAA/mm"
+
+    data_final:
+        Tipo: str
+
+        Descrição: 
+            data do último mês, como "AAAA/mm"
+
+    Retorna:
+    ---------
+    meses:
+        Tipo: list
+
+        Descrição: 
+            meses filtrados nesta atualização, como "AAAAmm"
+
+    Exemplo:
+    ---------
+    >>> atualiza_antidepressivos("PASTA_INEXISTENTE")
+    []
+    '''
+    def filtra_mes(ano: str, mes: str) -> pd.DataFrame:
+        return utils.concat_data_by_dates(f"{ano}/{mes}", f"{ano}/{mes}", path=path,
+                                          where={"PRINCIPIO_ATIVO": PRINCIPIOS_DE_ANTIDEPRESSIVOS})
+
+    def salva_csv(dataframe: pd.DataFrame, caminho: str):
+        dataframe.to_csv(caminho + ".tmp", index=False)
+        os.replace(caminho + ".tmp", caminho)
+
+    return atualiza_por_mes(os.path.join(path, ARQUIVO_ANTIDEPRESSIVOS), data_inicial, data_final,
+                            filtra_mes, pd.read_csv, salva_csv, path)
 
 def cria_datetime(dataframe: pd.DataFrame) -> pd.Series:
     '''
@@ -224,7 +286,7 @@ def grafico_linhas(datas: Iterable[datetime64], valores: tuple[Iterable] | Itera
     plt.legend(loc='best')
     plt.suptitle(titulo)
 
-def contagem_elementos(dataframe: pd.DataFrame, elemento_contado: str, nome_da_serie: str) -> pd.Series:
+def contagem_elementos(dataframe: pd.DataFrame, elemento_contado: str, nome_da_serie: str, coluna_dos_pesos: str | None = None) -> pd.Series:
     """
     Retorna uma série do Pandas com as contagens dos elementos na ordem deles.
     
@@ -247,6 +309,13 @@ def contagem_elementos(dataframe: pd.DataFrame, elemento_contado: str, nome_da_s
 
         Descrição: 
             nome da série a ser retornada
+
+    coluna_dos_pesos:
+        Tipo: str | None
+
+        Descrição: 
+            coluna com quantas vezes cada linha deve ser contada, para dados já agregados como os do cubo.
+            Se for None, cada linha é contada uma vez.
     
     Retorna
     --------
@@ -264,8 +333,17 @@ def contagem_elementos(dataframe: pd.DataFrame, elemento_contado: str, nome_da_s
     B    2
     Name: SERIE EXEMPLO, dtype: int64
 
+    >>> contagem_elementos(pd.DataFrame({"NOME": ["B", "A", "B"], "VENDAS": [2, 1, 3]}), "NOME", "SERIE EXEMPLO", "VENDAS")
+    NOME
+    A    1
+    B    5
+    Name: SERIE EXEMPLO, dtype: int64
+
     """
 
+    if coluna_dos_pesos != None:
+        return dataframe.groupby(elemento_contado, observed=True)[coluna_dos_pesos].sum().rename(nome_da_serie)
+
     dataframe = dataframe.copy() # Para não alterar o dataframe original
 
     dataframe.sort_values(elemento_contado)
@@ -273,7 +351,7 @@ def contagem_elementos(dataframe: pd.DataFrame, elemento_contado: str, nome_da_s
 
     return contagem
 
-def luciano_vis(acao: Literal["show", "save", None], path: str|None = None):
+def luciano_vis(acao: Literal["show", "save", None], path: str|None = None, pasta_dados: str = "dados"):
     """
     Gera o gráfico escolhido por Luciano. Vai ser exibido ou salvo.
 
@@ -293,6 +371,13 @@ def luciano_vis(acao: Literal["show", "save", None], path: str|None = None):
         
         Descrição: 
             path em que a figura será salva. É necessário caso o parâmetro acao seja "save".
+
+    pasta_dados:
+        Tipo: str
+
+        Descrição: 
+            pasta dos dados. O cubo de agregados só é usado se estiver atualizado em todos os meses,
+            caso contrário o csv dos antidepressivos é atualizado e lido.
     
     Exemplo:
     -----------
@@ -311,35 +396,36 @@ def luciano_vis(acao: Literal["show", "save", None], path: str|None = None):
     if acao == "save" and type(path) != str:
         raise ValueError(f"Especifique um caminho para salvar o arquivo.")
 
-    principios_de_antidepressivos = ["SELEGILINA","SERTRALINA", "AMITRIPTILINA", "CITALOPRAM",
-                                     "CLOMIPRAMINA", "IPRONIAZIDA", "MOCLOBEMIDA", "IMIPRAMINA",
-                                     "TRIMIPRAMINA", "NORTRIPTILINA", "PROTRIPTILINA", "DOXEPINA",
-                                     "AMOXAPINA", "DOTIEPINA", "OUDOSULEPINA", "FLUOXETINA",
-                                     "FLUVOXAMINA", "PAROXETINA", "ESCITALOPRAM", "NORCITALOPRAM",
-                                     "TIANEPTINA", "MIANSERINA", "DULOXETINA", "MIRTAZAPINA", "MAPROTILINA", 
-                                     "NEFAZODONA", "MILNACIPRANA", "TRAZODONA", "DESVENLAFAXINA", "VENLAFAXINA",
-                                     "BUPROPIONA"]
+    principios_de_antidepressivos = PRINCIPIOS_DE_ANTIDEPRESSIVOS
     
-    try:
-        dataframe_antidepressivos = pd.read_csv("dados/Manipulados_ANTIDEPRESSIVOS.csv")
-    except:
-        dataframe_antidepressivos = filtra_e_contatena("PRINCIPIO_ATIVO", principios_de_antidepressivos)
-        dataframe_antidepressivos.to_csv("dados/Manipulados_ANTIDEPRESSIVOS.csv", index=False)
+    # Com o cubo de agregados atualizado, as vendas já vêm contadas por mês e estado, na coluna "VENDAS".
+    coluna_dos_pesos = None
+    if cubo_atualizado("2014/01", "2021/11", pasta_dados):
+        dataframe_antidepressivos = consulta_cubo(["ANO_VENDA", "MES_VENDA", "UF_VENDA"],
+                                                  where={"PRINCIPIO_ATIVO": principios_de_antidepressivos}, path=pasta_dados)
+        coluna_dos_pesos = "VENDAS"
+    else:
+        # Apenas os meses novos são filtrados, o resto do csv é reaproveitado.
+        atualiza_antidepressivos(pasta_dados)
+        dataframe_antidepressivos = pd.read_csv(os.path.join(pasta_dados, ARQUIVO_ANTIDEPRESSIVOS))
 
     dataframe_antidepressivos["DATA"] = cria_datetime(dataframe_antidepressivos)
     dataframe_antidepressivos["REGIAO"] = dataframe_antidepressivos["UF_VENDA"].apply(regiao_estado)
-    antidepressivos_norte = utils.filtra_dados_por_valores_procurados(dataframe_antidepressivos, "REGIAO", "Norte")
-    antidepressivos_nordeste = utils.filtra_dados_por_valores_procurados(dataframe_antidepressivos, "REGIAO", "Nordeste")
-    antidepressivos_centroeste = utils.filtra_dados_por_valores_procurados(dataframe_antidepressivos, "REGIAO", "Centro-Oeste")
-    antidepressivos_sudeste = utils.filtra_dados_por_valores_procurados(dataframe_antidepressivos, "REGIAO", "Sudeste")
-    antidepressivos_sul = utils.filtra_dados_por_valores_procurados(dataframe_antidepressivos, "REGIAO", "Sul")
+    # As cinco regiões são separadas em uma única passada pela coluna.
+    antidepressivos_por_regiao = utils.divide_por_grupos(dataframe_antidepressivos, "REGIAO",
+                                                         {regiao: regiao for regiao in ["Norte", "Nordeste", "Centro-Oeste", "Sudeste", "Sul"]})
+    antidepressivos_norte = antidepressivos_por_regiao["Norte"]
+    antidepressivos_nordeste = antidepressivos_por_regiao["Nordeste"]
+    antidepressivos_centroeste = antidepressivos_por_regiao["Centro-Oeste"]
+    antidepressivos_sudeste = antidepressivos_por_regiao["Sudeste"]
+    antidepressivos_sul = antidepressivos_por_regiao["Sul"]
 
     
-    contagem_norte = contagem_elementos(antidepressivos_norte, "DATA", "NORTE")
-    contagem_nordeste = contagem_elementos(antidepressivos_nordeste, "DATA", "NORDESTE")
-    contagem_centroeste = contagem_elementos(antidepressivos_centroeste, "DATA", "CENTRO-OESTE")
-    contagem_sudeste = contagem_elementos(antidepressivos_sudeste, "DATA", "SUDESTE")
-    contagem_sul = contagem_elementos(antidepressivos_sul, "DATA", "SUL")
+    contagem_norte = contagem_elementos(antidepressivos_norte, "DATA", "NORTE", coluna_dos_pesos)
+    contagem_nordeste = contagem_elementos(antidepressivos_nordeste, "DATA", "NORDESTE", coluna_dos_pesos)
+    contagem_centroeste = contagem_elementos(antidepressivos_centroeste, "DATA", "CENTRO-OESTE", coluna_dos_pesos)
+    contagem_sudeste = contagem_elementos(antidepressivos_sudeste, "DATA", "SUDESTE", coluna_dos_pesos)
+    contagem_sul = contagem_elementos(antidepressivos_sul, "DATA", "SUL", coluna_dos_pesos)
 
     contagem = pd.concat([contagem_norte, contagem_nordeste, contagem_centroeste, contagem_sudeste, contagem_sul], axis=1)
     contagem.fillna(0, inplace=True)
@@ -10,7 +10,9 @@ import pandas as pd
 import matplotlib.pyplot as plt 
 import numpy as np 
 import doctest
-from utils import set_anabolizantes, concat_data_by_dates
+from utils import set_anabolizantes, concat_data_by_dates, divide_por_grupos
+from cubo import consulta_cubo
+from grupos_medicamentos import GRUPOS_DE_MEDICAMENTOS
 
 
 import sys, os
@@ -35,9 +37,13 @@ lista_de_colunas = ['ANO_VENDA',
                     'IDADE', 
                     'UNIDADE_IDADE']
 
-lista_de_anabolizantes = ["TESTOSTERONA",
-                            "ESTANOZOLOL",
-                            "NANDROLONA"]
+# Colunas das vendas já contadas por ano, mês e princípio ativo, como as do cubo de agregados (módulo cubo).
+lista_de_colunas_agregadas = ['ANO_VENDA',
+                              'MES_VENDA',
+                              'PRINCIPIO_ATIVO',
+                              'NUMERO_DE_VENDAS']
+
+lista_de_anabolizantes = GRUPOS_DE_MEDICAMENTOS["ANABOLIZANTES"]
 
 x_meses = {"Janeiro": 1,
             "Fevereiro": 2,
@@ -56,6 +62,7 @@ def gerador_de_frames(dataframe_filtrado:pd.DataFrame, ano_analizado:str, mes_an
     """
     Essa função recebe um dataframe filtrado pela função set_anabolizates, um ano e um mês para fazer a análise.
     Ela gera uma visualização composta por três plots e retorna a visualização para que ela possa ser salva ou exibida. 
+    O dataframe também pode ter as vendas já contadas, com as colunas de lista_de_colunas_agregadas.
 
     Parameters
     ----------
@@ -104,7 +111,7 @@ def gerador_de_frames(dataframe_filtrado:pd.DataFrame, ano_analizado:str, mes_an
         return "O dataframe está vazio."
 
     try:
-        if list(dataframe_filtrado.columns) != lista_de_colunas:
+        if list(dataframe_filtrado.columns) not in [lista_de_colunas, lista_de_colunas_agregadas]:
             raise AttributeError
     except AttributeError:
         return "O dataframe fornecido está em um formato inválido"
@@ -121,9 +128,14 @@ def gerador_de_frames(dataframe_filtrado:pd.DataFrame, ano_analizado:str, mes_an
         
 
     # filtragem e configuração do dataframe
-    dataframe_filtrado["NUMERO_DE_VENDAS"] = 1
+    if "NUMERO_DE_VENDAS" not in dataframe_filtrado.columns:
+        dataframe_filtrado["NUMERO_DE_VENDAS"] = 1
     dataframe_filtrado = dataframe_filtrado[dataframe_filtrado["ANO_VENDA"] == ano_analizado]
     dataframe_filtrado = dataframe_filtrado[dataframe_filtrado["MES_VENDA"] <= mes_analizado]
+
+    # separação dos anabolizantes em uma única passada pela coluna
+    dfs_anabolizantes = divide_por_grupos(dataframe_filtrado, "PRINCIPIO_ATIVO",
+                                          {"TESTOSTERONA": "TESTOSTERONA", "ESTANOZOLOL": "ESTANOZOLOL", "NANDROLONA": "NANDROLONA"})
     
     # criação dos objetos de plotagem
     figure, (grafico1, grafico2, grafico3) = plt.subplots(nrows=1, 
@@ -134,7 +146,7 @@ def gerador_de_frames(dataframe_filtrado:pd.DataFrame, ano_analizado:str, mes_an
     #TESTOSTERONA #######################################################################################################
 
     # plotagem do gráfico 1
-    df_testosterona = dataframe_filtrado[dataframe_filtrado["PRINCIPIO_ATIVO"] == "TESTOSTERONA"].reset_index(drop=True)
+    df_testosterona = dfs_anabolizantes["TESTOSTERONA"].reset_index(drop=True)
     df_testosterona = df_testosterona[["MES_VENDA", "NUMERO_DE_VENDAS"]]
     df_testosterona = df_testosterona.groupby("MES_VENDA").sum().reset_index(drop=True)
     numero_vendas_testosterona = list(df_testosterona["NUMERO_DE_VENDAS"]) 
@@ -150,7 +162,7 @@ def gerador_de_frames(dataframe_filtrado:pd.DataFrame, ano_analizado:str, mes_an
     #ESTANOZOLOL ########################################################################################################
 
     # plotagem do gráfico 2
-    df_estanozolol = dataframe_filtrado[dataframe_filtrado["PRINCIPIO_ATIVO"] == "ESTANOZOLOL"].reset_index(drop=True)
+    df_estanozolol = dfs_anabolizantes["ESTANOZOLOL"].reset_index(drop=True)
     df_estanozolol = df_estanozolol[["MES_VENDA", "NUMERO_DE_VENDAS"]]
     df_estanozolol = df_estanozolol.groupby("MES_VENDA").sum().reset_index(drop=True)
     numero_vendas_estanozolol = list(df_estanozolol["NUMERO_DE_VENDAS"]) 
@@ -166,7 +178,7 @@ def gerador_de_frames(dataframe_filtrado:pd.DataFrame, ano_analizado:str, mes_an
     #NANDROLONA ########################################################################################################
 
     # plotagem do gráfico 3
-    df_nandrolona = dataframe_filtrado[dataframe_filtrado["PRINCIPIO_ATIVO"] == "NANDROLONA"].reset_index(drop=True)
+    df_nandrolona = dfs_anabolizantes["NANDROLONA"].reset_index(drop=True)
     df_nandrolona = df_nandrolona[["MES_VENDA", "NUMERO_DE_VENDAS"]]
     df_nandrolona = df_nandrolona.groupby("MES_VENDA").sum().reset_index(drop=True)
     numero_vendas_nandrolona = list(df_nandrolona["NUMERO_DE_VENDAS"]) 
@@ -185,6 +197,42 @@ def gerador_de_frames(dataframe_filtrado:pd.DataFrame, ano_analizado:str, mes_an
 
     return figure, None
     
+def vendas_de_anabolizantes_do_cubo(ano_analizado:str, path:str = "dados") -> pd.DataFrame:
+    """
+    Essa função consulta no cubo de agregados (módulo cubo) o número de vendas de cada anabolizante em cada mês
+    do ano fornecido. O dataframe retornado tem as colunas de lista_de_colunas_agregadas e pode ser passado
+    diretamente para a função gerador_de_frames, sem ler os dados brutos.
+
+    Parameters
+    ----------
+    ano_analizado
+        type: str
+        description: o ano das vendas
+        example: "2015"
+
+    path
+        type: str
+        description: a pasta dos dados, onde o cubo está salvo
+        example: "dados"
+
+    Return
+    ----------
+    dataframe_agregado
+        type: pd.DataFrame
+        description: as vendas de cada anabolizante por mês, ou None caso o cubo não exista
+
+    Test
+    ----------
+    >>> vendas_de_anabolizantes_do_cubo("2015", "PASTA_INEXISTENTE")
+    O cubo ainda não foi montado, tente montá-lo com a função constroi_cubo.
+    """
+    vendas = consulta_cubo(["ANO_VENDA", "MES_VENDA", "PRINCIPIO_ATIVO"],
+                           where={"ANO_VENDA": int(ano_analizado), "PRINCIPIO_ATIVO": lista_de_anabolizantes}, path=path)
+    if vendas is None:
+        return None
+
+    return vendas.rename(columns={"VENDAS": "NUMERO_DE_VENDAS"})[lista_de_colunas_agregadas]
+
 def save_frames(figure:plt.figure, ano_analizado:str, mes_analizado:str, path_para_salvar:str) -> str:
     """
     Essa função recebe uma visualização, o ano que ela representa, o mês que ela representa e um path 
@@ -14,9 +14,15 @@ import matplotlib.pyplot as plt
 import doctest
 import utils
 from get_data import get_dates_between_dates
+from cubo import cubo_atualizado, consulta_cubo
+from grupos_medicamentos import GRUPOS_DE_MEDICAMENTOS, mascara_do_grupo
+from consulta import Consulta
 
+# Princípios ativos da cloroquina e derivados.
+PRINCIPIOS_ATIVOS_CLOROQUINA = GRUPOS_DE_MEDICAMENTOS["CLOROQUINA"]
 
-def soma_vendas_por_atributo(dados:pd.DataFrame, atributo:str) -> pd.DataFrame:
+
+def soma_vendas_por_atributo(dados:pd.DataFrame, atributo:str, coluna_das_vendas:str = None) -> pd.DataFrame:
     """Função que soma algum atributo de um dataframe.
 
     Recebe um dataframe e retorna um dataframe contendo o atributo selecionado e a quantidade
@@ -28,6 +34,9 @@ def soma_vendas_por_atributo(dados:pd.DataFrame, atributo:str) -> pd.DataFrame:
         Dataframe com a coluna do atributo
     atributo : str
         atributo onde as observações serão somadas. 
+    coluna_das_vendas : str, optional
+        Coluna com o número de vendas de cada linha, para dados já agregados como os do cubo (módulo cubo),
+        caso None cada linha conta como uma venda, by default None
 
     Returns
     -------
@@ -51,6 +60,12 @@ def soma_vendas_por_atributo(dados:pd.DataFrame, atributo:str) -> pd.DataFrame:
     1  MS       1
     2  SP       1
 
+    >>> agregados = pd.DataFrame({'UF': ["SP", "RJ", "SP"], 'VENDAS': [3, 5, 4]})
+    >>> soma_vendas_por_atributo(agregados, "UF", "VENDAS")
+       UF  vendas
+    0  SP       7
+    1  RJ       5
+
     >>> soma_vendas_por_atributo(66, "UF")
     Dataframe ou atributo inválido, tente inserir outro dataframe ou um atributo como string.
 
@@ -71,19 +86,22 @@ def soma_vendas_por_atributo(dados:pd.DataFrame, atributo:str) -> pd.DataFrame:
     else:
         # Valida o atributo
         try:
-            if atributo not in dados.columns:
+            if atributo not in dados.columns or (coluna_das_vendas != None and coluna_das_vendas not in dados.columns):
                 raise ValueError
         except ValueError:
             print("Atributo inválido, insira uma coluna da base de dados.")
         else:
-            # Faz a contagem de observações.
-            soma_vendas = pd.DataFrame()
-            vendas_totais = dados.value_counts(atributo)
+            # Faz a contagem de observações, ou a soma das vendas já contadas, em uma única consulta.
+            consulta = Consulta.do_dataframe(dados).agrupa_por(atributo)
+            if coluna_das_vendas == None:
+                consulta = consulta.conta("vendas")
+            else:
+                consulta = consulta.soma(coluna_das_vendas, "vendas")
+            soma_vendas = consulta.executa()
 
-            soma_vendas[atributo] = vendas_totais.index
-            soma_vendas["vendas"] = vendas_totais.values
-
-            return soma_vendas
+            # Atributos nulos e linhas sem vendas (como as vendas zeradas dos dados agregados) são descartados.
+            soma_vendas = soma_vendas[soma_vendas[atributo].notna() & (soma_vendas["vendas"] > 0)]
+            return soma_vendas.sort_values("vendas", ascending=False, kind="stable").reset_index(drop=True)
 
 
 def mapeia_dados_estaduais(dados_mapeamento:pd.DataFrame, coluna_estados:str,) -> pd.DataFrame:
@@ -156,7 +174,8 @@ def mapeia_dados_estaduais(dados_mapeamento:pd.DataFrame, coluna_estados:str,) -
 
 
 def gera_visualizacao_cloroquina(dados:pd.DataFrame, coluna_principio_ativo:str ="PRINCIPIO_ATIVO",
-                                 coluna_estados="UF_VENDA", cmap="plasma", vmax=400, show_figure=False) -> plt.Axes:
+                                 coluna_estados="UF_VENDA", cmap="plasma", vmax=400, show_figure=False,
+                                 coluna_das_vendas:str = None) -> plt.Axes:
     """Função que usa a biblioteca geobr e a base de dados de medicamentos manipulados para criar uma plotagem.
 
     A função recebe os dados pertinentes da análise e cria uma plotagem baseada no número de vendas
@@ -177,6 +196,8 @@ def gera_visualizacao_cloroquina(dados:pd.DataFrame, coluna_principio_ativo:str
         Valor máximo do heatmap, by default 400
     show_figure : bool, optional
         Opção para exibir a figura gerada automaticamente, by default False
+    coluna_das_vendas : str, optional
+        Coluna com o número de vendas de cada linha, para dados já agregados como os do cubo, by default None
 
     Returns
     -------
@@ -199,14 +220,6 @@ def gera_visualizacao_cloroquina(dados:pd.DataFrame, coluna_principio_ativo:str
     Coluna de estados e da contabilização de vendas devem ser colunas válidas do Dataframe. Tente inserir novas colunas.
 
     """
-    principios_ativos_cloroquina = [
-        "CLOROQUINA",
-        "DIFOSFATO DE CLOROQUINA",
-        "HIDROXICLOROQUINA",
-        "SULFATO DE HIDROXICLOROQUINA",
-        "DICLORIDRATO DE CLOROQUINA",
-        "SULFATO DE CLOROQUINA",
-    ]
     fig, ax = plt.subplots(figsize=(10, 10))
     # filtra para apenas os dados com cloroquina
     try:
@@ -221,9 +234,10 @@ def gera_visualizacao_cloroquina(dados:pd.DataFrame, coluna_principio_ativo:str
         print("Coluna de estados e da contabilização de vendas devem ser colunas válidas do Dataframe. Tente inserir novas colunas.")
 
     else:
-        dados_filtrados = utils.filtra_dados_por_valores_procurados(dados, coluna_principio_ativo, principios_ativos_cloroquina)
+        # a tabela do grupo é lida nos códigos da coluna, sem comparar os textos de cada linha
+        dados_filtrados = dados[mascara_do_grupo(dados[coluna_principio_ativo], "CLOROQUINA")]
         # contabiliza a soma das vendas destes remédios por estado
-        soma_vendas = soma_vendas_por_atributo(dados_filtrados, coluna_estados)
+        soma_vendas = soma_vendas_por_atributo(dados_filtrados, coluna_estados, coluna_das_vendas)
         # une a soma das vendas aos dados estaduais da biblioteca geobr
         dados_estaduais = mapeia_dados_estaduais(soma_vendas, coluna_estados)
 
@@ -241,13 +255,14 @@ def gera_visualizacao_cloroquina(dados:pd.DataFrame, coluna_principio_ativo:str
         return ax
 
 
-def visualizacao_sillas(data_inicial:str, data_final:str, pasta_imagens:str, save_fig:bool =True) -> plt.Axes:
+def visualizacao_sillas(data_inicial:str, data_final:str, pasta_imagens:str, save_fig:bool =True, path:str = "dados") -> plt.Axes:
     """Gera imagens a partir de duas datas, da base de dados e da função gera_visualizacao_cloroquina.
 
     A visualização final se baseia em mostrar o aumento da procura por cloroquina com o passar do tempo,
     por isso, esta função receberá duas datas, uma inicial e uma final, e as converterá em visualizações
     da cloroquina para cada data entre estas duas datas, de entrada, além disso é necessário informar o
-    diretório em que as pastas ficarão salvas.
+    diretório em que as pastas ficarão salvas. Quando o cubo de agregados (módulo cubo) está atualizado em
+    todos os meses pedidos, as vendas de cada mês são consultadas nele, sem ler os dados brutos.
 
     Parameters
     ----------
@@ -259,6 +274,8 @@ def visualizacao_sillas(data_inicial:str, data_final:str, pasta_imagens:str, sav
         Diretório onde as imagens serão salvas
     save_fig : bool, optional
         Define se as imagens serão salvas ou não, by default True
+    path : str, optional
+        A pasta dos dados, by default "dados"
 
     Raises
     ------
@@ -297,12 +314,20 @@ def visualizacao_sillas(data_inicial:str, data_final:str, pasta_imagens:str, sav
     except IndexError:
         pass
     else:
+        # Com meses sincronizados depois da última atualização do cubo, os dados brutos são lidos.
+        usa_cubo = cubo_atualizado(data_inicial, data_final, path)
         for cada_data in datas:
             ano, mes = cada_data[:4], cada_data[-2:]
 
-            dados = utils.concat_data_by_dates(cada_data, cada_data)
-
-            ax = gera_visualizacao_cloroquina(dados=dados)
+            if usa_cubo:
+                dados = consulta_cubo(["UF_VENDA", "PRINCIPIO_ATIVO"], where={"ANO_VENDA": int(ano), "MES_VENDA": int(mes),
+                                                                              "PRINCIPIO_ATIVO": PRINCIPIOS_ATIVOS_CLOROQUINA}, path=path)
+                ax = gera_visualizacao_cloroquina(dados=dados, coluna_das_vendas="VENDAS")
+            else:
+                # Apenas as vendas de cloroquina são guardadas, o resto do mês é descartado durante a leitura.
+                dados = utils.concat_data_by_dates(cada_data, cada_data, path=path, filtered_columns=["UF_VENDA", "PRINCIPIO_ATIVO"],
+                                                   where={"PRINCIPIO_ATIVO": PRINCIPIOS_ATIVOS_CLOROQUINA})
+                ax = gera_visualizacao_cloroquina(dados=dados)
             ax.set_title(label=f"Venda de Cloroquina (e derivados) em\n{meses[mes]} de {ano}", loc="right")
 
             if save_fig == True:
@@ -6,15 +6,718 @@ import sys, os
 esse_caminho = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(esse_caminho)
 
-from get_data import get_dates_between_dates
+from get_data import get_dates_between_dates, caminho_do_mes, ENCODING_DOS_DADOS
+from cache_colunar import le_mes_do_cache, colunas_do_cache, blocos_do_cache, grupos_do_indice, TAMANHO_DO_BLOCO
+from esquema import aplica_esquema, concatena_com_esquema, dtypes_de_leitura
+from catalogo import mes_pode_satisfazer
+from dicionarios import adiciona_principio_ativo_base
+from grupos_medicamentos import GRUPOS_DE_MEDICAMENTOS
 import pandas as pd
+import numpy as np
 import doctest
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
 
 
-def concat_data_by_dates(start_date: str, end_date: str, path="dados", file_names="Manipulados", filtered_columns=None) -> pd.DataFrame:
+# Tabela do banco SQL local (função constroi_banco_sql) e os índices criados nela.
+TABELA_SQL = "vendas"
+INDICES_SQL = {"idx_vendas_periodo": ["ANO_VENDA", "MES_VENDA"],
+               "idx_vendas_uf": ["UF_VENDA", "ANO_VENDA", "MES_VENDA"],
+               "idx_vendas_principio_ativo": ["PRINCIPIO_ATIVO", "ANO_VENDA", "MES_VENDA"]}
+
+# Princípios ativos selecionados pela função set_anabolizantes, também usados como filtro de linhas na leitura.
+LISTA_DE_ANABOLIZANTES = GRUPOS_DE_MEDICAMENTOS["ANABOLIZANTES"]
+
+
+def _colunas_do_mes(path: str, file_names: str, date_year: str, date_month: str) -> list:
+    """
+    Retorna as colunas de um mês sem ler os seus dados, pelo cache colunar ou pelo cabeçalho do csv.
+
+    Parameters
+    ----------
+    path
+        type: str
+        description: caminho da pasta com os arquivos
+
+    file_names
+        type: str
+        description: nome padrão de salvamento dos arquivos
+
+    date_year
+        type: str
+        description: ano do arquivo
+        example: "2014"
+
+    date_month
+        type: str
+        description: mês do arquivo com dois dígitos
+        example: "01"
+
+    Return
+    ----------
+    columns
+        type: list
+        description: lista com as colunas do arquivo
+    """
+    columns = colunas_do_cache(date_year, date_month, path, file_names)
+    if columns is None:
+        columns = list(pd.read_csv(caminho_do_mes(path, date_year, date_month, file_names), delimiter=";", encoding=ENCODING_DOS_DADOS, nrows=0).columns)
+    # A coluna PRINCIPIO_ATIVO_BASE do cache só é lida quando pedida, como nos meses lidos do csv.
+    return [column for column in columns if column != "PRINCIPIO_ATIVO_BASE"]
+
+
+def _coluna_existe(header: list, column: str) -> bool:
+    """
+    Verifica se a coluna pode ser lida dos meses com o cabeçalho dado. A coluna PRINCIPIO_ATIVO_BASE,
+    que não existe nos csv, pode ser lida de todos os meses com a coluna PRINCIPIO_ATIVO.
+
+    Parameters
+    ----------
+    header
+        type: list
+        description: colunas do mês
+
+    column
+        type: str
+        description: coluna procurada
+
+    Return
+    ----------
+    exists
+        type: bool
+        description: True caso a coluna possa ser lida
+
+    Test
+    ----------
+    >>> _coluna_existe(["ANO_VENDA", "PRINCIPIO_ATIVO"], "PRINCIPIO_ATIVO_BASE"), _coluna_existe(["ANO_VENDA"], "PRINCIPIO_ATIVO_BASE")
+    (True, False)
+    """
+    return column in header or (column == "PRINCIPIO_ATIVO_BASE" and "PRINCIPIO_ATIVO" in header)
+
+
+def _colunas_no_arquivo(columns: list, file_columns: list) -> list:
+    """
+    Retorna as colunas a serem lidas de um arquivo, trocando a coluna PRINCIPIO_ATIVO_BASE pela coluna
+    PRINCIPIO_ATIVO quando o arquivo não a possui (os csv e o cache salvo antes da coluna existir).
+    A coluna base é então gerada depois da leitura, pela função adiciona_principio_ativo_base do módulo dicionarios.
+
+    Parameters
+    ----------
+    columns
+        type: list
+        description: colunas pedidas, ou None para todas as colunas
+
+    file_columns
+        type: list
+        description: colunas do arquivo lido
+
+    Return
+    ----------
+    columns
+        type: list
+        description: colunas que existem no arquivo
+
+    Test
+    ----------
+    >>> _colunas_no_arquivo(["UF_VENDA", "PRINCIPIO_ATIVO_BASE"], ["UF_VENDA", "PRINCIPIO_ATIVO"])
+    ['UF_VENDA', 'PRINCIPIO_ATIVO']
+    """
+    if columns == None or "PRINCIPIO_ATIVO_BASE" not in columns or "PRINCIPIO_ATIVO_BASE" in file_columns:
+        return columns
+    columns = [column for column in columns if column != "PRINCIPIO_ATIVO_BASE"]
+    if "PRINCIPIO_ATIVO" not in columns:
+        columns.append("PRINCIPIO_ATIVO")
+    return columns
+
+
+def _aceita_nulo(condition) -> bool:
+    """
+    Verifica se a condição de uma coluna aceita os valores nulos.
+
+    Parameters
+    ----------
+    condition
+        type: object
+        description: condição de uma coluna, no formato da função _mascara_da_coluna
+
+    Return
+    ----------
+    accepts
+        type: bool
+        description: True caso a condição seja None ou uma lista com None
+
+    Test
+    ----------
+    >>> _aceita_nulo(None), _aceita_nulo(["SP", None]), _aceita_nulo((18, None))
+    (True, True, False)
+    """
+    if condition is None:
+        return True
+    return isinstance(condition, (list, set, frozenset)) and any(value is None for value in condition)
+
+
+def _mascara_da_coluna(column: pd.Series, condition) -> np.ndarray:
+    """
+    Calcula quais valores da coluna satisfazem a condição.
+
+    Nas colunas categóricas a condição é avaliada uma única vez para cada categoria, e cada linha
+    apenas consulta o resultado pelo seu código inteiro, sem comparar nenhum texto.
+
+    Parameters
+    ----------
+    column
+        type: pandas.Series
+        description: coluna a ser filtrada
+
+    condition
+        type: object
+        description: um valor (igualdade), uma lista ou conjunto de valores (pertinência, None aceita os nulos),
+        uma tupla (mínimo, máximo) com os limites inclusivos, None para um limite aberto, ou None (apenas os nulos)
+        example: ["SP", "RJ"], (18, 65), None
+
+    Return
+    ----------
+    mask
+        type: numpy.ndarray
+        description: array booleano com True nos valores que satisfazem a condição
+
+    Test
+    ----------
+    >>> _mascara_da_coluna(pd.Series([10, 40, None]), (18, None))
+    array([False,  True, False])
+
+    >>> _mascara_da_coluna(pd.Series(["SP", None, "RJ"], dtype="category"), ["SP", None])
+    array([ True,  True, False])
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # O código -1 (nulo) consulta a última posição, que guarda se a condição aceita os nulos.
+        accepted = np.append(_mascara_da_coluna(pd.Series(column.cat.categories), condition), _aceita_nulo(condition))
+        return accepted[column.cat.codes.to_numpy()]
+
+    if condition is None:
+        return column.isna().to_numpy()
+
+    if type(condition) == tuple:
+        minimum, maximum = condition
+        mask = column.notna().to_numpy()
+        if minimum is not None:
+            mask &= (column >= minimum).to_numpy(dtype=bool, na_value=False)
+        if maximum is not None:
+            mask &= (column <= maximum).to_numpy(dtype=bool, na_value=False)
+        return mask
+
+    if isinstance(condition, (list, set, frozenset)):
+        mask = column.isin([value for value in condition if value is not None]).to_numpy(dtype=bool, na_value=False)
+        if _aceita_nulo(condition):
+            mask |= column.isna().to_numpy()
+        return mask
+
+    return (column == condition).to_numpy(dtype=bool, na_value=False)
+
+
+def _mascara_where(dataset: pd.DataFrame, where) -> np.ndarray:
+    """
+    Calcula, em uma única passada vetorizada, quais linhas do dataframe satisfazem o predicado.
+
+    Parameters
+    ----------
+    dataset
+        type: pandas.Dataframe
+        description: dataframe a ser filtrado
+
+    where
+        type: dict or callable
+        description: dicionário com a condição de cada coluna (no formato da função _mascara_da_coluna),
+        todas combinadas com "e", ou uma função que recebe o dataframe e retorna uma série booleana
+        example: {"PRINCIPIO_ATIVO": ["ZOLPIDEM", "HEMITARTARATO DE ZOLPIDEM"], "UF_VENDA": "SP", "IDADE": (60, None)}
+
+    Return
+    ----------
+    mask
+        type: numpy.ndarray
+        description: array booleano com True nas linhas que satisfazem o predicado
+
+    Test
+    ----------
+    >>> dados = pd.DataFrame({"UF_VENDA": ["SP", "RJ", "SP"], "IDADE": [30, 70, None]})
+    >>> _mascara_where(dados, {"UF_VENDA": ["SP", "MG"]})
+    array([ True, False,  True])
+
+    >>> _mascara_where(dados, {"UF_VENDA": "SP", "IDADE": None})
+    array([False, False,  True])
+
+    >>> _mascara_where(dados, lambda dados: dados["IDADE"] > 50)
+    array([False,  True, False])
+    """
+    if callable(where):
+        return pd.Series(where(dataset)).to_numpy(dtype=bool, na_value=False)
+
+    mask = np.ones(len(dataset), dtype=bool)
+    for column, condition in where.items():
+        mask &= _mascara_da_coluna(dataset[column], condition)
+    return mask
+
+
+def mascara_de_filtros(dados: pd.DataFrame, filtros: dict) -> np.ndarray:
+    """
+    Combina as condições de várias colunas em uma única máscara booleana, calculada em uma passada vetorizada.
+
+    Diferente da função filtra_dados_por_valores_procurados, nenhuma cópia do dataframe é feita: a máscara
+    pode ser usada para selecionar as linhas (dados[mascara]), para obter as suas posições (np.flatnonzero(mascara))
+    ou para combinar outros filtros, e várias colunas são filtradas de uma só vez.
+
+    Parameters
+    ----------
+    dados
+        type: pandas.Dataframe
+        description: dataframe a ser filtrado
+
+    filtros
+        type: dict
+        description: condição de cada coluna: um valor (igualdade), uma lista de valores (pertinência, None aceita
+        os nulos), uma tupla (mínimo, máximo) com limites inclusivos, None para um limite aberto, ou None (nulos)
+        example: {"PRINCIPIO_ATIVO": ["CLOROQUINA", "DIFOSFATO DE CLOROQUINA"], "IDADE": (60, None), "CID10": None}
+
+    Return
+    ----------
+    mask
+        type: numpy.ndarray
+        description: array booleano com True nas linhas que satisfazem todas as condições
+
+    Test
+    ----------
+    >>> dados = pd.DataFrame({"UF_VENDA": pd.Categorical(["SP", "RJ", "SP", None]), "IDADE": [30, 70, 65, 80]})
+    >>> mascara_de_filtros(dados, {"UF_VENDA": ["SP", None], "IDADE": (60, None)})
+    array([False, False,  True,  True])
+
+    >>> mascara_de_filtros(42, {"IDADE": 30})
+    DataFrame inválido, tente inserir outro DataFrame.
+
+    >>> mascara_de_filtros(dados, {"COLUNA_INVÁLIDA": 30})
+    Os filtros devem ser um dicionário com colunas do DataFrame, tente inserir novamente.
+
+    >>> mascara_de_filtros(dados, {"UF_VENDA": (1, 2)})
+    Filtro inválido: '>=' not supported between instances of 'str' and 'int'
+    """
+    try:
+        if type(dados) != pd.DataFrame:
+            raise TypeError
+    except TypeError:
+        print("DataFrame inválido, tente inserir outro DataFrame.")
+        return None
+
+    try:
+        if type(filtros) != dict or any(column not in dados.columns for column in filtros):
+            raise ValueError
+    except ValueError:
+        print("Os filtros devem ser um dicionário com colunas do DataFrame, tente inserir novamente.")
+        return None
+
+    try:
+        return _mascara_where(dados, filtros)
+    except TypeError as err:
+        print("Filtro inválido:", err)
+        return None
+
+
+def _indices_dos_grupos(column: pd.Series, groups: dict) -> dict:
+    """
+    Calcula as posições das linhas de cada grupo em uma única passada pela coluna.
+
+    Cada valor diferente da coluna recebe o número do seu grupo (pelos códigos das categóricas, ou por uma
+    única fatoração por hash nas outras colunas), e as linhas são ordenadas por esse número com uma ordenação
+    estável de inteiros pequenos, que mantém a ordem original das linhas dentro de cada grupo.
+
+    Parameters
+    ----------
+    column
+        type: pandas.Series
+        description: coluna usada para separar as linhas
+
+    groups
+        type: dict
+        description: valor (ou lista de valores, com None para os nulos) de cada grupo, os grupos não podem ter valores em comum
+
+    Return
+    ----------
+    indices
+        type: dict
+        description: array com as posições das linhas de cada grupo, na ordem dos grupos
+
+    Test
+    ----------
+    >>> indices = _indices_dos_grupos(pd.Series(["A", "B", None, "A", "C"]), {"X": "A", "Y": ["B", None]})
+    >>> indices["X"].tolist(), indices["Y"].tolist()
+    ([0, 3], [1, 2])
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes, values = column.cat.codes.to_numpy(), column.cat.categories
+    else:
+        codes, values = pd.factorize(column)
+        values = pd.Index(values)
+
+    # A última posição guarda o grupo dos nulos (código -1), e o número len(groups) marca as linhas sem grupo.
+    group_of_value = np.full(len(values) + 1, len(groups), dtype=np.int16)
+    for number, accepted in enumerate(groups.values()):
+        accepted = list(accepted) if isinstance(accepted, (list, set, frozenset)) else [accepted]
+        positions = values.get_indexer([value for value in accepted if value is not None])
+        positions = positions[positions >= 0]
+        if None in accepted:
+            positions = np.append(positions, len(values))
+        if (group_of_value[positions] != len(groups)).any():
+            raise ValueError
+        group_of_value[positions] = number
+
+    group_of_row = group_of_value[codes]
+    order = np.argsort(group_of_row, kind="stable")
+    limits = np.cumsum(np.bincount(group_of_row, minlength=len(groups) + 1))
+    return dict(zip(groups, np.split(order, limits[:-1])))
+
+
+def divide_por_grupos(dados: pd.DataFrame, coluna: str, grupos: dict, retorna_indices: bool = False) -> dict:
+    """
+    Separa o dataframe em vários subconjuntos nomeados, percorrendo a coluna uma única vez.
+
+    Substitui as filtragens repetidas do mesmo dataframe, uma para cada subconjunto: o custo é o de uma
+    passada pela coluna, qualquer que seja o número de grupos. As linhas de cada grupo mantêm a ordem e o
+    índice originais, e as linhas cujo valor não está em nenhum grupo são descartadas.
+
+    Parameters
+    ----------
+    dados
+        type: pandas.Dataframe
+        description: dataframe a ser separado
+
+    coluna
+        type: str
+        description: coluna cujos valores definem os grupos
+
+    grupos
+        type: dict
+        description: valor (ou lista de valores, com None para os nulos) de cada grupo, pelo nome do grupo.
+        Um mesmo valor não pode estar em dois grupos.
+        example: {"Norte": ["AM", "PA"], "Sul": ["PR", "SC", "RS"]}
+
+    retorna_indices
+        type: bool, optional
+        description: caso True, retorna as posições das linhas de cada grupo em vez dos dataframes
+
+    Return
+    ----------
+    subsets
+        type: dict
+        description: dataframe (ou array de posições) de cada grupo, na ordem dos grupos, inclusive dos grupos vazios
+
+    Test
+    ----------
+    >>> dados = pd.DataFrame({"UF_VENDA": ["SP", "AM", "RS", "SP", "PA"], "VENDAS": [1, 2, 3, 4, 5]})
+    >>> subconjuntos = divide_por_grupos(dados, "UF_VENDA", {"Norte": ["AM", "PA"], "Sudeste": "SP", "Nordeste": ["BA"]})
+    >>> [subconjunto["VENDAS"].tolist() for subconjunto in subconjuntos.values()]
+    [[2, 5], [1, 4], []]
+
+    >>> divide_por_grupos(dados, "UF_VENDA", {"Sul": "RS"}, retorna_indices=True)
+    {'Sul': array([2])}
+
+    >>> divide_por_grupos(dados, "COLUNA_INVÁLIDA", {"Sul": "RS"})
+    Coluna selecionada inválida, tente inserir o nome de uma coluna do DataFrame.
+
+    >>> divide_por_grupos(dados, "UF_VENDA", {"A": ["SP", "RS"], "B": "SP"})
+    Os grupos devem ser um dicionário em que cada valor pertence a um único grupo, tente inserir novamente.
+    """
+    try:
+        if type(dados) != pd.DataFrame:
+            raise TypeError
+    except TypeError:
+        print("DataFrame inválido, tente inserir outro DataFrame.")
+        return None
+
+    try:
+        if coluna not in dados.columns:
+            raise ValueError
+    except ValueError:
+        print("Coluna selecionada inválida, tente inserir o nome de uma coluna do DataFrame.")
+        return None
+
+    try:
+        if type(grupos) != dict:
+            raise ValueError
+        indices = _indices_dos_grupos(dados[coluna], grupos)
+    except ValueError:
+        print("Os grupos devem ser um dicionário em que cada valor pertence a um único grupo, tente inserir novamente.")
+        return None
+
+    if retorna_indices:
+        return indices
+    return {group: dados.iloc[positions] for group, positions in indices.items()}
+
+
+def _blocos_do_mes(path: str, file_names: str, date_year: str, date_month: str, columns: list = None, where=None,
+                   chunksize: int = TAMANHO_DO_BLOCO):
+    """
+    Lê um mês em blocos de linhas, pelo cache colunar quando ele existe ou pelo csv caso contrário,
+    já com os tipos do esquema (módulo esquema). Com um predicado, cada bloco guarda apenas as linhas
+    que o satisfazem, e os blocos que ficam vazios são descartados.
+
+    Parameters
+    ----------
+    path
+        type: str
+        description: caminho da pasta com os arquivos
+
+    file_names
+        type: str
+        description: nome padrão de salvamento dos arquivos
+
+    date_year
+        type: str
+        description: ano do arquivo
+        example: "2014"
+
+    date_month
+        type: str
+        description: mês do arquivo com dois dígitos
+        example: "01"
+
+    columns
+        type: list, optional
+        description: colunas a serem lidas, caso None todas as colunas são lidas
+
+    where
+        type: dict or callable, optional
+        description: predicado das linhas mantidas, no formato da função _mascara_where
+
+    chunksize
+        type: int, optional
+        description: número máximo de linhas de cada bloco
+
+    Return
+    ----------
+    blocks
+        type: Generator[pandas.Dataframe]
+        description: gerador dos blocos do mês, com as colunas na ordem pedida
+    """
+    # O catálogo descarta, sem abrir o arquivo, os meses que não podem ter as linhas procuradas.
+    if not mes_pode_satisfazer(date_year, date_month, where, path, file_names):
+        return
+
+    # As colunas do predicado também precisam ser lidas, e são descartadas depois do filtro.
+    read_columns = columns
+    if callable(where):
+        read_columns = None
+    elif where != None and columns != None:
+        read_columns = columns + [column for column in where if column not in columns]
+
+    # Com o índice do cache, apenas os grupos de linhas que podem satisfazer o predicado são lidos.
+    groups = grupos_do_indice(date_year, date_month, where, path, file_names) if type(where) == dict else None
+    # Com o mês particionado por estado, apenas as partições dos estados procurados são lidas.
+    states = None
+    if type(where) == dict and "UF_VENDA" in where and type(where["UF_VENDA"]) != tuple:
+        states = list(where["UF_VENDA"]) if isinstance(where["UF_VENDA"], (list, set, frozenset)) else [where["UF_VENDA"]]
+    cache_columns = colunas_do_cache(date_year, date_month, path, file_names) or []
+    blocks = blocos_do_cache(date_year, date_month, path, file_names, colunas=_colunas_no_arquivo(read_columns, cache_columns),
+                             tamanho_do_bloco=chunksize, grupos=groups, ufs=states)
+    if blocks is None:
+        csv_columns = _colunas_no_arquivo(read_columns, [])
+        blocks = pd.read_csv(caminho_do_mes(path, date_year, date_month, file_names), delimiter=";", usecols=csv_columns,
+                             encoding=ENCODING_DOS_DADOS, dtype=dtypes_de_leitura(csv_columns), chunksize=chunksize, low_memory=False)
+    for block in blocks:
+        block = aplica_esquema(block)
+        if read_columns != None and "PRINCIPIO_ATIVO_BASE" in read_columns and "PRINCIPIO_ATIVO_BASE" not in block.columns:
+            block = adiciona_principio_ativo_base(block)
+        if where != None:
+            block = block[_mascara_where(block, where)]
+            if block.empty:
+                continue
+        if columns != None:
+            # O usecols do pandas não mantém a ordem das colunas pedidas.
+            block = block[columns]
+        yield block
+
+
+def _le_mes(path: str, file_names: str, date_year: str, date_month: str, columns: list = None, where=None) -> pd.DataFrame:
+    """
+    Lê os dados de um mês, usando o cache colunar quando ele existe e o csv caso contrário,
+    já com os tipos do esquema (módulo esquema). Apenas as colunas pedidas são interpretadas.
+    Com um predicado, o mês é lido em blocos e apenas as linhas que o satisfazem são guardadas.
+
+    Parameters
+    ----------
+    path
+        type: str
+        description: caminho da pasta com os arquivos
+
+    file_names
+        type: str
+        description: nome padrão de salvamento dos arquivos
+
+    date_year
+        type: str
+        description: ano do arquivo
+        example: "2014"
+
+    date_month
+        type: str
+        description: mês do arquivo com dois dígitos
+        example: "01"
+
+    columns
+        type: list, optional
+        description: colunas a serem lidas, caso None todas as colunas são lidas
+        example: "["ANO_VENDA", "PRINCIPIO_ATIVO"]"
+
+    where
+        type: dict or callable, optional
+        description: predicado das linhas mantidas, no formato da função _mascara_where
+
+    Return
+    ----------
+    dataset
+        type: pandas.Dataframe
+        description: dataframe com os dados do mês, com as colunas na ordem pedida
+    """
+    if where != None:
+        dataset = concatena_com_esquema(list(_blocos_do_mes(path, file_names, date_year, date_month, columns, where)))
+        if len(dataset.columns) == 0:
+            # Nenhuma linha do mês satisfaz o predicado.
+            dataset = pd.DataFrame(columns=columns if columns != None else _colunas_do_mes(path, file_names, date_year, date_month))
+        return dataset
+
+    cache_columns = colunas_do_cache(date_year, date_month, path, file_names) or []
+    dataset = le_mes_do_cache(date_year, date_month, path, file_names, colunas=_colunas_no_arquivo(columns, cache_columns))
+    if dataset is None:
+        csv_columns = _colunas_no_arquivo(columns, [])
+        dataset = pd.read_csv(caminho_do_mes(path, date_year, date_month, file_names), delimiter=";", usecols=csv_columns,
+                              encoding=ENCODING_DOS_DADOS, dtype=dtypes_de_leitura(csv_columns), low_memory=False)
+    if columns != None and "PRINCIPIO_ATIVO_BASE" in columns and "PRINCIPIO_ATIVO_BASE" not in dataset.columns:
+        dataset = adiciona_principio_ativo_base(dataset)
+    if columns != None:
+        # O usecols do pandas não mantém a ordem das colunas pedidas.
+        dataset = dataset[columns]
+    return aplica_esquema(dataset)
+
+
+def _valida_colunas(header: list, filtered_columns) -> list:
+    """
+    Valida as colunas filtradas pelo cabeçalho do primeiro mês.
+
+    Parameters
+    ----------
+    header
+        type: list
+        description: colunas do primeiro mês
+
+    filtered_columns
+        type: list
+        description: colunas pedidas, ou None
+
+    Return
+    ----------
+    columns
+        type: list
+        description: as colunas filtradas caso sejam válidas, ou todo o cabeçalho caso contrário
+
+    Test
+    ----------
+    >>> _valida_colunas(["ANO_VENDA", "UF_VENDA"], ["UF_VENDA"])
+    ['UF_VENDA']
+
+    >>> _valida_colunas(["ANO_VENDA", "UF_VENDA"], ["cachorro_mal"])
+    Uma ou mais colunas do filtro não estão nas colunas do dataframe, tente verificar as colunas do filtro.
+    ['ANO_VENDA', 'UF_VENDA']
+    """
+    if filtered_columns != None:
+        try:
+            if type(filtered_columns) != list:
+                raise TypeError
+            for each_column in filtered_columns:
+                if not _coluna_existe(header, each_column):
+                    raise NameError
+
+        except TypeError:
+            print("As colunas filtradas devem ser uma lista de strings das colunas do dataframe, tente inserir novamente.")
+        except NameError:
+            print("Uma ou mais colunas do filtro não estão nas colunas do dataframe, tente verificar as colunas do filtro.")
+        else:
+            return filtered_columns
+
+    # Os meses seguintes são lidos com as colunas do primeiro.
+    return header
+
+
+def _valida_where(header: list, where) -> bool:
+    """
+    Valida o predicado das linhas pelo cabeçalho do primeiro mês.
+
+    Parameters
+    ----------
+    header
+        type: list
+        description: colunas do primeiro mês
+
+    where
+        type: dict or callable
+        description: predicado das linhas, no formato da função _mascara_where, ou None
+
+    Return
+    ----------
+    valid
+        type: bool
+        description: True caso o predicado seja None, uma função ou um dicionário com colunas do cabeçalho
+
+    Test
+    ----------
+    >>> _valida_where(["ANO_VENDA", "UF_VENDA"], {"UF_VENDA": "SP"})
+    True
+
+    >>> _valida_where(["ANO_VENDA", "UF_VENDA"], {"cachorro_mal": 1})
+    O filtro de linhas deve ser um dicionário com colunas do dataframe ou uma função, tente inserir novamente.
+    False
+    """
+    try:
+        if where != None and not callable(where) and (type(where) != dict or any(not _coluna_existe(header, column) for column in where)):
+            raise TypeError
+    except TypeError:
+        print("O filtro de linhas deve ser um dicionário com colunas do dataframe ou uma função, tente inserir novamente.")
+        return False
+    return True
+
+
+def _le_mes_seguro(arguments: tuple) -> tuple:
+    """
+    Lê um mês com a função _le_mes sem levantar exceções, para que possa ser usada pelos processos
+    da leitura paralela, que então reportam os erros na mesma ordem da leitura sequencial.
+
+    Parameters
+    ----------
+    arguments
+        type: tuple
+        description: os argumentos da função _le_mes (path, file_names, date_year, date_month, columns, where)
+
+    Return
+    ----------
+    result
+        type: tuple
+        description: o dataframe do mês e None, ou None e o erro encontrado na leitura
+    """
+    try:
+        return _le_mes(*arguments), None
+    except Exception as err:
+        return None, err
+
+
+def concat_data_by_dates(start_date: str, end_date: str, path="dados", file_names="Manipulados", filtered_columns=None, workers=None, where=None) -> pd.DataFrame:
     """
     Concatena todos os dados de CSVs de dados entre as datas dadas e retorna um dataframe Pandas
     O formato do nome dos arquivos devem ser 'nomedabase_ano_mes.csv'
+    Os arquivos também podem estar comprimidos ('nomedabase_ano_mes.csv.zst' ou '.csv.gz'), e são descomprimidos durante a leitura.
+    Os meses que já foram convertidos para o cache colunar (módulo cache_colunar) são lidos do cache.
+    As colunas filtradas são validadas pelo cabeçalho do primeiro mês e apenas elas são lidas de cada arquivo.
+    Com workers, os meses são lidos em paralelo por processos e concatenados em ordem cronológica.
+    Com where, cada mês é lido em blocos e apenas as linhas que satisfazem o predicado são guardadas,
+    então o resultado nunca passa pela base inteira em memória. Os meses que, pelo catálogo (módulo catalogo),
+    não têm nenhum dos valores procurados nem são lidos.
+    A coluna PRINCIPIO_ATIVO_BASE (substância base do princípio ativo, módulo dicionarios) não é lida por padrão,
+    mas pode ser pedida nas colunas filtradas ou usada no where.
 
     Parameters
     ----------
@@ -43,6 +746,18 @@ def concat_data_by_dates(start_date: str, end_date: str, path="dados", file_name
         description: colunas a serem filtradas se necessário da base de dados, caso não sejam válidas então todo o datafram é retornado
         example: "["coluna_1"]"
 
+    workers
+        type: int, optional
+        description: número de processos que leem os meses em paralelo, caso None os meses são lidos um por vez
+        example: 8
+
+    where
+        type: dict or callable, optional
+        description: condição de cada coluna, no formato da função mascara_de_filtros (valor, lista, intervalo
+        em tupla ou None para os nulos), ou uma função que recebe um bloco de linhas e retorna uma série booleana.
+        Com workers, a função precisa ser definida no nível do módulo.
+        example: {"PRINCIPIO_ATIVO": ["CLOROQUINA", "DIFOSFATO DE CLOROQUINA"], "UF_VENDA": "SP", "IDADE": (60, None)}
+
     Return
     ----------
     dataset
@@ -65,6 +780,13 @@ def concat_data_by_dates(start_date: str, end_date: str, path="dados", file_name
     Uma ou mais colunas do filtro não estão nas colunas do dataframe, tente verificar as colunas do filtro.
     <class 'pandas.core.frame.DataFrame'>
 
+    >>> type(concat_data_by_dates("2021/01", "2021/01", workers=0))
+    O número de workers deve ser um inteiro positivo, os meses serão lidos um por vez.
+    <class 'pandas.core.frame.DataFrame'>
+
+    >>> concat_data_by_dates("2021/01", "2021/01", where={"cachorro_mal": 1})
+    O filtro de linhas deve ser um dicionário com colunas do dataframe ou uma função, tente inserir novamente.
+
     """
     try:
         # Valida as datas da concatenação.
@@ -77,49 +799,293 @@ def concat_data_by_dates(start_date: str, end_date: str, path="dados", file_name
     else:
         first_date = dates[0]
         try:
-            dataset = pd.read_csv(f"{path}/{file_names}_{first_date[:4]}_{first_date[-2:]}.csv",
-                            delimiter=";", low_memory=False)
+            # Lê apenas o cabeçalho do primeiro mês para validar o filtro antes de ler os dados.
+            header = _colunas_do_mes(path, file_names, first_date[:4], first_date[-2:])
         except Exception as err:
             print("Erro na leitura do arquivo:", err)
             return None
-        # Verifica se o filtro é valido.
+
+        # As colunas válidas são as únicas lidas de cada arquivo.
+        columns = _valida_colunas(header, filtered_columns)
+        if not _valida_where(header, where):
+            return None
+
+        if workers != None:
+            try:
+                if type(workers) != int or workers < 1:
+                    raise ValueError
+            except ValueError:
+                print("O número de workers deve ser um inteiro positivo, os meses serão lidos um por vez.")
+                workers = None
+
+        arguments = [(path, file_names, date[:4], date[-2:], columns, where) for date in dates]
+        if workers == None or len(dates) == 1:
+            results = map(_le_mes_seguro, arguments)
         else:
-            if filtered_columns != None:
-                try:
-                    if type(filtered_columns) != list:
-                        raise TypeError
-                    for each_column in filtered_columns:
-                        if each_column not in dataset.columns:
-                            raise NameError
-
-                except TypeError:
-                    print("As colunas filtradas devem ser uma lista de strings das colunas do dataframe, tente inserir novamente.")
-                except NameError:
-                    print("Uma ou mais colunas do filtro não estão nas colunas do dataframe, tente verificar as colunas do filtro.")
-                else:
-                    dataset = dataset[filtered_columns]
+            # O map do executor devolve os meses na ordem cronológica, mesmo que terminem fora de ordem.
+            executor = ProcessPoolExecutor(max_workers=min(workers, len(dates)))
+            results = executor.map(_le_mes_seguro, arguments)
 
-            if len(dates) > 1:
-                for index in range(1, len(dates)):
+        # Os meses são guardados em ordem e concatenados uma única vez no final,
+        # evitando copiar o dataframe acumulado a cada novo mês.
+        monthly_datasets = []
+        try:
+            for index, (new_dataset, err) in enumerate(results):
+                if err == None:
+                    monthly_datasets.append(new_dataset)
+                elif index == 0:
+                    print("Erro na leitura do arquivo:", err)
+                    return None
+                else:
                     date_year, date_month = dates[index][:4], dates[index][-2:]
-                    try:
-                        new_dataset = pd.read_csv(f"{path}/{file_names}_{date_year[:4]}_{date_month[-2:]}.csv",
-                                        delimiter=";", low_memory=False)
-                    except Exception as err:
-                        print(f"Não foi possível converter '{path}/{file_names}_{date_year[:4]}_{date_month[-2:]}.csv' em dataframe")
-                        print(err)
-                        continue
-            
-                    new_dataset = new_dataset[dataset.columns]
-                    
-                    dataset = pd.concat([dataset, new_dataset])
+                    print(f"Não foi possível converter '{caminho_do_mes(path, date_year, date_month, file_names)}' em dataframe")
+                    print(err)
+        finally:
+            if workers != None and len(dates) > 1:
+                executor.shutdown(cancel_futures=True)
+
+        dataset = concatena_com_esquema(monthly_datasets)
+        # Libera os meses individuais assim que o resultado é montado.
+        monthly_datasets.clear()
+
+        return dataset
+
+
+def iter_data_by_dates(start_date: str, end_date: str, path="dados", file_names="Manipulados", filtered_columns=None, where=None,
+                       chunksize: int = TAMANHO_DO_BLOCO):
+    """
+    Percorre os dados entre as datas dadas em blocos de no máximo chunksize linhas, sem montar nenhum
+    mês inteiro em memória. Cada bloco é devolvido junto com o ano e o mês de onde veio, em ordem cronológica.
+    As colunas e o predicado das linhas seguem as mesmas regras da função concat_data_by_dates.
+
+    Parameters
+    ----------
+    start_date
+        type: str
+        description: inicio da range de datas
+        example: "2014-01"
+
+    end_date
+        type: str
+        description: final da range de datas
+        example: "2021-11"
+
+    path
+        type: str
+        description: caminho da pasta com os arquivos
+        example: "dados/"
+
+    file_names
+        type: str
+        description: nome padrão de salvamento dos arquivos
+        example: "file_names_ANO_mês.csv"
+
+    filtered_columns
+        type: list, optional
+        description: colunas a serem lidas, caso não sejam válidas então todas as colunas são lidas
+        example: "["coluna_1"]"
+
+    where
+        type: dict or callable, optional
+        description: condição de cada coluna, no formato da função mascara_de_filtros, ou uma função que
+        recebe um bloco de linhas e retorna uma série booleana
+        example: {"PRINCIPIO_ATIVO": ["ZOLPIDEM", "HEMITARTARATO DE ZOLPIDEM"]}
+
+    chunksize
+        type: int, optional
+        description: número máximo de linhas de cada bloco
+        example: 100000
+
+    Return
+    ----------
+    blocks
+        type: Generator[tuple]
+        description: gerador de tuplas (ano, mês, bloco), com o ano e o mês como strings ("2014", "01")
+        e o bloco como pandas.Dataframe. Os blocos sem nenhuma linha não são devolvidos.
+
+    Test
+    ----------
+    >>> list(iter_data_by_dates("2013/01", "2014/01"))
+    Problemas com a primeira data inserida: 2013/01
+    Formato da data está incorreto ou ela não está entre Janeiro de 2014 e Novembro de 2021, tente inserir como ANO/mês, ex: '2015/05'.
+    []
+
+    >>> list(iter_data_by_dates("2014/01", "2014/01", chunksize=0))
+    O tamanho dos blocos deve ser um inteiro positivo, tente inserir novamente.
+    []
+    """
+    try:
+        # Valida as datas e o tamanho dos blocos.
+        dates = get_dates_between_dates(start_date, end_date)
+        if dates == []:
+            return
+        if type(chunksize) != int or chunksize < 1:
+            raise ValueError
+    except ValueError:
+        print("O tamanho dos blocos deve ser um inteiro positivo, tente inserir novamente.")
+        return
+
+    first_date = dates[0]
+    try:
+        header = _colunas_do_mes(path, file_names, first_date[:4], first_date[-2:])
+    except Exception as err:
+        print("Erro na leitura do arquivo:", err)
+        return
+
+    columns = _valida_colunas(header, filtered_columns)
+    if not _valida_where(header, where):
+        return
+
+    for date in dates:
+        date_year, date_month = date[:4], date[-2:]
+        try:
+            for block in _blocos_do_mes(path, file_names, date_year, date_month, columns, where, chunksize):
+                yield date_year, date_month, block
+        except Exception as err:
+            print(f"Não foi possível converter '{caminho_do_mes(path, date_year, date_month, file_names)}' em dataframe")
+            print(err)
+
+
+def constroi_banco_sql(start_date: str, end_date: str, path="dados", file_names="Manipulados") -> str:
+    """
+    Constrói um banco SQLite local com os dados entre as datas dadas, lendo cada mês em blocos, e cria os
+    índices por período, por estado e por princípio ativo. O banco é salvo na pasta dos dados como
+    'nomedabase.sqlite' e pode ser consultado sem internet pela função consulta_sql.
+
+    Parameters
+    ----------
+    start_date
+        type: str
+        description: inicio da range de datas
+        example: "2014-01"
+
+    end_date
+        type: str
+        description: final da range de datas
+        example: "2021-11"
+
+    path
+        type: str
+        description: caminho da pasta com os arquivos
+        example: "dados/"
+
+    file_names
+        type: str
+        description: nome padrão de salvamento dos arquivos
+        example: "file_names_ANO_mês.csv"
+
+    Return
+    ----------
+    database_path
+        type: str
+        description: caminho do banco construído, ou None caso nenhum mês tenha sido lido ou a escrita do banco falhe
+
+    Test
+    ----------
+    >>> constroi_banco_sql("2013/01", "2014/01")
+    Problemas com a primeira data inserida: 2013/01
+    Formato da data está incorreto ou ela não está entre Janeiro de 2014 e Novembro de 2021, tente inserir como ANO/mês, ex: '2015/05'.
+    """
+    database_path = os.path.join(path, f"{file_names}.sqlite")
+    if get_dates_between_dates(start_date, end_date) == []:
+        return None
+
+    # O banco é escrito em um arquivo temporário, assim as consultas nunca encontram um banco incompleto.
+    if os.path.isfile(database_path + ".tmp"):
+        os.remove(database_path + ".tmp")
+    connection = sqlite3.connect(database_path + ".tmp")
+    written_rows = None
+    try:
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        for _, _, block in iter_data_by_dates(start_date, end_date, path, file_names):
+            block.to_sql(TABELA_SQL, connection, if_exists="append", index=False)
+            written_rows = (written_rows or 0) + len(block)
+
+        if written_rows != None:
+            # Os índices são criados depois da inserção, o que é mais rápido do que mantê-los a cada bloco.
+            columns = [row[1] for row in connection.execute(f"PRAGMA table_info({TABELA_SQL})")]
+            for index_name, index_columns in INDICES_SQL.items():
+                if all(column in columns for column in index_columns):
+                    connection.execute(f"CREATE INDEX {index_name} ON {TABELA_SQL} ({', '.join(index_columns)})")
+            connection.execute("ANALYZE")
+        connection.commit()
+    except Exception as err:
+        # O banco temporário incompleto é descartado e o banco anterior, se existir, é mantido.
+        print("Não foi possível construir o banco SQL:", err)
+        written_rows = None
+    finally:
+        connection.close()
+
+    if written_rows == None:
+        os.remove(database_path + ".tmp")
+        return None
+    os.replace(database_path + ".tmp", database_path)
+    return database_path
+
+
+def consulta_sql(query: str, parameters=None, path="dados", file_names="Manipulados") -> pd.DataFrame:
+    """
+    Executa uma consulta SQL no banco local construído pela função constroi_banco_sql e retorna o resultado
+    como um dataframe. A tabela se chama 'vendas' e tem as colunas da base. Os valores devem ser passados
+    como parâmetros ('?' na consulta), nunca colocados diretamente no texto da consulta.
+
+    Parameters
+    ----------
+    query
+        type: str
+        description: consulta SQL
+        example: "SELECT UF_VENDA, COUNT(*) AS VENDAS FROM vendas WHERE ANO_VENDA = ? AND PRINCIPIO_ATIVO IN (?, ?) AND SEXO = ? AND IDADE > ? GROUP BY UF_VENDA"
 
-            return dataset
+    parameters
+        type: tuple or dict, optional
+        description: valores dos parâmetros da consulta
+        example: (2020, "CLOROQUINA", "HIDROXICLOROQUINA", 2, 60)
+
+    path
+        type: str
+        description: caminho da pasta com os arquivos
+        example: "dados/"
+
+    file_names
+        type: str
+        description: nome padrão de salvamento dos arquivos
+        example: "file_names_ANO_mês.csv"
+
+    Return
+    ----------
+    dataset
+        type: pandas.Dataframe
+        description: resultado da consulta, ou None caso o banco não exista ou a consulta seja inválida
+
+    Test
+    ----------
+    >>> consulta_sql("SELECT COUNT(*) FROM vendas", path="PASTA_INEXISTENTE")
+    O banco SQL ainda não foi construído, tente construí-lo com a função constroi_banco_sql.
+    """
+    database_path = os.path.join(path, f"{file_names}.sqlite")
+    try:
+        if not os.path.isfile(database_path):
+            raise FileNotFoundError
+    except FileNotFoundError:
+        print("O banco SQL ainda não foi construído, tente construí-lo com a função constroi_banco_sql.")
+        return None
+
+    # O banco é aberto apenas para leitura, assim as consultas nunca o alteram.
+    connection = sqlite3.connect(f"file:{database_path}?mode=ro", uri=True)
+    try:
+        return pd.read_sql_query(query, connection, params=parameters)
+    except (sqlite3.Error, pd.errors.DatabaseError) as err:
+        print("Consulta SQL inválida:", err)
+        return None
+    finally:
+        connection.close()
 
 
 def filtra_dados_por_valores_procurados(dados: pd.DataFrame, coluna_do_valor: str, valores_procurados: list or str) -> pd.DataFrame:
     """
     Modifica e retorna o dataframe com apenas as linhas que possuem o valor procurado na coluna especificada.
+    Para filtrar várias colunas de uma só vez, sem copiar o dataframe, use a função mascara_de_filtros.
 
     Parameters
     ----------
@@ -153,6 +1119,9 @@ def filtra_dados_por_valores_procurados(dados: pd.DataFrame, coluna_do_valor: st
     2     8
     Name: Qnt, dtype: int64
 
+    >>> len(filtra_dados_por_valores_procurados(pd.DataFrame({"UF": ["SP", None]}), "UF", None))
+    0
+
     >>> filtra_dados_por_valores_procurados(42, "PINCIPIO_ATIVO", "CLOROQUINA")
     DataFrame inválido, tente inserir outro DataFrame.
 
@@ -185,10 +1154,17 @@ def filtra_dados_por_valores_procurados(dados: pd.DataFrame, coluna_do_valor: st
             print("Coluna selecionada inválida, tente inserir o nome de uma coluna do DataFrame.")
     
         else:
+            # Valores nulos mantêm a comparação original (isin e ==), em que None não representa todos os nulos
+            # como em mascara_de_filtros. Os outros valores são comparados pelos códigos das categorias.
             if type(valores_procurados) == list:
-                dados = dados[dados[coluna_do_valor].isin(valores_procurados)]
-            else:
+                if any(pd.isna(valor) for valor in valores_procurados if np.ndim(valor) == 0):
+                    dados = dados[dados[coluna_do_valor].isin(valores_procurados)]
+                else:
+                    dados = dados[_mascara_da_coluna(dados[coluna_do_valor], valores_procurados)]
+            elif np.ndim(valores_procurados) == 0 and pd.isna(valores_procurados):
                 dados = dados[dados[coluna_do_valor] == valores_procurados]
+            else:
+                dados = dados[_mascara_da_coluna(dados[coluna_do_valor], valores_procurados)]
 
             return dados
 
@@ -222,18 +1198,14 @@ def set_anabolizantes(dataframe_bruto:pd.DataFrame) -> pd.DataFrame:
     >>> set_anabolizantes("Matheus")
     Algo deu errado. Verifique a documentação da função e tente novamente.
     """
-    lista_de_anabolizantes = ["TESTOSTERONA",
-                        "ESTANOZOLOL",
-                        "NANDROLONA"]
+    lista_de_anabolizantes = LISTA_DE_ANABOLIZANTES
 
     try: 
-        #filtragem do dataframe
-        df_testosterona = dataframe_bruto[dataframe_bruto["PRINCIPIO_ATIVO"] == lista_de_anabolizantes[0]].reset_index(drop=True)
-        df_estanozolol = dataframe_bruto[dataframe_bruto["PRINCIPIO_ATIVO"] == lista_de_anabolizantes[1]].reset_index(drop=True)
-        df_nandrolona = dataframe_bruto[dataframe_bruto["PRINCIPIO_ATIVO"] == lista_de_anabolizantes[2]].reset_index(drop=True)
+        #filtragem do dataframe, com as linhas de cada anabolizante separadas em uma única passada
+        indices = _indices_dos_grupos(dataframe_bruto["PRINCIPIO_ATIVO"], {anabolizante: anabolizante for anabolizante in lista_de_anabolizantes})
 
-        #concatenação do dataframe
-        dataframe_final = pd.concat((df_testosterona, df_estanozolol, df_nandrolona)).reset_index(drop=True)
+        #concatenação do dataframe, na ordem da lista de anabolizantes
+        dataframe_final = dataframe_bruto.iloc[np.concatenate(list(indices.values()))].reset_index(drop=True)
 
     except KeyError:
         print("Esse dataframe está no formato incorreto, ele não possui a coluna 'PRINCIPIO_ATIVO'.")
@@ -6,27 +6,45 @@ caminho_functions = os.path.join(esse_caminho, "functions")
 sys.path.append(caminho_functions)
 
 import pandas as pd
-from utils import concat_data_by_dates, filtra_dados_por_valores_procurados, set_anabolizantes
-from matheus_vis import gerador_de_frames, save_frames
+from utils import concat_data_by_dates, filtra_dados_por_valores_procurados, set_anabolizantes, LISTA_DE_ANABOLIZANTES
+from matheus_vis import gerador_de_frames, save_frames, vendas_de_anabolizantes_do_cubo
 from sillas_vis import visualizacao_sillas
 from gifs import seletor_de_frames, gerador_de_gif
-from Leonardo_vis import visualizacao_leonardo, dataframe_de_zolpidem
+from Leonardo_vis import visualizacao_leonardo, dataframe_de_zolpidem, vendas_de_zolpidem_do_cubo, PRINCIPIOS_ATIVOS_ZOLPIDEM
 from luciano_vis import luciano_vis
+from cubo import le_cubo, atualiza_cubo
 
-visualizacao_sillas("2020/01", "2021/11", "functions\\sillas_imagens")
-lista_de_frames_sillas = seletor_de_frames(2020, 2021, "functions\sillas_imagens")
-gerador_de_gif(lista_de_frames_sillas, "assets\\visualizacoes_finais", "vis_final_sillas", 1)
+# A leitura paralela dos meses cria novos processos, que importam este arquivo novamente.
+if __name__ == "__main__":
+    # Com o cubo de agregados montado (cubo.constroi_cubo), as visualizações não leem os dados brutos.
+    cubo_montado = le_cubo() is not None
+    if cubo_montado:
+        # Apenas os meses publicados ou baixados desde a última execução são adicionados ao cubo.
+        atualiza_cubo("2014/01", "2021/11")
 
-for cada_ano in range(2014, 2021):
-    dados_brutos = concat_data_by_dates(f"{cada_ano}/01", f"{cada_ano}/12")
-    dados_filtrados = set_anabolizantes(dados_brutos) 
-    for cada_mes in range(1, 13):
-        figure, valor_nulo = gerador_de_frames(dados_filtrados, str(cada_ano), str(cada_mes))
-        save_frames(figure, cada_ano, cada_mes, "functions\\matheus_imagens")
-lista_de_frames_sillas = seletor_de_frames(2014, 2020, "functions\matheus_imagens")
-gerador_de_gif(lista_de_frames_sillas, "assets\\visualizacoes_finais", "vis_final_matheus", 3)
+    visualizacao_sillas("2020/01", "2021/11", "functions\\sillas_imagens")
+    lista_de_frames_sillas = seletor_de_frames(2020, 2021, "functions\sillas_imagens")
+    gerador_de_gif(lista_de_frames_sillas, "assets\\visualizacoes_finais", "vis_final_sillas", 1)
 
-dados_leo = concat_data_by_dates("2014/01", "2020/12", filtered_columns = ["ANO_VENDA", "PRINCIPIO_ATIVO"])
-visualizacao_leonardo(dados_leo, "assets\\visualizacoes_finais")
+    for cada_ano in range(2014, 2021):
+        if cubo_montado:
+            dados_filtrados = vendas_de_anabolizantes_do_cubo(str(cada_ano))
+        else:
+            dados_brutos = concat_data_by_dates(f"{cada_ano}/01", f"{cada_ano}/12", workers=os.cpu_count(),
+                                               where={"PRINCIPIO_ATIVO": LISTA_DE_ANABOLIZANTES})
+            dados_filtrados = set_anabolizantes(dados_brutos) 
+        for cada_mes in range(1, 13):
+            figure, valor_nulo = gerador_de_frames(dados_filtrados, str(cada_ano), str(cada_mes))
+            save_frames(figure, cada_ano, cada_mes, "functions\\matheus_imagens")
+    lista_de_frames_sillas = seletor_de_frames(2014, 2020, "functions\matheus_imagens")
+    gerador_de_gif(lista_de_frames_sillas, "assets\\visualizacoes_finais", "vis_final_matheus", 3)
 
-luciano_vis("save", "assets/visualizacoes_finais/vis_luciano.png")
\ No newline at end of file
+    if cubo_montado:
+        dados_leo = vendas_de_zolpidem_do_cubo()
+        dados_leo = dados_leo[dados_leo["ANO_VENDA"] <= 2020]
+    else:
+        dados_leo = concat_data_by_dates("2014/01", "2020/12", filtered_columns = ["ANO_VENDA", "PRINCIPIO_ATIVO"],
+                                        where={"PRINCIPIO_ATIVO": PRINCIPIOS_ATIVOS_ZOLPIDEM})
+    visualizacao_leonardo(dados_leo, "assets\\visualizacoes_finais")
+
+    luciano_vis("save", "assets/visualizacoes_finais/vis_luciano.png")
\ No newline at end of file
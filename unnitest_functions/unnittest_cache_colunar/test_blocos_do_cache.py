@@ -0,0 +1,51 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'blocos_do_cache', que pertence
+ao módulo 'cache_colunar.py'. A função recebe um ano e um mês e lê o arquivo do cache colunar
+desse mês em blocos de linhas.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import os
+import tempfile
+import pandas as pd
+from cache_colunar import blocos_do_cache, converte_para_parquet
+
+
+class Test_Blocos_Do_Cache(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        dados = pd.DataFrame({"ANO_VENDA": [2014] * 5, "MES_VENDA": [1] * 5,
+                              "UF_VENDA": ["SP", "RJ", "SP", "MG", "BA"], "IDADE": [10, 20, 30, 40, 50]})
+        dados.to_csv(os.path.join(self.pasta.name, "Manipulados_2014_01.csv"), sep=";", index=False)
+        converte_para_parquet("2014/01", "2014/01", self.pasta.name)
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_mes_fora_do_cache(self):
+        """
+        verifica se a função retorna None para um mês que não está no cache.
+        """
+        self.assertIsNone(blocos_do_cache("2014", "02", self.pasta.name))
+
+    def test_blocos(self):
+        """
+        verifica se os blocos têm o tamanho pedido, apenas as colunas pedidas e o índice contínuo.
+        """
+        blocos = list(blocos_do_cache("2014", "01", self.pasta.name, colunas=["IDADE"], tamanho_do_bloco=2))
+        self.assertEqual([len(bloco) for bloco in blocos], [2, 2, 1])
+        self.assertEqual(list(blocos[-1].columns), ["IDADE"])
+        self.assertEqual(list(pd.concat(blocos).index), [0, 1, 2, 3, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
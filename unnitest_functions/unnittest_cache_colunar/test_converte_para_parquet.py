@@ -0,0 +1,89 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'converte_para_parquet', que pertence
+ao módulo 'cache_colunar.py'. A função recebe duas datas da forma "AAAAmm" e converte os csv mensais
+da pasta de dados para o cache colunar, particionado por ano e mês.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import os
+import tempfile
+import pandas as pd
+from cache_colunar import converte_para_parquet, caminho_cache_mes, le_mes_do_cache
+from utils import concat_data_by_dates
+
+
+class Test_Converte_Para_Parquet(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        for mes in [1, 2, 3]:
+            dados = pd.DataFrame({"ANO_VENDA": [2014] * 4, "MES_VENDA": [mes] * 4,
+                                  "UF_VENDA": ["SP", "RJ", "SP", "MG"],
+                                  "PRINCIPIO_ATIVO": ["ZOLPIDEM", "CLOROQUINA", "TESTOSTERONA", "ZOLPIDEM"]})
+            dados.to_csv(os.path.join(self.pasta.name, f"Manipulados_2014_0{mes}.csv"), sep=";", index=False)
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_conversao(self):
+        """
+        verifica se cada mês é convertido para o caminho particionado por ano e mês.
+        """
+        convertidos = converte_para_parquet("2014/01", "2014/03", self.pasta.name)
+        self.assertEqual(convertidos, [caminho_cache_mes("2014", f"0{mes}", self.pasta.name) for mes in [1, 2, 3]])
+        self.assertTrue(os.path.isfile(os.path.join(self.pasta.name, "parquet", "ano=2014", "mes=02", "Manipulados.parquet")))
+
+    def test_meses_ja_convertidos(self):
+        """
+        verifica se os meses que já estão no cache não são convertidos novamente, a não ser que seja pedido.
+        """
+        converte_para_parquet("2014/01", "2014/03", self.pasta.name)
+        self.assertEqual(converte_para_parquet("2014/01", "2014/03", self.pasta.name), [])
+        self.assertEqual(len(converte_para_parquet("2014/01", "2014/03", self.pasta.name, sobrescrever=True)), 3)
+
+    def test_cache_desatualizado(self):
+        """
+        verifica se um csv alterado depois da conversão é lido no lugar do cache, até ser convertido novamente.
+        """
+        converte_para_parquet("2014/01", "2014/01", self.pasta.name)
+        caminho_csv = os.path.join(self.pasta.name, "Manipulados_2014_01.csv")
+        pd.DataFrame({"ANO_VENDA": [2014], "MES_VENDA": [1], "UF_VENDA": ["BA"], "PRINCIPIO_ATIVO": ["ZOLPIDEM"]}).to_csv(
+            caminho_csv, sep=";", index=False)
+        # O cache fica mais antigo que o csv, mesmo em sistemas de arquivos com datas de baixa precisão.
+        data_do_csv = os.path.getmtime(caminho_csv)
+        os.utime(caminho_cache_mes("2014", "01", self.pasta.name), (data_do_csv - 10, data_do_csv - 10))
+
+        self.assertIsNone(le_mes_do_cache("2014", "01", self.pasta.name))
+        self.assertEqual(list(concat_data_by_dates("2014/01", "2014/01", path=self.pasta.name)["UF_VENDA"]), ["BA"])
+        self.assertEqual(len(converte_para_parquet("2014/01", "2014/01", self.pasta.name)), 1)
+        self.assertEqual(list(le_mes_do_cache("2014", "01", self.pasta.name)["UF_VENDA"]), ["BA"])
+
+    def test_leitura_pelo_cache(self):
+        """
+        verifica se a função concat_data_by_dates passa a ler do cache, mesmo sem os csv.
+        """
+        converte_para_parquet("2014/01", "2014/03", self.pasta.name)
+        for mes in [1, 2, 3]:
+            os.remove(os.path.join(self.pasta.name, f"Manipulados_2014_0{mes}.csv"))
+
+        dados = concat_data_by_dates("2014/01", "2014/03", path=self.pasta.name, filtered_columns=["MES_VENDA"])
+        self.assertEqual(list(dados["MES_VENDA"].unique()), [1, 2, 3])
+        self.assertEqual(len(dados), 12)
+
+    def test_mes_inexistente(self):
+        """
+        verifica se um mês sem csv é apenas ignorado.
+        """
+        self.assertEqual(len(converte_para_parquet("2014/03", "2014/04", self.pasta.name)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
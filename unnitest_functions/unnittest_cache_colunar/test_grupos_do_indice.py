@@ -0,0 +1,79 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'grupos_do_indice', que pertence
+ao módulo 'cache_colunar.py'. A função recebe um ano, um mês e um filtro de linhas e usa o índice
+do cache para retornar apenas os grupos de linhas que podem ter as linhas procuradas.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import os
+import tempfile
+import pandas as pd
+import cache_colunar
+from cache_colunar import grupos_do_indice, converte_para_parquet, constroi_indice, caminho_indice_mes, caminho_cache_mes
+from utils import concat_data_by_dates
+
+
+class Test_Grupos_Do_Indice(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.linhas_por_grupo = cache_colunar.LINHAS_POR_GRUPO
+        # Grupos de duas linhas: [ZOLPIDEM, CLOROQUINA], [TESTOSTERONA, TESTOSTERONA], [ZOLPIDEM, DIPIRONA]
+        cache_colunar.LINHAS_POR_GRUPO = 2
+        dados = pd.DataFrame({"ANO_VENDA": [2014] * 6, "MES_VENDA": [1] * 6,
+                              "UF_VENDA": ["SP", "RJ", "SP", "MG", "BA", "SP"],
+                              "PRINCIPIO_ATIVO": ["ZOLPIDEM", "CLOROQUINA", "TESTOSTERONA", "TESTOSTERONA", "ZOLPIDEM", "DIPIRONA"]})
+        dados.to_csv(os.path.join(self.pasta.name, "Manipulados_2014_01.csv"), sep=";", index=False)
+        converte_para_parquet("2014/01", "2014/01", self.pasta.name)
+
+    def tearDown(self):
+        cache_colunar.LINHAS_POR_GRUPO = self.linhas_por_grupo
+        self.pasta.cleanup()
+
+    def test_grupos(self):
+        """
+        verifica se apenas os grupos que têm os valores procurados são retornados.
+        """
+        self.assertEqual(grupos_do_indice("2014", "01", {"PRINCIPIO_ATIVO": "ZOLPIDEM"}, self.pasta.name), [0, 2])
+        self.assertEqual(grupos_do_indice("2014", "01", {"PRINCIPIO_ATIVO": ["CLOROQUINA", "TESTOSTERONA"]}, self.pasta.name), [0, 1])
+        self.assertEqual(grupos_do_indice("2014", "01", {"PRINCIPIO_ATIVO": "IBUPROFENO"}, self.pasta.name), [])
+
+    def test_sem_coluna_indexada(self):
+        """
+        verifica se o índice não é usado quando o filtro não tem nenhuma coluna indexada.
+        """
+        self.assertIsNone(grupos_do_indice("2014", "01", {"UF_VENDA": "SP"}, self.pasta.name))
+
+    def test_indice_desatualizado(self):
+        """
+        verifica se um índice que não corresponde ao arquivo do cache é ignorado, e se ele pode ser construído novamente.
+        """
+        pd.DataFrame({"PRINCIPIO_ATIVO": ["ZOLPIDEM"] * 3}).to_parquet(caminho_cache_mes("2014", "01", self.pasta.name), index=False)
+        self.assertIsNone(grupos_do_indice("2014", "01", {"PRINCIPIO_ATIVO": "ZOLPIDEM"}, self.pasta.name))
+
+        os.remove(caminho_indice_mes("2014", "01", self.pasta.name))
+        constroi_indice("2014", "01", self.pasta.name)
+        self.assertEqual(grupos_do_indice("2014", "01", {"PRINCIPIO_ATIVO": "ZOLPIDEM"}, self.pasta.name), [0])
+
+    def test_leitura_pelo_indice(self):
+        """
+        verifica se a leitura filtrada pelo índice retorna as mesmas linhas, nas mesmas posições, que a leitura sem o cache.
+        """
+        pelo_indice = concat_data_by_dates("2014/01", "2014/01", path=self.pasta.name, where={"PRINCIPIO_ATIVO": "ZOLPIDEM"})
+        os.remove(caminho_cache_mes("2014", "01", self.pasta.name))
+        pelo_csv = concat_data_by_dates("2014/01", "2014/01", path=self.pasta.name, where={"PRINCIPIO_ATIVO": "ZOLPIDEM"})
+        self.assertEqual(list(pelo_indice.index), [0, 4])
+        self.assertEqual(list(pelo_indice["UF_VENDA"]), list(pelo_csv["UF_VENDA"]))
+        self.assertEqual(list(pelo_indice.index), list(pelo_csv.index))
+
+
+if __name__ == "__main__":
+    unittest.main()
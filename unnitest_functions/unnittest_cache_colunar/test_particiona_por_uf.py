@@ -0,0 +1,77 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'particiona_por_uf', que pertence
+ao módulo 'cache_colunar.py'. A função salva as linhas de cada estado de um mês em uma partição
+("uf=XX") e as leituras filtradas por UF_VENDA passam a ler apenas as partições dos estados procurados.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import os
+import time
+import tempfile
+import pandas as pd
+from unittest import mock
+import cache_colunar
+from cache_colunar import particiona_por_uf, particoes_uf, UF_NULA
+from utils import concat_data_by_dates
+
+
+class Test_Particiona_Por_Uf(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        for mes in [1, 2]:
+            self.escreve_mes(mes, ["SP", "RJ", None, "SP", "MG"])
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def escreve_mes(self, mes, ufs):
+        dados = pd.DataFrame({"ANO_VENDA": [2020] * len(ufs), "MES_VENDA": [mes] * len(ufs), "UF_VENDA": ufs,
+                              "IDADE": list(range(len(ufs)))})
+        dados.to_csv(os.path.join(self.pasta.name, f"Manipulados_2020_0{mes}.csv"), sep=";", index=False)
+
+    def test_particoes(self):
+        """
+        verifica se cada estado, e as linhas sem estado, tem a sua partição.
+        """
+        criadas = particiona_por_uf("2020/01", "2020/02", self.pasta.name)
+        self.assertEqual(len(criadas), 8)
+        self.assertEqual(sorted(particoes_uf("2020", "01", self.pasta.name)), ["MG", "RJ", "SP", UF_NULA])
+
+    def test_poda_por_uf(self):
+        """
+        verifica se apenas as partições dos estados procurados são lidas e se o resultado é o mesmo da leitura do csv.
+        """
+        esperado = concat_data_by_dates("2020/01", "2020/02", self.pasta.name, where={"UF_VENDA": ["SP", "MG"]})
+        particiona_por_uf("2020/01", "2020/02", self.pasta.name)
+
+        with mock.patch.object(cache_colunar.pq, "read_table", wraps=cache_colunar.pq.read_table) as leitura:
+            dados = concat_data_by_dates("2020/01", "2020/02", self.pasta.name, where={"UF_VENDA": ["SP", "MG"]})
+        self.assertEqual(leitura.call_count, 4)
+        pd.testing.assert_frame_equal(dados, esperado, check_dtype=False, check_categorical=False)
+        self.assertEqual(list(dados.index), [0, 3, 4, 0, 3, 4])
+
+    def test_particoes_desatualizadas(self):
+        """
+        verifica se as partições mais antigas que o csv são ignoradas e se os estados que saíram do mês são removidos.
+        """
+        particiona_por_uf("2020/01", "2020/01", self.pasta.name)
+        time.sleep(0.01)
+        self.escreve_mes(1, ["SP", "SP"])
+        self.assertEqual(particoes_uf("2020", "01", self.pasta.name), {})
+        self.assertEqual(len(concat_data_by_dates("2020/01", "2020/01", self.pasta.name, where={"UF_VENDA": "SP"})), 2)
+
+        particiona_por_uf("2020/01", "2020/01", self.pasta.name)
+        self.assertEqual(list(particoes_uf("2020", "01", self.pasta.name)), ["SP"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'atualiza_catalogo', que pertence
+ao módulo 'catalogo.py'. A função calcula as estatísticas de cada mês da pasta dos dados (linhas, colunas,
+mínimo e máximo, nulos e valores de cada coluna), que são usadas para pular os meses que não podem ter
+as linhas procuradas.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import os
+import time
+import tempfile
+import pandas as pd
+from unittest import mock
+import utils
+from catalogo import atualiza_catalogo, mes_pode_satisfazer, estima_memoria, entrada_do_catalogo
+from utils import concat_data_by_dates
+
+
+class Test_Atualiza_Catalogo(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        principios = {1: ["ZOLPIDEM", "CLOROQUINA", "ZOLPIDEM"], 2: ["TESTOSTERONA", "CLOROQUINA", None]}
+        for mes in [1, 2]:
+            dados = pd.DataFrame({"ANO_VENDA": [2014] * 3, "MES_VENDA": [mes] * 3, "PRINCIPIO_ATIVO": principios[mes],
+                                  "IDADE": [30, None, 70 + mes]})
+            dados.to_csv(os.path.join(self.pasta.name, f"Manipulados_2014_0{mes}.csv"), sep=";", index=False)
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_estatisticas(self):
+        """
+        verifica as estatísticas guardadas de cada mês.
+        """
+        catalogo = atualiza_catalogo("2014/01", "2014/03", self.pasta.name)
+        self.assertEqual(sorted(catalogo), ["201401", "201402"])
+
+        fevereiro = catalogo["201402"]
+        self.assertEqual(fevereiro["linhas"], 3)
+        self.assertEqual(fevereiro["colunas"], ["ANO_VENDA", "MES_VENDA", "PRINCIPIO_ATIVO", "IDADE"])
+        self.assertEqual(fevereiro["bytes"], os.path.getsize(os.path.join(self.pasta.name, "Manipulados_2014_02.csv")))
+        self.assertEqual(fevereiro["estatisticas"]["PRINCIPIO_ATIVO"],
+                         {"min": "CLOROQUINA", "max": "TESTOSTERONA", "nulos": 1, "valores": ["CLOROQUINA", "TESTOSTERONA"]})
+        self.assertEqual(fevereiro["estatisticas"]["IDADE"], {"min": 30, "max": 72, "nulos": 1, "valores": [30, 72]})
+
+    def test_poda_dos_meses(self):
+        """
+        verifica se os meses que não têm os valores procurados não são lidos.
+        """
+        atualiza_catalogo("2014/01", "2014/02", self.pasta.name)
+        self.assertFalse(mes_pode_satisfazer("2014", "02", {"PRINCIPIO_ATIVO": "ZOLPIDEM"}, self.pasta.name))
+        self.assertTrue(mes_pode_satisfazer("2014", "02", {"PRINCIPIO_ATIVO": ["ZOLPIDEM", "CLOROQUINA"]}, self.pasta.name))
+
+        with mock.patch.object(utils, "blocos_do_cache", wraps=utils.blocos_do_cache) as leitura:
+            dados = concat_data_by_dates("2014/01", "2014/02", self.pasta.name, where={"PRINCIPIO_ATIVO": "ZOLPIDEM"})
+        self.assertEqual(leitura.call_count, 1)
+        self.assertEqual(list(dados["PRINCIPIO_ATIVO"]), ["ZOLPIDEM", "ZOLPIDEM"])
+
+    def test_mes_alterado(self):
+        """
+        verifica se um mês alterado depois do catálogo é ignorado até a próxima atualização.
+        """
+        atualiza_catalogo("2014/01", "2014/02", self.pasta.name)
+        time.sleep(0.01)
+        dados = pd.DataFrame({"ANO_VENDA": [2014], "MES_VENDA": [2], "PRINCIPIO_ATIVO": ["ZOLPIDEM"], "IDADE": [40]})
+        dados.to_csv(os.path.join(self.pasta.name, "Manipulados_2014_02.csv"), sep=";", index=False)
+
+        self.assertIsNone(entrada_do_catalogo("2014", "02", self.pasta.name))
+        self.assertTrue(mes_pode_satisfazer("2014", "02", {"PRINCIPIO_ATIVO": "ZOLPIDEM"}, self.pasta.name))
+        self.assertEqual(atualiza_catalogo("2014/01", "2014/02", self.pasta.name)["201402"]["linhas"], 1)
+
+    def test_estima_memoria(self):
+        """
+        verifica a estimativa dos bytes ocupados pelas colunas lidas.
+        """
+        atualiza_catalogo("2014/01", "2014/02", self.pasta.name)
+        # ANO_VENDA (2 bytes) e PRINCIPIO_ATIVO (1 byte por código) em 6 linhas.
+        self.assertEqual(estima_memoria("2014/01", "2014/02", ["ANO_VENDA", "PRINCIPIO_ATIVO"], self.pasta.name), 18)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'fatia_por_meses', que pertence
+ao módulo 'colunas_mapeadas.py'. A função recebe duas datas da forma "AAAAmm" e retorna os meses
+entre elas como uma fatia do arquivo colunar aberto por mapeamento de memória.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import os
+import tempfile
+import pandas as pd
+from colunas_mapeadas import fatia_por_meses, fatia_por_principios_ativos, constroi_colunas_mapeadas
+from utils import concat_data_by_dates
+
+
+class Test_Fatia_Por_Meses(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        for mes, estado in zip([1, 2, 3], ["MG", "BA", "AM"]):
+            dados = pd.DataFrame({"ANO_VENDA": [2014] * 4, "MES_VENDA": [mes] * 4, "UF_VENDA": ["SP", "RJ", "SP", estado],
+                                  "PRINCIPIO_ATIVO": ["ZOLPIDEM", "CLOROQUINA", None, f"NOVO_{mes}"],
+                                  "SEXO": [1, None, 2, 1], "QTD_UNIDADE_FARMACOTECNICA": ["1,5", "2", "3", "4"]})
+            dados.to_csv(os.path.join(self.pasta.name, f"Manipulados_2014_0{mes}.csv"), sep=";", index=False)
+        constroi_colunas_mapeadas("2014/01", "2014/03", self.pasta.name)
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_mesmos_dados_da_concatenacao(self):
+        """
+        verifica se a fatia tem os mesmos dados, com os mesmos tipos, que a concatenação dos mesmos meses.
+        """
+        fatia = fatia_por_meses("2014/02", "2014/03", self.pasta.name)
+        concatenado = concat_data_by_dates("2014/02", "2014/03", path=self.pasta.name).reset_index(drop=True)
+        self.assertEqual(list(fatia.dtypes.astype(str)), list(concatenado.dtypes.astype(str)))
+        self.assertEqual(fatia.astype(str).values.tolist(), concatenado.astype(str).values.tolist())
+
+    def test_fatia_sem_copia(self):
+        """
+        verifica se a fatia do Arrow compartilha a memória do arquivo mapeado, e se os códigos
+        dos princípios ativos são os mesmos em todos os meses.
+        """
+        fatia = fatia_por_meses("2014/03", "2014/03", self.pasta.name, colunas=["PRINCIPIO_ATIVO"], como_tabela=True)
+        self.assertEqual(fatia.num_rows, 4)
+        self.assertEqual(fatia.column("PRINCIPIO_ATIVO").chunk(0).dictionary.to_pylist(),
+                         ["CLOROQUINA", "NOVO_1", "ZOLPIDEM", "NOVO_2", "NOVO_3"])
+        self.assertEqual(fatia.column("PRINCIPIO_ATIVO").chunk(0).indices.to_pylist(), [2, 0, None, 4])
+
+    def test_fatia_por_principios_ativos(self):
+        """
+        verifica se as linhas dos princípios ativos pedidos são retornadas em ordem cronológica.
+        """
+        linhas = fatia_por_principios_ativos(["ZOLPIDEM", "NOVO_2", "INEXISTENTE"], self.pasta.name, colunas=["MES_VENDA", "PRINCIPIO_ATIVO"])
+        self.assertEqual(linhas["MES_VENDA"].tolist(), [1, 2, 2, 3])
+        self.assertEqual(linhas["PRINCIPIO_ATIVO"].tolist(), ["ZOLPIDEM", "ZOLPIDEM", "NOVO_2", "ZOLPIDEM"])
+
+    def test_periodo_sem_meses(self):
+        """
+        verifica se um período sem meses retorna uma fatia vazia, e se nada é retornado sem o arquivo colunar.
+        """
+        self.assertEqual(len(fatia_por_meses("2015/01", "2015/02", self.pasta.name)), 0)
+        self.assertIsNone(fatia_por_meses("2014/01", "2014/02", "PASTA_INEXISTENTE"))
+
+    def test_mes_com_outros_tipos(self):
+        """
+        verifica se um mês com tipos diferentes dos do primeiro mês interrompe a escrita sem deixar o arquivo
+        temporário, mantendo o arquivo anterior.
+        """
+        for mes, valores in [(1, [1, 2]), (2, ["a", "b"])]:
+            dados = pd.DataFrame({"ANO_VENDA": [2014] * 2, "MES_VENDA": [mes] * 2, "OUTRA": valores})
+            dados.to_csv(os.path.join(self.pasta.name, f"Manipulados_2014_0{mes}.csv"), sep=";", index=False)
+        caminho = os.path.join(self.pasta.name, "colunas", "Manipulados.arrow")
+        self.assertIsNone(constroi_colunas_mapeadas("2014/01", "2014/02", self.pasta.name))
+        self.assertFalse(os.path.exists(caminho + ".tmp"))
+        self.assertEqual(len(fatia_por_meses("2014/01", "2014/03", self.pasta.name)), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
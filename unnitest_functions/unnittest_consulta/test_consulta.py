@@ -0,0 +1,130 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da classe 'Consulta', que pertence ao módulo
+'consulta.py'. A classe registra os filtros, as colunas e a agregação de uma consulta aos dados mensais
+e os executa de uma só vez, pelo cubo de agregados quando ele está atualizado ou lendo os meses em blocos.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import tempfile
+import pandas as pd
+from consulta import Consulta
+from cubo import constroi_cubo
+from cache_colunar import converte_para_parquet
+from utils import concat_data_by_dates
+from grupos_medicamentos import GRUPOS_DE_MEDICAMENTOS
+
+
+class Test_Consulta(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a classe
+    """
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        for mes in [1, 2, 3]:
+            dados = pd.DataFrame({"ANO_VENDA": [2014] * 5, "MES_VENDA": [mes] * 5,
+                                  "UF_VENDA": ["SP", "RJ", "SP", "SP", "BA"],
+                                  "PRINCIPIO_ATIVO": ["ZOLPIDEM", "CLOROQUINA", "HEMITARTARATO DE ZOLPIDEM", "TESTOSTERONA", "ZOLPIDEM"],
+                                  "QTD_UNIDADE_FARMACOTECNICA": ["30", "10,5", "60", "1", "30"],
+                                  "SEXO": [1, 2, 1, None, 2], "IDADE": [30, 40, 50, 60, 70]})
+            dados.to_csv(os.path.join(self.pasta.name, f"Manipulados_2014_0{mes}.csv"), sep=";", index=False)
+        self.zolpidem = Consulta("2014/01", "2014/02", self.pasta.name).where({"PRINCIPIO_ATIVO": GRUPOS_DE_MEDICAMENTOS["ZOLPIDEM"]})
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_mesmo_resultado_da_leitura_completa(self):
+        """
+        verifica se a contagem da consulta é a mesma feita sobre os dados lidos com concat_data_by_dates.
+        """
+        brutos = concat_data_by_dates("2014/01", "2014/02", path=self.pasta.name)
+        brutos = brutos[brutos["PRINCIPIO_ATIVO"].isin(GRUPOS_DE_MEDICAMENTOS["ZOLPIDEM"])]
+        esperado = brutos.groupby("UF_VENDA", observed=True).size()
+
+        for convertido in [False, True]:
+            if convertido:
+                converte_para_parquet("2014/01", "2014/02", self.pasta.name)
+            consulta = self.zolpidem.agrupa_por("UF_VENDA").conta()
+            self.assertEqual(consulta.plano()["origem"], "meses")
+            resultado = consulta.executa()
+            self.assertEqual(dict(zip(resultado["UF_VENDA"], resultado["VENDAS"])), esperado.to_dict())
+
+    def test_plano_pelo_cubo(self):
+        """
+        verifica se o cubo é usado apenas quando ele tem todos os meses da consulta, com o mesmo resultado.
+        """
+        pelos_meses = self.zolpidem.agrupa_por("MES_VENDA").soma("QTD_UNIDADE_FARMACOTECNICA").executa()
+        constroi_cubo("2014/01", "2014/02", self.pasta.name)
+
+        consulta = self.zolpidem.agrupa_por("MES_VENDA").soma("QTD_UNIDADE_FARMACOTECNICA")
+        self.assertEqual(consulta.plano()["origem"], "cubo")
+        pd.testing.assert_frame_equal(consulta.executa(), pelos_meses, check_dtype=False)
+
+        # O terceiro mês não está no cubo, e a consulta volta a ler os meses.
+        ate_marco = Consulta("2014/01", "2014/03", self.pasta.name).agrupa_por("MES_VENDA").conta()
+        self.assertEqual(ate_marco.plano()["origem"], "meses")
+        self.assertEqual(ate_marco.executa()["VENDAS"].tolist(), [5, 5, 5])
+        # A idade não é chave do cubo.
+        self.assertEqual(self.zolpidem.where({"IDADE": (40, None)}).conta().plano()["origem"], "meses")
+
+    def test_somas_grandes(self):
+        """
+        verifica se as somas acima de 2^24 unidades são exatas e iguais pelo cubo e pelos meses.
+        """
+        dados = pd.DataFrame({"ANO_VENDA": [2014] * 3, "MES_VENDA": [4] * 3, "UF_VENDA": ["SP"] * 3,
+                              "PRINCIPIO_ATIVO": ["ZOLPIDEM"] * 3, "QTD_UNIDADE_FARMACOTECNICA": [16777216, 1, 1], "SEXO": [1] * 3})
+        dados.to_csv(os.path.join(self.pasta.name, "Manipulados_2014_04.csv"), sep=";", index=False)
+        consulta = Consulta("2014/04", "2014/04", self.pasta.name).soma("QTD_UNIDADE_FARMACOTECNICA")
+        self.assertEqual(consulta.executa()["QTD_UNIDADE_FARMACOTECNICA"].tolist(), [16777218.0])
+
+        constroi_cubo("2014/04", "2014/04", self.pasta.name)
+        self.assertEqual(consulta.plano()["origem"], "cubo")
+        self.assertEqual(consulta.executa()["QTD_UNIDADE_FARMACOTECNICA"].tolist(), [16777218.0])
+        self.assertEqual(consulta.agrupa_por("UF_VENDA").executa()["QTD_UNIDADE_FARMACOTECNICA"].tolist(), [16777218.0])
+
+    def test_filtros_e_colunas(self):
+        """
+        verifica os filtros na mesma coluna, por função e as colunas selecionadas.
+        """
+        consulta = self.zolpidem.where({"UF_VENDA": ["SP", "BA"]}).where({"UF_VENDA": "SP"}).where(lambda dados: dados["IDADE"] > 40)
+        self.assertEqual(consulta.plano()["filtros_depois_da_leitura"], 2)
+        resultado = consulta.seleciona(["MES_VENDA", "IDADE"]).executa()
+        self.assertEqual(list(resultado.columns), ["MES_VENDA", "IDADE"])
+        self.assertEqual(resultado["MES_VENDA"].tolist(), [1, 2])
+        self.assertEqual(resultado["IDADE"].tolist(), [50, 50])
+
+    def test_consulta_imutavel(self):
+        """
+        verifica se encadear uma operação não altera a consulta original.
+        """
+        total = self.zolpidem.conta()
+        self.zolpidem.where({"UF_VENDA": "SP"})
+        self.assertEqual(total.executa()["VENDAS"].tolist(), [6])
+
+    def test_dataframe_carregado(self):
+        """
+        verifica a consulta sobre um dataframe já carregado, inclusive com chaves categóricas.
+        """
+        dados = concat_data_by_dates("2014/01", "2014/03", path=self.pasta.name)
+        resultado = Consulta.do_dataframe(dados).where({"SEXO": 1}).agrupa_por(["PRINCIPIO_ATIVO"]).conta().executa()
+        self.assertEqual(resultado["PRINCIPIO_ATIVO"].tolist(), ["HEMITARTARATO DE ZOLPIDEM", "ZOLPIDEM"])
+        self.assertEqual(resultado["VENDAS"].tolist(), [3, 3])
+
+    def test_consultas_invalidas(self):
+        """
+        verifica se as consultas inválidas não retornam nada.
+        """
+        self.assertIsNone(self.zolpidem.where("UF_VENDA").conta().executa())
+        self.assertIsNone(self.zolpidem.agrupa_por(3).conta().executa())
+        self.assertIsNone(self.zolpidem.agrupa_por("COLUNA_INVALIDA").conta().executa())
+        self.assertIsNone(Consulta("2013/01", "2014/01", self.pasta.name).conta().executa())
+        self.assertIsNone(Consulta.do_dataframe(pd.DataFrame({"A": [1]})).where({"B": 1}).executa())
+
+
+if __name__ == "__main__":
+    unittest.main()
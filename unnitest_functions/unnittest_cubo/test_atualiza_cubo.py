@@ -0,0 +1,120 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'atualiza_cubo', que pertence
+ao módulo 'cubo.py'. A função recebe duas datas da forma "AAAAmm" e atualiza o cubo de agregados
+calculando apenas os meses novos ou alterados desde a última atualização.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import os
+import tempfile
+import pandas as pd
+from cubo import atualiza_cubo, constroi_cubo, consulta_cubo, cubo_atualizado
+from cache_colunar import converte_para_parquet, caminho_cache_mes, cache_atualizado
+
+
+class Test_Atualiza_Cubo(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.escreve_mes(1, ["SP", "RJ", "SP"])
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def escreve_mes(self, mes, estados):
+        """
+        escreve o csv de um mês com uma venda de zolpidem em cada estado dado.
+        """
+        dados = pd.DataFrame({"ANO_VENDA": [2014] * len(estados), "MES_VENDA": [mes] * len(estados), "UF_VENDA": estados,
+                              "PRINCIPIO_ATIVO": ["ZOLPIDEM"] * len(estados), "QTD_UNIDADE_FARMACOTECNICA": [30] * len(estados),
+                              "SEXO": [1] * len(estados)})
+        dados.to_csv(os.path.join(self.pasta.name, f"Manipulados_2014_0{mes}.csv"), sep=";", index=False)
+
+    def test_apenas_meses_novos(self):
+        """
+        verifica se apenas o mês publicado depois da montagem do cubo é calculado, e se o resultado
+        é o mesmo de montar o cubo do zero.
+        """
+        self.assertEqual(atualiza_cubo("2014/01", "2014/03", self.pasta.name), ["201401"])
+        self.assertEqual(atualiza_cubo("2014/01", "2014/03", self.pasta.name), [])
+
+        self.escreve_mes(2, ["BA"])
+        self.assertEqual(atualiza_cubo("2014/01", "2014/03", self.pasta.name), ["201402"])
+        atualizado = consulta_cubo(["MES_VENDA", "UF_VENDA"], path=self.pasta.name)
+
+        constroi_cubo("2014/01", "2014/03", self.pasta.name)
+        pd.testing.assert_frame_equal(atualizado, consulta_cubo(["MES_VENDA", "UF_VENDA"], path=self.pasta.name))
+
+    def test_mes_alterado(self):
+        """
+        verifica se um mês baixado novamente substitui as suas linhas antigas no cubo.
+        """
+        atualiza_cubo("2014/01", "2014/01", self.pasta.name)
+        self.escreve_mes(1, ["MG", "MG", "MG", "MG"])
+        os.utime(os.path.join(self.pasta.name, "Manipulados_2014_01.csv"), ns=(0, 10**18))
+
+        self.assertEqual(atualiza_cubo("2014/01", "2014/01", self.pasta.name), ["201401"])
+        consulta = consulta_cubo(["UF_VENDA"], path=self.pasta.name)
+        self.assertEqual(dict(zip(consulta["UF_VENDA"], consulta["VENDAS"])), {"MG": 4})
+
+    def test_cubo_atualizado(self):
+        """
+        verifica se o cubo só é considerado atualizado enquanto nenhum mês do intervalo for publicado depois dele.
+        """
+        self.assertFalse(cubo_atualizado("2014/01", "2014/02", self.pasta.name))
+        atualiza_cubo("2014/01", "2014/02", self.pasta.name)
+        self.assertTrue(cubo_atualizado("2014/01", "2014/02", self.pasta.name))
+
+        self.escreve_mes(2, ["BA"])
+        self.assertFalse(cubo_atualizado("2014/01", "2014/02", self.pasta.name))
+        self.assertTrue(cubo_atualizado("2014/01", "2014/01", self.pasta.name))
+
+    def test_mes_corrompido(self):
+        """
+        verifica se um mês cujo csv não pode ser lido continua desatualizado, sendo calculado novamente
+        na próxima atualização, em vez de ser registrado no cubo sem nenhuma venda.
+        """
+        atualiza_cubo("2014/01", "2014/01", self.pasta.name)
+        with open(os.path.join(self.pasta.name, "Manipulados_2014_02.csv"), "wb") as arquivo:
+            arquivo.write(b"ANO_VENDA;MES\x00\xff\n2014;2\n")
+
+        self.assertEqual(atualiza_cubo("2014/01", "2014/02", self.pasta.name), ["201402"])
+        self.assertEqual(atualiza_cubo("2014/01", "2014/02", self.pasta.name), ["201402"])
+
+        self.escreve_mes(2, ["BA", "BA"])
+        self.assertEqual(atualiza_cubo("2014/01", "2014/02", self.pasta.name), ["201402"])
+        consulta = consulta_cubo(["MES_VENDA"], path=self.pasta.name)
+        self.assertEqual(dict(zip(consulta["MES_VENDA"], consulta["VENDAS"])), {1: 3, 2: 2})
+        self.assertEqual(atualiza_cubo("2014/01", "2014/02", self.pasta.name), [])
+
+    def test_mes_alterado_com_cache(self):
+        """
+        verifica se um mês alterado depois de convertido para o cache colunar é recalculado pelo novo csv,
+        e se o seu cache é convertido novamente.
+        """
+        self.escreve_mes(1, ["SP"])
+        converte_para_parquet("2014/01", "2014/01", self.pasta.name)
+        atualiza_cubo("2014/01", "2014/01", self.pasta.name)
+        self.assertEqual(consulta_cubo([], path=self.pasta.name)["VENDAS"].tolist(), [1])
+
+        self.escreve_mes(1, ["SP", "RJ", "BA"])
+        caminho_csv = os.path.join(self.pasta.name, "Manipulados_2014_01.csv")
+        data_do_csv = os.path.getmtime(caminho_csv)
+        os.utime(caminho_cache_mes("2014", "01", self.pasta.name), (data_do_csv - 10, data_do_csv - 10))
+
+        self.assertEqual(atualiza_cubo("2014/01", "2014/01", self.pasta.name), ["201401"])
+        self.assertEqual(consulta_cubo([], path=self.pasta.name)["VENDAS"].tolist(), [3])
+        self.assertTrue(cache_atualizado("2014", "01", self.pasta.name))
+        self.assertEqual(atualiza_cubo("2014/01", "2014/01", self.pasta.name), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'consulta_cubo', que pertence
+ao módulo 'cubo.py'. A função recebe as chaves do cubo pelas quais as vendas serão somadas e,
+opcionalmente, um filtro das chaves, e responde a consulta pelo cubo de agregados já montado.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import os
+import tempfile
+import pandas as pd
+from cubo import consulta_cubo, constroi_cubo, caminho_do_cubo
+from utils import concat_data_by_dates
+
+
+class Test_Consulta_Cubo(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        for mes in [1, 2]:
+            dados = pd.DataFrame({"ANO_VENDA": [2014] * 5, "MES_VENDA": [mes] * 5,
+                                  "UF_VENDA": ["SP", "RJ", "SP", "SP", "BA"],
+                                  "PRINCIPIO_ATIVO": ["ZOLPIDEM", "CLOROQUINA", "ZOLPIDEM", "TESTOSTERONA", "ZOLPIDEM"],
+                                  "QTD_UNIDADE_FARMACOTECNICA": ["30", "10,5", "60", "1", "30"],
+                                  "SEXO": [1, 2, 1, None, 2], "IDADE": [30, 40, 50, 60, 70]})
+            dados.to_csv(os.path.join(self.pasta.name, f"Manipulados_2014_0{mes}.csv"), sep=";", index=False)
+        self.caminho = constroi_cubo("2014/01", "2014/02", self.pasta.name)
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_cubo_montado(self):
+        """
+        verifica se o cubo é salvo na pasta dos dados, com uma linha por combinação das chaves.
+        """
+        self.assertEqual(self.caminho, caminho_do_cubo(self.pasta.name))
+        self.assertEqual(len(pd.read_parquet(self.caminho)), 8)
+
+    def test_mesmas_contagens_dos_dados_brutos(self):
+        """
+        verifica se as vendas por estado consultadas no cubo são as mesmas contadas nos dados brutos.
+        """
+        brutos = concat_data_by_dates("2014/01", "2014/02", path=self.pasta.name, where={"PRINCIPIO_ATIVO": "ZOLPIDEM"})
+        consulta = consulta_cubo(["UF_VENDA"], where={"PRINCIPIO_ATIVO": "ZOLPIDEM"}, path=self.pasta.name)
+        self.assertEqual(dict(zip(consulta["UF_VENDA"], consulta["VENDAS"])),
+                         brutos["UF_VENDA"].value_counts().loc[lambda contagem: contagem > 0].to_dict())
+
+    def test_soma_das_unidades(self):
+        """
+        verifica se as unidades são somadas, e se as vendas sem sexo preenchido são mantidas.
+        """
+        consulta = consulta_cubo(["MES_VENDA"], where={"UF_VENDA": "SP"}, path=self.pasta.name)
+        self.assertEqual(consulta["QTD_UNIDADE_FARMACOTECNICA"].tolist(), [91.0, 91.0])
+        self.assertEqual(consulta["VENDAS"].tolist(), [3, 3])
+
+        total = consulta_cubo([], path=self.pasta.name)
+        self.assertEqual(total["VENDAS"].tolist(), [10])
+
+    def test_consulta_pela_base(self):
+        """
+        verifica se a substância base pode ser usada na consulta, sem estar entre as chaves do cubo.
+        """
+        consulta = consulta_cubo(["PRINCIPIO_ATIVO_BASE"], where={"PRINCIPIO_ATIVO_BASE": ["ZOLPIDEM", "CLOROQUINA"]}, path=self.pasta.name)
+        self.assertEqual(dict(zip(consulta["PRINCIPIO_ATIVO_BASE"], consulta["VENDAS"])), {"CLOROQUINA": 2, "ZOLPIDEM": 6})
+
+    def test_consulta_invalida(self):
+        """
+        verifica se a função não retorna nada caso a consulta use colunas que não são chaves do cubo,
+        ou caso o cubo não tenha sido montado.
+        """
+        self.assertIsNone(consulta_cubo(["IDADE"], path=self.pasta.name))
+        self.assertIsNone(consulta_cubo(["UF_VENDA"], where={"IDADE": 30}, path=self.pasta.name))
+        self.assertIsNone(consulta_cubo(["UF_VENDA"], path="PASTA_INEXISTENTE"))
+
+
+if __name__ == "__main__":
+    unittest.main()
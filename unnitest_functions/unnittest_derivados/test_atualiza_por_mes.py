@@ -0,0 +1,72 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'atualiza_por_mes', que pertence
+ao módulo 'derivados.py'. A função recebe um dado derivado da base e o atualiza calculando apenas
+os meses cuja versão na base mudou desde a última atualização.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import os
+import tempfile
+import pandas as pd
+from derivados import atualiza_por_mes, meses_desatualizados
+
+
+class Test_Atualiza_Por_Mes(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.pasta.name, "derivado.csv")
+        self.calculados = []
+        for mes in [1, 2]:
+            pd.DataFrame({"ANO_VENDA": [2014], "MES_VENDA": [mes]}).to_csv(os.path.join(self.pasta.name, f"Manipulados_2014_0{mes}.csv"), sep=";", index=False)
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def calcula_mes(self, ano, mes):
+        """
+        dado derivado de teste: uma linha por mês, com o número de vezes que o mês foi calculado.
+        """
+        self.calculados.append(f"{ano}/{mes}")
+        if mes == "03":
+            return None
+        return pd.DataFrame({"ANO_VENDA": [int(ano)], "MES_VENDA": [int(mes)], "CALCULOS": [self.calculados.count(f"{ano}/{mes}")]})
+
+    def atualiza(self):
+        return atualiza_por_mes(self.caminho, "2014/01", "2014/03", self.calcula_mes, pd.read_csv,
+                                lambda dados, caminho: dados.to_csv(caminho, index=False), self.pasta.name)
+
+    def test_atualizacao_incremental(self):
+        """
+        verifica se apenas os meses novos são calculados e se as linhas dos outros meses são mantidas.
+        """
+        self.assertEqual(self.atualiza(), ["201401", "201402"])
+        self.assertEqual(self.atualiza(), [])
+
+        pd.DataFrame({"ANO_VENDA": [2014], "MES_VENDA": [2]}).to_csv(os.path.join(self.pasta.name, "Manipulados_2014_02.csv"), sep=";", index=False)
+        os.utime(os.path.join(self.pasta.name, "Manipulados_2014_02.csv"), ns=(0, 10**18))
+        self.assertEqual(meses_desatualizados(self.caminho, "2014/01", "2014/03", self.pasta.name), ["201402"])
+        self.atualiza()
+        self.assertEqual(pd.read_csv(self.caminho)["CALCULOS"].tolist(), [1, 2])
+
+    def test_mes_que_falhou(self):
+        """
+        verifica se um mês que não pôde ser calculado continua desatualizado.
+        """
+        self.atualiza()
+        pd.DataFrame({"ANO_VENDA": [2014], "MES_VENDA": [3]}).to_csv(os.path.join(self.pasta.name, "Manipulados_2014_03.csv"), sep=";", index=False)
+        self.assertEqual(self.atualiza(), ["201403"])
+        self.assertEqual(self.atualiza(), ["201403"])
+        self.assertEqual(len(pd.read_csv(self.caminho)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'adiciona_principio_ativo_base', que pertence
+ao módulo 'dicionarios.py'. A função gera a coluna PRINCIPIO_ATIVO_BASE, com a substância base (sem acentos e sem
+o sal) de cada princípio ativo, normalizando apenas as categorias da coluna PRINCIPIO_ATIVO.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import tempfile
+import pandas as pd
+from dicionarios import adiciona_principio_ativo_base, le_dicionario
+from cache_colunar import converte_para_parquet, le_mes_do_cache
+from utils import concat_data_by_dates
+
+
+class Test_Adiciona_Principio_Ativo_Base(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        principios = {1: ["DIFOSFATO DE CLOROQUINA", "ZOLPIDEM", "CLOROQUINA"],
+                      2: ["HEMITARTARATO DE ZOLPIDEM", "SULFATO DE HIDROXICLOROQUINA", None]}
+        for mes in [1, 2]:
+            dados = pd.DataFrame({"ANO_VENDA": [2014] * 3, "MES_VENDA": [mes] * 3, "UF_VENDA": ["SP", "RJ", "SP"],
+                                  "PRINCIPIO_ATIVO": principios[mes]})
+            dados.to_csv(os.path.join(self.pasta.name, f"Manipulados_2014_0{mes}.csv"), sep=";", index=False)
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_bases(self):
+        """
+        verifica a substância base de cada linha, inclusive das linhas nulas.
+        """
+        dados = pd.DataFrame({"PRINCIPIO_ATIVO": ["Cloridrato de Sertralina", "SERTRALINA", None, "DICLORIDRATO DE CLOROQUINA"]})
+        bases = adiciona_principio_ativo_base(dados)["PRINCIPIO_ATIVO_BASE"]
+        self.assertIsInstance(bases.dtype, pd.CategoricalDtype)
+        self.assertEqual(bases.tolist()[:2] + bases.tolist()[3:], ["SERTRALINA", "SERTRALINA", "CLOROQUINA"])
+        self.assertTrue(pd.isna(bases.iloc[2]))
+        self.assertIs(adiciona_principio_ativo_base(pd.DataFrame({"UF_VENDA": ["SP"]}))["UF_VENDA"].dtype, pd.Series(["SP"]).dtype)
+
+    def test_coluna_do_cache(self):
+        """
+        verifica se o cache colunar salva a coluna base com os códigos do seu dicionário global.
+        """
+        converte_para_parquet("2014/01", "2014/02", self.pasta.name)
+        self.assertEqual(le_dicionario("PRINCIPIO_ATIVO_BASE", self.pasta.name), ["CLOROQUINA", "ZOLPIDEM", "HIDROXICLOROQUINA"])
+        fevereiro = le_mes_do_cache("2014", "02", self.pasta.name)
+        self.assertEqual(fevereiro["PRINCIPIO_ATIVO_BASE"].cat.codes.tolist(), [1, 2, -1])
+
+    def test_leitura_pedida(self):
+        """
+        verifica se a coluna base só é lida quando pedida, e se ela é igual lida do csv ou do cache colunar.
+        """
+        colunas = ["MES_VENDA", "PRINCIPIO_ATIVO_BASE"]
+        self.assertNotIn("PRINCIPIO_ATIVO_BASE", concat_data_by_dates("2014/01", "2014/02", path=self.pasta.name).columns)
+        do_csv = concat_data_by_dates("2014/01", "2014/02", path=self.pasta.name, filtered_columns=colunas,
+                                      where={"PRINCIPIO_ATIVO_BASE": ["CLOROQUINA", "ZOLPIDEM"]})
+        self.assertEqual(do_csv["PRINCIPIO_ATIVO_BASE"].tolist(), ["CLOROQUINA", "ZOLPIDEM", "CLOROQUINA", "ZOLPIDEM"])
+
+        converte_para_parquet("2014/01", "2014/02", self.pasta.name)
+        self.assertNotIn("PRINCIPIO_ATIVO_BASE", concat_data_by_dates("2014/01", "2014/02", path=self.pasta.name).columns)
+        do_cache = concat_data_by_dates("2014/01", "2014/02", path=self.pasta.name, filtered_columns=colunas,
+                                        where={"PRINCIPIO_ATIVO_BASE": ["CLOROQUINA", "ZOLPIDEM"]})
+        self.assertEqual(do_cache["PRINCIPIO_ATIVO_BASE"].tolist(), do_csv["PRINCIPIO_ATIVO_BASE"].tolist())
+        self.assertEqual(do_cache["MES_VENDA"].tolist(), [1, 1, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'atualiza_dicionarios', que pertence
+ao módulo 'dicionarios.py'. A função adiciona aos dicionários globais os valores novos de um mês e converte
+as colunas dicionarizadas para os códigos globais, que são usados por todos os meses do cache colunar.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import os
+import tempfile
+import pandas as pd
+from dicionarios import atualiza_dicionarios, le_dicionario
+from cache_colunar import converte_para_parquet, le_mes_do_cache
+from utils import concat_data_by_dates
+
+
+class Test_Atualiza_Dicionarios(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        principios = {1: ["ZOLPIDEM", "CLOROQUINA", "ZOLPIDEM"], 2: ["TESTOSTERONA", "ZOLPIDEM", None]}
+        for mes in [1, 2]:
+            dados = pd.DataFrame({"ANO_VENDA": [2014] * 3, "MES_VENDA": [mes] * 3, "UF_VENDA": ["SP", "RJ", "SP"],
+                                  "PRINCIPIO_ATIVO": principios[mes]})
+            dados.to_csv(os.path.join(self.pasta.name, f"Manipulados_2014_0{mes}.csv"), sep=";", index=False)
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_codigos_estaveis(self):
+        """
+        verifica se os valores novos são adicionados ao final do dicionário, sem mudar os códigos antigos.
+        """
+        primeiro = atualiza_dicionarios(pd.DataFrame({"DCB": ["B", "A", "B"]}), self.pasta.name)
+        self.assertEqual(le_dicionario("DCB", self.pasta.name), ["A", "B"])
+        self.assertEqual(primeiro["DCB"].cat.codes.tolist(), [1, 0, 1])
+
+        segundo = atualiza_dicionarios(pd.DataFrame({"DCB": ["C", "B"], "UF_VENDA": ["SP", "RJ"]}), self.pasta.name)
+        self.assertEqual(le_dicionario("DCB", self.pasta.name), ["A", "B", "C"])
+        self.assertEqual(segundo["DCB"].cat.codes.tolist(), [2, 1])
+        # Colunas fora dos dicionários não são alteradas.
+        self.assertEqual(segundo["UF_VENDA"].dtype, object)
+
+    def test_cache_compartilha_dicionario(self):
+        """
+        verifica se os meses do cache têm as mesmas categorias e se a concatenação mantém os códigos globais.
+        """
+        converte_para_parquet("2014/01", "2014/02", self.pasta.name)
+        dicionario = le_dicionario("PRINCIPIO_ATIVO", self.pasta.name)
+        self.assertEqual(dicionario, ["CLOROQUINA", "ZOLPIDEM", "TESTOSTERONA"])
+
+        # O primeiro mês foi salvo antes de TESTOSTERONA entrar no dicionário e recebe a categoria na leitura.
+        janeiro = le_mes_do_cache("2014", "01", self.pasta.name)
+        self.assertEqual(janeiro["PRINCIPIO_ATIVO"].cat.categories.tolist(), dicionario)
+        self.assertEqual(janeiro["PRINCIPIO_ATIVO"].cat.codes.tolist(), [1, 0, 1])
+
+        concatenado = concat_data_by_dates("2014/01", "2014/02", self.pasta.name)
+        self.assertEqual(concatenado["PRINCIPIO_ATIVO"].cat.categories.tolist(), dicionario)
+        self.assertEqual(concatenado["PRINCIPIO_ATIVO"].cat.codes.tolist(), [1, 0, 1, 2, 1, -1])
+
+    def test_dicionario_inexistente(self):
+        """
+        verifica se um dicionário que ainda não existe é lido como vazio.
+        """
+        self.assertEqual(le_dicionario("CID10", self.pasta.name), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
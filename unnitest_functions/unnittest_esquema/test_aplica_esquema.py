@@ -0,0 +1,72 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'aplica_esquema', que pertence
+ao módulo 'esquema.py'. A função recebe um dataframe da base de dados e converte as suas colunas
+para os tipos do esquema: categóricas para os textos e inteiros ou floats menores para os números.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import os
+import tempfile
+import pandas as pd
+from esquema import aplica_esquema
+from utils import concat_data_by_dates
+
+
+class Test_Aplica_Esquema(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def test_tipos_convertidos(self):
+        """
+        verifica se as colunas do esquema são convertidas e as demais mantidas.
+        """
+        dados = pd.DataFrame({"ANO_VENDA": [2014, 2014], "MES_VENDA": [1, 2], "UF_VENDA": ["SP", "RJ"],
+                              "QTD_UNIDADE_FARMACOTECNICA": ["1,5", "30"], "IDADE": [45, None], "OUTRA": ["a", "b"]})
+        convertidos = aplica_esquema(dados)
+
+        self.assertEqual(convertidos["ANO_VENDA"].dtype, "int16")
+        self.assertEqual(convertidos["MES_VENDA"].dtype, "int8")
+        self.assertEqual(convertidos["UF_VENDA"].dtype, "category")
+        self.assertEqual(convertidos["QTD_UNIDADE_FARMACOTECNICA"].dtype, "float32")
+        self.assertEqual(convertidos["IDADE"].dtype, "Int16")
+        self.assertEqual(convertidos["OUTRA"].dtype, object)
+        self.assertEqual(convertidos["QTD_UNIDADE_FARMACOTECNICA"].tolist(), [1.5, 30.0])
+
+    def test_coluna_nao_convertida(self):
+        """
+        verifica se uma coluna com valores que não podem ser convertidos é mantida como está.
+        """
+        dados = pd.DataFrame({"IDADE": ["trinta", "40"]})
+        self.assertEqual(aplica_esquema(dados)["IDADE"].tolist(), ["trinta", "40"])
+
+    def test_dataframe_invalido(self):
+        """
+        verifica se a função não retorna nada caso o dataframe seja inválido.
+        """
+        self.assertIsNone(aplica_esquema("Matheus"))
+
+    def test_leitura_de_varios_meses(self):
+        """
+        verifica se a leitura de vários meses mantém as colunas categóricas, mesmo com categorias
+        diferentes em cada mês.
+        """
+        with tempfile.TemporaryDirectory() as pasta:
+            for mes, uf in [(1, "SP"), (2, "RJ")]:
+                pd.DataFrame({"ANO_VENDA": [2014], "MES_VENDA": [mes], "UF_VENDA": [uf], "IDADE": [30]}).to_csv(
+                    os.path.join(pasta, f"Manipulados_2014_0{mes}.csv"), sep=";", index=False)
+
+            dados = concat_data_by_dates("2014/01", "2014/02", path=pasta)
+
+        self.assertEqual(dados["UF_VENDA"].dtype, "category")
+        self.assertEqual(dados["UF_VENDA"].tolist(), ["SP", "RJ"])
+        self.assertEqual(dados["MES_VENDA"].dtype, "int8")
+
+
+if __name__ == "__main__":
+    unittest.main()
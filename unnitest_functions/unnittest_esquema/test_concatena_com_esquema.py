@@ -0,0 +1,52 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'concatena_com_esquema', que pertence
+ao módulo 'esquema.py'. A função recebe uma lista de dataframes mensais e os concatena de uma só vez,
+mantendo a ordem dos meses e as colunas categóricas.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import pandas as pd
+from esquema import concatena_com_esquema
+
+
+class Test_Concatena_Com_Esquema(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def test_ordem_dos_meses(self):
+        """
+        verifica se as linhas mantêm a ordem dos meses da lista, assim como os índices de cada mês.
+        """
+        meses = [pd.DataFrame({"MES_VENDA": pd.Series([mes, mes], dtype="int8"),
+                               "UF_VENDA": pd.Categorical(["SP", f"UF{mes}"])}) for mes in range(1, 13)]
+        concatenado = concatena_com_esquema(meses)
+
+        self.assertEqual(concatenado["MES_VENDA"].tolist(), [mes for mes in range(1, 13) for _ in range(2)])
+        self.assertEqual(concatenado.index.tolist(), [0, 1] * 12)
+        self.assertEqual(concatenado["MES_VENDA"].dtype, "int8")
+        self.assertEqual(concatenado["UF_VENDA"].dtype, "category")
+        self.assertEqual(concatenado["UF_VENDA"].tolist()[:4], ["SP", "UF1", "SP", "UF2"])
+
+    def test_colunas_diferentes(self):
+        """
+        verifica se dataframes com colunas diferentes ainda são concatenados, completando os valores faltantes.
+        """
+        concatenado = concatena_com_esquema([pd.DataFrame({"A": [1]}), pd.DataFrame({"B": [2]})])
+        self.assertEqual(list(concatenado.columns), ["A", "B"])
+        self.assertEqual(len(concatenado), 2)
+
+    def test_lista_vazia(self):
+        """
+        verifica se uma lista vazia resulta em um dataframe vazio.
+        """
+        self.assertTrue(concatena_com_esquema([]).empty)
+
+
+if __name__ == "__main__":
+    unittest.main()
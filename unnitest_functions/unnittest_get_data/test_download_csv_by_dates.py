@@ -13,14 +13,49 @@ sys.path.append(caminho_functions)
 
 import unittest
 import os
+import gzip
+import tempfile
+import threading
+import functools
+import zstandard
 import pandas as pd  
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 from get_data import download_csv_by_dates
 
 
+class Servidor_Local(SimpleHTTPRequestHandler):
+    """
+    servidor que imita o site da ANVISA, servindo os arquivos de uma pasta local com conexões keep-alive.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+
 class Test_Download_Csv_By_Dates(unittest.TestCase):
     """
     a classe vai conter os diferentes testes feitos para a função
     """
+    def setUp(self):
+        self.pasta_servidor = tempfile.TemporaryDirectory()
+        self.pasta_saida = tempfile.TemporaryDirectory()
+        for mes in ["01", "02", "03"]:
+            with open(os.path.join(self.pasta_servidor.name, f"EDA_Manipulados_2014{mes}.csv"), "w", encoding="cp1252") as arquivo:
+                # O último mês não termina com quebra de linha, para verificar a concatenação.
+                final = "" if mes == "03" else "\n"
+                arquivo.write(f"ANO_VENDA;MES_VENDA;MUNICIPIO_VENDA\n2014;{int(mes)};SÃO PAULO\n2014;{int(mes)};GOIÂNIA{final}")
+
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Servidor_Local, directory=self.pasta_servidor.name))
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.url_base = f"http://127.0.0.1:{self.servidor.server_address[1]}/EDA_Manipulados_{{data}}.csv"
+
+    def tearDown(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+        self.pasta_servidor.cleanup()
+        self.pasta_saida.cleanup()
+
     def test_data_inválida(self):
         """
         verifica se a função retorna None caso o tipo a data seja inválida,
@@ -35,6 +70,72 @@ class Test_Download_Csv_By_Dates(unittest.TestCase):
         """
         self.assertIsNone(download_csv_by_dates("2016/02", "2016/03", output_file=True)) 
         self.assertIsNone(download_csv_by_dates("2016/02", "2016/03", output_file="inválido.txt"))
+        self.assertIsNone(download_csv_by_dates("2016/02", "2016/03", output_file="inválido.csv", compressao="gzip"))
+        self.assertIsNone(download_csv_by_dates("2016/02", "2016/03", output_file="inválido.csv", compressao="bz2"))
+
+    def test_sem_arquivo_de_saida(self):
+        """
+        verifica se sem arquivo de saída os meses são lidos e concatenados em um dataframe.
+        """
+        dados = download_csv_by_dates("2014/01", "2014/03", url_base=self.url_base)
+        self.assertEqual(list(dados["MES_VENDA"]), [1, 1, 2, 2, 3, 3])
+        self.assertEqual(list(dados["MUNICIPIO_VENDA"][:2]), ["SÃO PAULO", "GOIÂNIA"])
+
+    def test_escrita_direta_no_arquivo(self):
+        """
+        verifica se os meses são escritos no arquivo de saída com um único cabeçalho, em UTF-8,
+        e se apenas o caminho é retornado quando o dataframe não é pedido.
+        """
+        saida = os.path.join(self.pasta_saida.name, "saida.csv")
+        self.assertEqual(download_csv_by_dates("2014/01", "2014/03", output_file=saida, url_base=self.url_base, retorna_dataframe=False), saida)
+
+        with open(saida, "r", encoding="utf-8") as arquivo:
+            linhas = arquivo.read().splitlines()
+        self.assertEqual(len(linhas), 7)
+        self.assertEqual(linhas[0], "ANO_VENDA;MES_VENDA;MUNICIPIO_VENDA")
+        self.assertEqual(linhas[-1], "2014;3;GOIÂNIA")
+
+        dados = download_csv_by_dates("2014/02", "2014/03", output_file=saida, url_base=self.url_base)
+        self.assertEqual(list(dados["MES_VENDA"]), [2, 2, 3, 3])
+
+    def test_compressao(self):
+        """
+        verifica se o arquivo de saída é comprimido durante a escrita com gzip e zstd.
+        """
+        saida_gzip = os.path.join(self.pasta_saida.name, "saida.csv.gz")
+        dados = download_csv_by_dates("2014/01", "2014/02", output_file=saida_gzip, url_base=self.url_base, compressao="gzip")
+        self.assertEqual(len(dados), 4)
+        with gzip.open(saida_gzip, "rt", encoding="utf-8") as arquivo:
+            self.assertEqual(arquivo.readline(), "ANO_VENDA;MES_VENDA;MUNICIPIO_VENDA\n")
+
+        saida_zstd = os.path.join(self.pasta_saida.name, "saida.csv.zst")
+        download_csv_by_dates("2014/01", "2014/02", output_file=saida_zstd, url_base=self.url_base, compressao="zstd", retorna_dataframe=False)
+        with open(saida_zstd, "rb") as arquivo:
+            conteudo = zstandard.ZstdDecompressor().stream_reader(arquivo).read().decode("utf-8")
+        self.assertEqual(conteudo.count("\n"), 5)
+
+    def test_colunas_em_outra_ordem(self):
+        """
+        verifica se um mês com as colunas em outra ordem é escrito na ordem de colunas do primeiro mês.
+        """
+        with open(os.path.join(self.pasta_servidor.name, "EDA_Manipulados_201402.csv"), "w", encoding="utf-8") as arquivo:
+            arquivo.write("MUNICIPIO_VENDA;ANO_VENDA;MES_VENDA\nGOIÂNIA;2014;2\n")
+        saida = os.path.join(self.pasta_saida.name, "saida.csv")
+        dados = download_csv_by_dates("2014/01", "2014/02", output_file=saida, url_base=self.url_base)
+        self.assertEqual(list(dados["MES_VENDA"]), [1, 1, 2])
+        self.assertEqual(list(dados["MUNICIPIO_VENDA"]), ["SÃO PAULO", "GOIÂNIA", "GOIÂNIA"])
+
+    def test_falha_remove_arquivo_parcial(self):
+        """
+        verifica se um mês com outras colunas ou um mês que não existe no servidor interrompem o download
+        sem deixar o arquivo de saída nem o arquivo parcial.
+        """
+        with open(os.path.join(self.pasta_servidor.name, "EDA_Manipulados_201402.csv"), "w", encoding="utf-8") as arquivo:
+            arquivo.write("ANO_VENDA;MES_VENDA;UF_VENDA\n2014;2;GO\n")
+        saida = os.path.join(self.pasta_saida.name, "saida.csv")
+        self.assertIsNone(download_csv_by_dates("2014/01", "2014/02", output_file=saida, url_base=self.url_base))
+        self.assertIsNone(download_csv_by_dates("2014/03", "2014/04", output_file=saida, url_base=self.url_base))
+        self.assertEqual(os.listdir(self.pasta_saida.name), [])
 
 
 if __name__ == "__main__":
@@ -13,8 +13,23 @@ sys.path.append(caminho_functions)
 
 import unittest
 import os
+import tempfile
+import threading
+import functools
 import pandas as pd  
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 from get_data import download_data_sep_by_months
+from utils import concat_data_by_dates
+
+
+class Servidor_Local(SimpleHTTPRequestHandler):
+    """
+    servidor que imita o site da ANVISA, servindo os arquivos de uma pasta local com conexões keep-alive.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
 
 
 class Test_Download_Data_Sep_By_Months(unittest.TestCase):
@@ -36,6 +51,70 @@ class Test_Download_Data_Sep_By_Months(unittest.TestCase):
         self.assertIsNone(download_data_sep_by_months("2016/02", "2016/04", True)) 
         self.assertIsNone(download_data_sep_by_months("2016/02", "2016/04", 3))
 
+    def test_workers_invalido(self):
+        """
+        verifica se a função retorna None caso o número de workers seja inválido.
+        """
+        self.assertIsNone(download_data_sep_by_months("2016/02", "2016/04", "dados", workers=0))
+        self.assertIsNone(download_data_sep_by_months("2016/02", "2016/04", "dados", workers="4"))
+
+    def test_download_concorrente(self):
+        """
+        verifica se o download concorrente baixa todos os meses de um servidor local com o mesmo
+        formato de endereços da base de dados, e se os meses indisponíveis são apenas ignorados.
+        """
+        with tempfile.TemporaryDirectory() as pasta_servidor, tempfile.TemporaryDirectory() as pasta_saida:
+            for mes in ["01", "02", "03"]:
+                with open(os.path.join(pasta_servidor, f"EDA_Manipulados_2014{mes}.csv"), "w", encoding="cp1252") as arquivo:
+                    arquivo.write(f"ANO_VENDA;MES_VENDA;MUNICIPIO_VENDA\n2014;{int(mes)};SÃO PAULO\n2014;{int(mes)};GOIÂNIA\n")
+
+            servidor = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Servidor_Local, directory=pasta_servidor))
+            threading.Thread(target=servidor.serve_forever, daemon=True).start()
+            url_base = f"http://127.0.0.1:{servidor.server_address[1]}/EDA_Manipulados_{{data}}.csv"
+
+            try:
+                self.assertIsNone(download_data_sep_by_months("2014/01", "2014/04", pasta_saida, workers=2, url_base=url_base))
+            finally:
+                servidor.shutdown()
+                servidor.server_close()
+
+            self.assertEqual(sorted(os.listdir(pasta_saida)), ["Manipulados_2014_01.csv", "Manipulados_2014_02.csv", "Manipulados_2014_03.csv"])
+            dados = pd.read_csv(os.path.join(pasta_saida, "Manipulados_2014_02.csv"), delimiter=";")
+            self.assertEqual(list(dados["MES_VENDA"]), [2, 2])
+            self.assertEqual(list(dados["MUNICIPIO_VENDA"]), ["SÃO PAULO", "GOIÂNIA"])
+
+    def test_download_comprimido(self):
+        """
+        verifica se os meses são salvos comprimidos com zstd ou gzip e se eles são lidos
+        normalmente pela função concat_data_by_dates.
+        """
+        with tempfile.TemporaryDirectory() as pasta_servidor, tempfile.TemporaryDirectory() as pasta_saida:
+            for mes in ["01", "02"]:
+                with open(os.path.join(pasta_servidor, f"EDA_Manipulados_2014{mes}.csv"), "w", encoding="cp1252") as arquivo:
+                    arquivo.write(f"ANO_VENDA;MES_VENDA;MUNICIPIO_VENDA\n2014;{int(mes)};SÃO PAULO\n2014;{int(mes)};GOIÂNIA\n")
+
+            servidor = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Servidor_Local, directory=pasta_servidor))
+            threading.Thread(target=servidor.serve_forever, daemon=True).start()
+            url_base = f"http://127.0.0.1:{servidor.server_address[1]}/EDA_Manipulados_{{data}}.csv"
+
+            try:
+                download_data_sep_by_months("2014/01", "2014/01", pasta_saida, workers=2, url_base=url_base, compressao="zstd")
+                download_data_sep_by_months("2014/02", "2014/02", pasta_saida, url_base=url_base, compressao="gzip")
+            finally:
+                servidor.shutdown()
+                servidor.server_close()
+
+            self.assertEqual(sorted(os.listdir(pasta_saida)), ["Manipulados_2014_01.csv.zst", "Manipulados_2014_02.csv.gz"])
+            dados = concat_data_by_dates("2014/01", "2014/02", pasta_saida)
+            self.assertEqual(list(dados["MES_VENDA"]), [1, 1, 2, 2])
+            self.assertEqual(list(dados["MUNICIPIO_VENDA"]), ["SÃO PAULO", "GOIÂNIA", "SÃO PAULO", "GOIÂNIA"])
+
+    def test_compressao_invalida(self):
+        """
+        verifica se a função retorna None caso a compressão não seja suportada.
+        """
+        self.assertIsNone(download_data_sep_by_months("2016/02", "2016/04", "dados", compressao="bz2"))
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
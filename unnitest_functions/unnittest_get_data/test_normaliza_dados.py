@@ -0,0 +1,74 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'normaliza_dados', que pertence
+ao módulo 'get_data.py'. A função recebe duas datas e a pasta dos dados, e reescreve os arquivos mensais
+já salvos em UTF-8, com a codificação original detectada e os textos das colunas categóricas normalizados.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import os
+import json
+import tempfile
+import zstandard
+from get_data import normaliza_dados
+from utils import concat_data_by_dates
+
+
+class Test_Normaliza_Dados(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        # Janeiro em latin-1 e fevereiro em UTF-8 comprimido, com os mesmos textos escritos de formas diferentes.
+        with open(os.path.join(self.pasta.name, "Manipulados_2014_01.csv"), "wb") as arquivo:
+            arquivo.write("ANO_VENDA;MES_VENDA;MUNICIPIO_VENDA;PRINCIPIO_ATIVO\r\n2014;1; São Paulo ;zolpidem\r\n".encode("latin-1"))
+        with open(os.path.join(self.pasta.name, "Manipulados_2014_02.csv.zst"), "wb") as arquivo:
+            arquivo.write(zstandard.ZstdCompressor().compress("ANO_VENDA;MES_VENDA;MUNICIPIO_VENDA;PRINCIPIO_ATIVO\n2014;2;SÃO PAULO;ZOLPIDEM \n".encode("utf-8")))
+        with open(os.path.join(self.pasta.name, "manifesto.json"), "w", encoding="utf-8") as arquivo:
+            json.dump({"Manipulados_2014_01.csv": {"tamanho": 0, "sha256": "", "linhas": 1}}, arquivo)
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_normalizacao(self):
+        """
+        verifica se os meses passam a ter a mesma codificação e os mesmos textos, mantendo a compressão.
+        """
+        normalizados = normaliza_dados("2014/01", "2014/03", self.pasta.name)
+        self.assertEqual([os.path.basename(caminho) for caminho in normalizados], ["Manipulados_2014_01.csv", "Manipulados_2014_02.csv.zst"])
+
+        dados = concat_data_by_dates("2014/01", "2014/02", self.pasta.name)
+        self.assertEqual(list(dados["MUNICIPIO_VENDA"]), ["SÃO PAULO", "SÃO PAULO"])
+        self.assertEqual(list(dados["PRINCIPIO_ATIVO"]), ["ZOLPIDEM", "ZOLPIDEM"])
+
+    def test_normalizacao_repetida(self):
+        """
+        verifica se normalizar um arquivo já normalizado não o altera, e se o manifesto é atualizado.
+        """
+        normaliza_dados("2014/01", "2014/01", self.pasta.name)
+        with open(os.path.join(self.pasta.name, "Manipulados_2014_01.csv"), "rb") as arquivo:
+            primeira = arquivo.read()
+        normaliza_dados("2014/01", "2014/01", self.pasta.name)
+        with open(os.path.join(self.pasta.name, "Manipulados_2014_01.csv"), "rb") as arquivo:
+            self.assertEqual(arquivo.read(), primeira)
+
+        with open(os.path.join(self.pasta.name, "manifesto.json"), "r", encoding="utf-8") as arquivo:
+            entrada = json.load(arquivo)["Manipulados_2014_01.csv"]
+        self.assertEqual(entrada["tamanho"], len(primeira))
+        self.assertEqual(entrada["linhas"], 1)
+
+    def test_data_invalida(self):
+        """
+        verifica se nenhum arquivo é normalizado caso a data seja inválida.
+        """
+        self.assertEqual(normaliza_dados("2013/01", "2014/01", self.pasta.name), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
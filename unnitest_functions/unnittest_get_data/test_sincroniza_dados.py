@@ -0,0 +1,193 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'sincroniza_dados', que pertence
+ao módulo 'get_data.py'. A função recebe duas datas da forma "AAAAmm", uma pasta, e sincroniza
+a pasta com o servidor, baixando apenas os meses novos ou alterados e registrando-os no manifesto.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import os
+import json
+import gzip
+import hashlib
+import tempfile
+import threading
+import pandas as pd
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from get_data import sincroniza_dados
+
+
+class Servidor_Com_Range(BaseHTTPRequestHandler):
+    """
+    servidor local que responde com ETag, pedidos condicionais e pedidos parciais (Range),
+    guardando os cabeçalhos de cada pedido recebido. Com "comprime", as respostas são enviadas com gzip
+    quando o pedido aceita, e com "total_desconhecido" o tamanho total das respostas parciais é "*".
+    """
+    protocol_version = "HTTP/1.1"
+    arquivos = {}
+    pedidos = []
+    comprime = False
+    total_desconhecido = False
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        Servidor_Com_Range.pedidos.append(dict(self.headers))
+        conteudo = Servidor_Com_Range.arquivos.get(self.path.split("/")[-1])
+        if conteudo == None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        etag = '"' + hashlib.md5(conteudo).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        inicio = 0
+        if self.headers.get("Range") and self.headers.get("If-Range") == etag:
+            inicio = int(self.headers["Range"].split("=")[1].split("-")[0])
+            self.send_response(206)
+            total = "*" if Servidor_Com_Range.total_desconhecido else len(conteudo)
+            self.send_header("Content-Range", f"bytes {inicio}-{len(conteudo) - 1}/{total}")
+        else:
+            self.send_response(200)
+        corpo = conteudo[inicio:]
+        if Servidor_Com_Range.comprime and "gzip" in self.headers.get("Accept-Encoding", ""):
+            corpo = gzip.compress(corpo)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+class Test_Sincroniza_Dados(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        Servidor_Com_Range.arquivos = {}
+        Servidor_Com_Range.pedidos = []
+        Servidor_Com_Range.comprime = False
+        Servidor_Com_Range.total_desconhecido = False
+        for mes in [1, 2]:
+            linhas = "".join(f"2014;{mes};SP;{indice}\n" for indice in range(50))
+            Servidor_Com_Range.arquivos[f"EDA_Manipulados_20140{mes}.csv"] = ("ANO_VENDA;MES_VENDA;UF_VENDA;IDADE\n" + linhas).encode("cp1252")
+
+        self.pasta = tempfile.TemporaryDirectory()
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), Servidor_Com_Range)
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.url_base = f"http://127.0.0.1:{self.servidor.server_address[1]}/EDA_Manipulados_{{data}}.csv"
+
+    def tearDown(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+        self.pasta.cleanup()
+
+    def test_caminho_invalido(self):
+        """
+        verifica se a função retorna None caso o caminho seja inválido.
+        """
+        self.assertIsNone(sincroniza_dados("2014/01", "2014/02", 3))
+        self.assertIsNone(sincroniza_dados("2014/01", "2014/02", "PASTA_INEXISTENTE"))
+
+    def test_sincronizacao_incremental(self):
+        """
+        verifica se a primeira sincronização baixa e registra todos os meses no manifesto, e se
+        a segunda apenas confirma com o servidor que eles não mudaram.
+        """
+        estados = sincroniza_dados("2014/01", "2014/02", self.pasta.name, workers=2, url_base=self.url_base)
+        self.assertEqual(estados, {"Manipulados_2014_01.csv": "baixado", "Manipulados_2014_02.csv": "baixado"})
+
+        with open(os.path.join(self.pasta.name, "manifesto.json"), "r", encoding="utf-8") as arquivo:
+            manifesto = json.load(arquivo)
+        self.assertEqual(manifesto["Manipulados_2014_02.csv"]["linhas"], 50)
+        self.assertIsNotNone(manifesto["Manipulados_2014_02.csv"]["etag"])
+
+        estados = sincroniza_dados("2014/01", "2014/02", self.pasta.name, url_base=self.url_base)
+        self.assertEqual(estados, {"Manipulados_2014_01.csv": "inalterado", "Manipulados_2014_02.csv": "inalterado"})
+
+    def test_arquivo_local_alterado(self):
+        """
+        verifica se um arquivo local que não confere com o checksum do manifesto é baixado novamente.
+        """
+        sincroniza_dados("2014/01", "2014/01", self.pasta.name, url_base=self.url_base)
+        with open(os.path.join(self.pasta.name, "Manipulados_2014_01.csv"), "a") as arquivo:
+            arquivo.write("2014;1;RJ;99\n")
+
+        estados = sincroniza_dados("2014/01", "2014/01", self.pasta.name, url_base=self.url_base)
+        self.assertEqual(estados, {"Manipulados_2014_01.csv": "baixado"})
+        self.assertEqual(len(pd.read_csv(os.path.join(self.pasta.name, "Manipulados_2014_01.csv"), delimiter=";")), 50)
+
+    def test_arquivo_local_verificado(self):
+        """
+        verifica se um arquivo alterado sem mudar de tamanho nem de data de modificação só é baixado
+        novamente quando a verificação do checksum é pedida.
+        """
+        sincroniza_dados("2014/01", "2014/01", self.pasta.name, url_base=self.url_base)
+        caminho_arquivo = os.path.join(self.pasta.name, "Manipulados_2014_01.csv")
+        modificado = os.path.getmtime(caminho_arquivo)
+        with open(caminho_arquivo, "r+b") as arquivo:
+            arquivo.seek(-3, os.SEEK_END)
+            arquivo.write(b"X")
+        os.utime(caminho_arquivo, (modificado, modificado))
+
+        estados = sincroniza_dados("2014/01", "2014/01", self.pasta.name, url_base=self.url_base)
+        self.assertEqual(estados, {"Manipulados_2014_01.csv": "inalterado"})
+        estados = sincroniza_dados("2014/01", "2014/01", self.pasta.name, url_base=self.url_base, verifica=True)
+        self.assertEqual(estados, {"Manipulados_2014_01.csv": "baixado"})
+
+    def test_servidor_com_gzip(self):
+        """
+        verifica se os arquivos são pedidos sem codificação, assim um servidor que comprime as respostas
+        não faz o tamanho baixado diferir do tamanho informado.
+        """
+        Servidor_Com_Range.comprime = True
+        estados = sincroniza_dados("2014/01", "2014/01", self.pasta.name, tentativas=1, url_base=self.url_base)
+        self.assertEqual(estados, {"Manipulados_2014_01.csv": "baixado"})
+        self.assertEqual(Servidor_Com_Range.pedidos[-1]["Accept-Encoding"], "identity")
+
+    def test_retomada_do_download(self):
+        """
+        verifica se um download interrompido é retomado a partir dos bytes já baixados.
+        """
+        conteudo = Servidor_Com_Range.arquivos["EDA_Manipulados_201401.csv"]
+        caminho_parcial = os.path.join(self.pasta.name, "Manipulados_2014_01.csv.part")
+        with open(caminho_parcial, "wb") as arquivo:
+            arquivo.write(conteudo[:100])
+        with open(caminho_parcial + ".json", "w", encoding="utf-8") as arquivo:
+            json.dump({"etag": '"' + hashlib.md5(conteudo).hexdigest() + '"', "last_modified": None}, arquivo)
+
+        estados = sincroniza_dados("2014/01", "2014/01", self.pasta.name, url_base=self.url_base)
+        self.assertEqual(estados, {"Manipulados_2014_01.csv": "baixado"})
+        self.assertEqual(Servidor_Com_Range.pedidos[-1]["Range"], "bytes=100-")
+        self.assertEqual(len(pd.read_csv(os.path.join(self.pasta.name, "Manipulados_2014_01.csv"), delimiter=";")), 50)
+        self.assertFalse(os.path.exists(caminho_parcial))
+
+    def test_retomada_com_tamanho_desconhecido(self):
+        """
+        verifica se a retomada funciona quando o servidor não informa o tamanho total ("*").
+        """
+        Servidor_Com_Range.total_desconhecido = True
+        self.test_retomada_do_download()
+
+    def test_mes_indisponivel(self):
+        """
+        verifica se um mês indisponível no servidor é registrado como falha sem interromper os outros.
+        """
+        estados = sincroniza_dados("2014/02", "2014/03", self.pasta.name, tentativas=2, espera=0.01, url_base=self.url_base)
+        self.assertEqual(estados, {"Manipulados_2014_02.csv": "baixado", "Manipulados_2014_03.csv": "falhou"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'mascara_do_grupo', que pertence
+ao módulo 'grupos_medicamentos.py'. A função recebe uma coluna de princípios ativos e o nome de um grupo
+de medicamentos e retorna a máscara das linhas do grupo, lendo nos códigos do dicionário a tabela compilada do grupo.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import tempfile
+import pandas as pd
+from dicionarios import atualiza_dicionarios
+from grupos_medicamentos import mascara_do_grupo, codigos_do_grupo, registra_grupo, GRUPOS_DE_MEDICAMENTOS
+
+
+class Test_Mascara_Do_Grupo(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.principios = ["ZOLPIDEM", "TESTOSTERONA", None, "DIAZEPAM", "HEMITARTARATO DE ZOLPIDEM", "NANDROLONA"]
+        self.esperado = {"ZOLPIDEM": [True, False, False, False, True, False],
+                         "ANABOLIZANTES": [False, True, False, False, False, True],
+                         "BENZODIAZEPINICOS": [False, False, False, True, False, False]}
+
+    def tearDown(self):
+        self.pasta.cleanup()
+        GRUPOS_DE_MEDICAMENTOS.pop("TESTE", None)
+
+    def test_colunas_de_cada_tipo(self):
+        """
+        verifica se a coluna com os códigos do dicionário, a coluna categórica qualquer e a coluna de texto
+        geram as mesmas máscaras.
+        """
+        dicionarizada = atualiza_dicionarios(pd.DataFrame({"PRINCIPIO_ATIVO": self.principios}), self.pasta.name)["PRINCIPIO_ATIVO"]
+        colunas = [dicionarizada, pd.Series(self.principios, dtype="category"), pd.Series(self.principios)]
+        for coluna in colunas:
+            for grupo, esperado in self.esperado.items():
+                self.assertEqual(mascara_do_grupo(coluna, grupo, self.pasta.name).tolist(), esperado)
+
+    def test_dicionario_crescendo(self):
+        """
+        verifica se a tabela do grupo é compilada de novo quando o dicionário ganha valores do grupo.
+        """
+        atualiza_dicionarios(pd.DataFrame({"PRINCIPIO_ATIVO": ["DIAZEPAM"]}), self.pasta.name)
+        self.assertEqual(codigos_do_grupo("ZOLPIDEM", self.pasta.name).tolist(), [False, False])
+
+        coluna = atualiza_dicionarios(pd.DataFrame({"PRINCIPIO_ATIVO": ["ZOLPIDEM", "DIAZEPAM"]}), self.pasta.name)["PRINCIPIO_ATIVO"]
+        self.assertEqual(codigos_do_grupo("ZOLPIDEM", self.pasta.name).tolist(), [False, True, False])
+        self.assertEqual(mascara_do_grupo(coluna, "ZOLPIDEM", self.pasta.name).tolist(), [True, False])
+
+    def test_grupo_registrado(self):
+        """
+        verifica se um grupo novo pode ser usado sem outra lógica de filtragem, e se o grupo inválido retorna None.
+        """
+        coluna = pd.Series(self.principios, dtype="category")
+        registra_grupo("TESTE", ["DIAZEPAM"])
+        self.assertEqual(mascara_do_grupo(coluna, "TESTE", self.pasta.name).tolist(), self.esperado["BENZODIAZEPINICOS"])
+        registra_grupo("TESTE", ["ZOLPIDEM"])
+        self.assertEqual(mascara_do_grupo(coluna, "TESTE", self.pasta.name).tolist(), [True] + [False] * 5)
+        self.assertIsNone(mascara_do_grupo(coluna, "GRUPO_INEXISTENTE", self.pasta.name))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,7 @@
 Esse módulo tem como objetivo verificar o funcionamento da função 'concat_data_by_dates', que pertence 
 ao módulo 'utils.py'. A função recebe duas datas da forma "AAAAmm" com os 4 primeiros dígitos
 sendo o ano e os últimos 2 o mês, e concatena da base de dados todos os dados entre estas duas datas,
-sendo que é possível filtrar as colunas também.
+sendo que é possível filtrar as colunas e as linhas também.
 """
 
 import sys, os
@@ -13,8 +13,10 @@ sys.path.append(caminho_functions)
 
 import unittest
 import os
+import tempfile
 import pandas as pd  
 from utils import concat_data_by_dates
+from cache_colunar import converte_para_parquet
 
 
 class Test_Concat_Data_By_Dates(unittest.TestCase):
@@ -62,5 +64,100 @@ class Test_Concat_Data_By_Dates(unittest.TestCase):
         self.assertEqual(type(concat_data_by_dates("2021/01", "2021/01", filtered_columns=3)), pd.DataFrame)
 
 
+
+def idade_maior_que_35(dados):
+    """
+    filtro de linhas usado nos testes, definido no nível do módulo para poder ser enviado aos processos.
+    """
+    return dados["IDADE"] > 35
+
+
+class Test_Concat_Data_By_Dates_Pasta_Temporaria(unittest.TestCase):
+    """
+    a classe vai conter os testes da função feitos sobre uma pasta de dados criada para o teste.
+    """
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        for mes in [1, 2, 3]:
+            dados = pd.DataFrame({"ANO_VENDA": [2014] * 3, "MES_VENDA": [mes] * 3,
+                                  "UF_VENDA": ["SP", "RJ", "BA"], "PRINCIPIO_ATIVO": ["ZOLPIDEM", "CLOROQUINA", "ZOLPIDEM"],
+                                  "IDADE": [30, 40, 50]})
+            if mes == 3:
+                dados = dados.drop(columns="PRINCIPIO_ATIVO")
+            dados.to_csv(os.path.join(self.pasta.name, f"Manipulados_2014_0{mes}.csv"), sep=";", index=False)
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_colunas_na_ordem_pedida(self):
+        """
+        verifica se apenas as colunas filtradas são lidas, na ordem em que foram pedidas.
+        """
+        datas = concat_data_by_dates("2014/01", "2014/02", path=self.pasta.name, filtered_columns=["PRINCIPIO_ATIVO", "ANO_VENDA"])
+        self.assertEqual(list(datas.columns), ["PRINCIPIO_ATIVO", "ANO_VENDA"])
+        self.assertEqual(len(datas), 6)
+
+    def test_coluna_invalida_le_todas(self):
+        """
+        verifica se, com uma coluna de filtro inválida, todas as colunas são lidas.
+        """
+        datas = concat_data_by_dates("2014/01", "2014/01", path=self.pasta.name, filtered_columns=["cachorro_mal"])
+        self.assertEqual(len(datas.columns), 5)
+
+    def test_mes_sem_a_coluna(self):
+        """
+        verifica se um mês que não possui uma das colunas filtradas é ignorado.
+        """
+        datas = concat_data_by_dates("2014/01", "2014/03", path=self.pasta.name, filtered_columns=["MES_VENDA", "PRINCIPIO_ATIVO"])
+        self.assertEqual(list(datas["MES_VENDA"].unique()), [1, 2])
+
+    def test_leitura_paralela(self):
+        """
+        verifica se a leitura com processos retorna os mesmos dados, na ordem cronológica, que a leitura sequencial,
+        inclusive ignorando os meses que não puderam ser lidos.
+        """
+        sequencial = concat_data_by_dates("2014/01", "2014/04", path=self.pasta.name, filtered_columns=["MES_VENDA", "PRINCIPIO_ATIVO"])
+        paralela = concat_data_by_dates("2014/01", "2014/04", path=self.pasta.name, filtered_columns=["MES_VENDA", "PRINCIPIO_ATIVO"], workers=2)
+        pd.testing.assert_frame_equal(sequencial, paralela)
+
+        paralela = concat_data_by_dates("2014/01", "2014/02", path=self.pasta.name, workers=2)
+        self.assertEqual(list(paralela["MES_VENDA"]), [1, 1, 1, 2, 2, 2])
+
+    def test_filtro_de_linhas(self):
+        """
+        verifica se apenas as linhas que satisfazem o filtro são lidas, mesmo que a coluna do filtro
+        não esteja nas colunas filtradas.
+        """
+        datas = concat_data_by_dates("2014/01", "2014/02", path=self.pasta.name, filtered_columns=["MES_VENDA", "UF_VENDA"],
+                                     where={"PRINCIPIO_ATIVO": ["ZOLPIDEM"], "IDADE": 50})
+        self.assertEqual(list(datas.columns), ["MES_VENDA", "UF_VENDA"])
+        self.assertEqual(list(datas["MES_VENDA"]), [1, 2])
+        self.assertEqual(list(datas["UF_VENDA"]), ["BA", "BA"])
+
+    def test_filtro_de_linhas_com_funcao_e_cache(self):
+        """
+        verifica se o filtro por função retorna as mesmas linhas, lidas do csv ou do cache colunar, em paralelo ou não.
+        """
+        do_csv = concat_data_by_dates("2014/01", "2014/02", path=self.pasta.name, where=idade_maior_que_35)
+        self.assertEqual(list(do_csv["IDADE"]), [40, 50, 40, 50])
+
+        converte_para_parquet("2014/01", "2014/02", self.pasta.name)
+        do_cache = concat_data_by_dates("2014/01", "2014/02", path=self.pasta.name, where=idade_maior_que_35, workers=2)
+        pd.testing.assert_frame_equal(do_csv, do_cache)
+
+    def test_filtro_de_linhas_invalido(self):
+        """
+        verifica se a função não retorna nada caso o filtro de linhas seja inválido.
+        """
+        self.assertIsNone(concat_data_by_dates("2014/01", "2014/01", path=self.pasta.name, where={"cachorro_mal": 1}))
+        self.assertIsNone(concat_data_by_dates("2014/01", "2014/01", path=self.pasta.name, where=["IDADE"]))
+
+    def test_primeiro_mes_invalido_em_paralelo(self):
+        """
+        verifica se a leitura paralela não retorna nada caso o primeiro mês não exista, como a sequencial.
+        """
+        self.assertIsNone(concat_data_by_dates("2014/04", "2014/05", path=self.pasta.name, workers=2))
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
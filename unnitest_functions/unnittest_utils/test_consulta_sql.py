@@ -0,0 +1,82 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'consulta_sql', que pertence
+ao módulo 'utils.py'. A função recebe uma consulta SQL com parâmetros e a executa no banco
+SQLite local construído pela função 'constroi_banco_sql', retornando um dataframe.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import os
+import sqlite3
+import tempfile
+import pandas as pd
+from unittest import mock
+from utils import consulta_sql, constroi_banco_sql
+
+
+class Test_Consulta_Sql(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        for mes in [1, 2]:
+            dados = pd.DataFrame({"ANO_VENDA": [2020] * 4, "MES_VENDA": [mes] * 4, "UF_VENDA": ["SP", "RJ", "SP", "MG"],
+                                  "PRINCIPIO_ATIVO": ["CLOROQUINA", "CLOROQUINA", None, "ZOLPIDEM"],
+                                  "SEXO": [2, None, 2, 2], "IDADE": [70, 80, 50, 61], "QTD_UNIDADE_FARMACOTECNICA": ["1,5", "2", "3", "4"]})
+            dados.to_csv(os.path.join(self.pasta.name, f"Manipulados_2020_0{mes}.csv"), sep=";", index=False)
+        self.caminho = constroi_banco_sql("2020/01", "2020/02", self.pasta.name)
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_consulta_com_parametros(self):
+        """
+        verifica se a consulta com parâmetros retorna as vendas de cloroquina por estado para mulheres com mais de 60 anos.
+        """
+        consulta = consulta_sql("SELECT UF_VENDA, COUNT(*) AS VENDAS, SUM(QTD_UNIDADE_FARMACOTECNICA) AS UNIDADES FROM vendas "
+                                "WHERE ANO_VENDA = ? AND PRINCIPIO_ATIVO = ? AND SEXO = ? AND IDADE > ? GROUP BY UF_VENDA",
+                                (2020, "CLOROQUINA", 2, 60), self.pasta.name)
+        self.assertEqual(consulta.values.tolist(), [["SP", 2, 3.0]])
+
+    def test_indices(self):
+        """
+        verifica se o banco tem os índices por período, estado e princípio ativo, e se eles são usados.
+        """
+        indices = consulta_sql("SELECT name FROM sqlite_master WHERE type = 'index'", path=self.pasta.name)
+        self.assertEqual(sorted(indices["name"]), ["idx_vendas_periodo", "idx_vendas_principio_ativo", "idx_vendas_uf"])
+
+        plano = consulta_sql("EXPLAIN QUERY PLAN SELECT * FROM vendas WHERE PRINCIPIO_ATIVO = ?", ("ZOLPIDEM",), self.pasta.name)
+        self.assertIn("idx_vendas_principio_ativo", plano["detail"][0])
+
+    def test_apenas_leitura(self):
+        """
+        verifica se as consultas não podem alterar o banco.
+        """
+        self.assertIsNone(consulta_sql("DELETE FROM vendas", path=self.pasta.name))
+        self.assertEqual(consulta_sql("SELECT COUNT(*) AS LINHAS FROM vendas", path=self.pasta.name)["LINHAS"][0], 8)
+
+    def test_falha_na_escrita(self):
+        """
+        verifica se uma falha na escrita do banco não deixa o arquivo temporário e mantém o banco anterior.
+        """
+        with mock.patch.object(pd.DataFrame, "to_sql", side_effect=sqlite3.OperationalError("disco cheio")):
+            self.assertIsNone(constroi_banco_sql("2020/01", "2020/02", self.pasta.name))
+        self.assertFalse(os.path.exists(self.caminho + ".tmp"))
+        self.assertEqual(consulta_sql("SELECT COUNT(*) AS LINHAS FROM vendas", path=self.pasta.name)["LINHAS"][0], 8)
+
+    def test_consulta_invalida(self):
+        """
+        verifica se a função não retorna nada caso a consulta seja inválida ou o banco não exista.
+        """
+        self.assertIsNone(consulta_sql("SELEC * FROM vendas", path=self.pasta.name))
+        self.assertIsNone(consulta_sql("SELECT * FROM vendas", path="PASTA_INEXISTENTE"))
+
+
+if __name__ == "__main__":
+    unittest.main()
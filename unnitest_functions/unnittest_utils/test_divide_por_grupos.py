@@ -0,0 +1,68 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'divide_por_grupos', que pertence
+ao módulo 'utils.py'. A função recebe um dataframe, uma coluna e os valores de cada grupo e retorna,
+em uma única passada pela coluna, o subconjunto do dataframe de cada grupo.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import pandas as pd
+from utils import divide_por_grupos, filtra_dados_por_valores_procurados
+
+
+class Test_Divide_Por_Grupos(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        self.dados = pd.DataFrame({"UF_VENDA": ["SP", "AM", "RS", None, "SP", "PA", "BA"],
+                                   "VENDAS": [1, 2, 3, 4, 5, 6, 7]},
+                                  index=[10, 11, 12, 13, 14, 15, 16])
+        self.grupos = {"Norte": ["AM", "PA"], "Sudeste": "SP", "Sem UF": [None], "Centro-Oeste": ["DF", "GO"]}
+
+    def test_igual_a_filtragens_separadas(self):
+        """
+        verifica se cada grupo é igual à filtragem separada do dataframe, com a ordem e o índice originais.
+        """
+        subconjuntos = divide_por_grupos(self.dados, "UF_VENDA", {"Norte": ["AM", "PA"], "Sudeste": "SP"})
+        pd.testing.assert_frame_equal(subconjuntos["Norte"], filtra_dados_por_valores_procurados(self.dados, "UF_VENDA", ["AM", "PA"]))
+        pd.testing.assert_frame_equal(subconjuntos["Sudeste"], filtra_dados_por_valores_procurados(self.dados, "UF_VENDA", "SP"))
+
+    def test_grupos_vazios_e_nulos(self):
+        """
+        verifica os grupos sem linhas, o grupo dos nulos e a ordem dos grupos.
+        """
+        subconjuntos = divide_por_grupos(self.dados, "UF_VENDA", self.grupos)
+        self.assertEqual(list(subconjuntos), ["Norte", "Sudeste", "Sem UF", "Centro-Oeste"])
+        self.assertEqual(subconjuntos["Sem UF"]["VENDAS"].tolist(), [4])
+        self.assertEqual(len(subconjuntos["Centro-Oeste"]), 0)
+        self.assertEqual(list(subconjuntos["Centro-Oeste"].columns), ["UF_VENDA", "VENDAS"])
+
+    def test_coluna_categorica(self):
+        """
+        verifica se a coluna categórica gera os mesmos grupos que a coluna de texto.
+        """
+        categorico = self.dados.astype({"UF_VENDA": "category"})
+        indices_texto = divide_por_grupos(self.dados, "UF_VENDA", self.grupos, retorna_indices=True)
+        indices_categoria = divide_por_grupos(categorico, "UF_VENDA", self.grupos, retorna_indices=True)
+        for grupo in self.grupos:
+            self.assertEqual(indices_texto[grupo].tolist(), indices_categoria[grupo].tolist())
+        self.assertEqual(indices_categoria["Norte"].tolist(), [1, 5])
+
+    def test_entradas_invalidas(self):
+        """
+        verifica se as entradas inválidas retornam None.
+        """
+        self.assertIsNone(divide_por_grupos("dados", "UF_VENDA", self.grupos))
+        self.assertIsNone(divide_por_grupos(self.dados, "COLUNA", self.grupos))
+        self.assertIsNone(divide_por_grupos(self.dados, "UF_VENDA", ["SP"]))
+        self.assertIsNone(divide_por_grupos(self.dados, "UF_VENDA", {"A": "SP", "B": ["SP", "RS"]}))
+
+
+if __name__ == "__main__":
+    unittest.main()
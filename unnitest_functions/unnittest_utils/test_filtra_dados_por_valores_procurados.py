@@ -49,6 +49,18 @@ class Test_Filtra_Dados_Por_Valores_Procurados(unittest.TestCase):
     
         self.assertIsNone(filtra_dados_por_valores_procurados(dados_teste, "COLUNA_INVÁLIDA", "CLOROQUINA"))
 
+    def test_valores_nulos(self):
+        """
+        verifica se os valores nulos são comparados como na comparação com isin e ==, em colunas categóricas
+        e de texto: None sozinho não encontra nenhuma linha.
+        """
+        for tipo in ["category", "object"]:
+            dados_teste = pd.DataFrame({"UF_VENDA": pd.Series(["SP", None, "RJ", None], dtype=tipo), "Qnt": [1, 2, 3, 4]})
+            self.assertEqual(len(filtra_dados_por_valores_procurados(dados_teste, "UF_VENDA", None)), 0)
+            self.assertEqual(filtra_dados_por_valores_procurados(dados_teste, "UF_VENDA", "SP")["Qnt"].tolist(), [1])
+            self.assertEqual(filtra_dados_por_valores_procurados(dados_teste, "UF_VENDA", ["RJ", None])["Qnt"].tolist(),
+                             dados_teste[dados_teste["UF_VENDA"].isin(["RJ", None])]["Qnt"].tolist())
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'iter_data_by_dates', que pertence
+ao módulo 'utils.py'. A função recebe duas datas da forma "AAAAmm" e percorre os dados entre
+estas duas datas em blocos de linhas, marcados com o ano e o mês de onde vieram.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import os
+import tempfile
+import pandas as pd
+from utils import iter_data_by_dates, concat_data_by_dates
+from cache_colunar import converte_para_parquet
+
+
+class Test_Iter_Data_By_Dates(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        for mes in [1, 2]:
+            dados = pd.DataFrame({"ANO_VENDA": [2014] * 5, "MES_VENDA": [mes] * 5,
+                                  "UF_VENDA": ["SP", "RJ", "SP", "MG", "SP"],
+                                  "PRINCIPIO_ATIVO": ["ZOLPIDEM", "CLOROQUINA", "TESTOSTERONA", "ZOLPIDEM", "ZOLPIDEM"]})
+            dados.to_csv(os.path.join(self.pasta.name, f"Manipulados_2014_0{mes}.csv"), sep=";", index=False)
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_blocos_marcados(self):
+        """
+        verifica se os blocos respeitam o tamanho pedido e são marcados com o ano e o mês, em ordem.
+        """
+        blocos = list(iter_data_by_dates("2014/01", "2014/02", path=self.pasta.name, chunksize=2))
+        self.assertEqual([(ano, mes, len(bloco)) for ano, mes, bloco in blocos],
+                         [("2014", "01", 2), ("2014", "01", 2), ("2014", "01", 1),
+                          ("2014", "02", 2), ("2014", "02", 2), ("2014", "02", 1)])
+
+    def test_mesmos_dados_que_a_concatenacao(self):
+        """
+        verifica se os blocos, juntos, têm as mesmas linhas que a concatenação com os mesmos filtros,
+        lendo do csv ou do cache colunar.
+        """
+        filtros = {"filtered_columns": ["UF_VENDA"], "where": {"PRINCIPIO_ATIVO": "ZOLPIDEM"}}
+        concatenado = concat_data_by_dates("2014/01", "2014/02", path=self.pasta.name, **filtros)
+        for _ in range(2):
+            blocos = [bloco for _, _, bloco in iter_data_by_dates("2014/01", "2014/02", path=self.pasta.name, chunksize=2, **filtros)]
+            self.assertEqual(list(pd.concat(blocos)["UF_VENDA"]), list(concatenado["UF_VENDA"]))
+            self.assertEqual(list(blocos[0].columns), ["UF_VENDA"])
+            converte_para_parquet("2014/01", "2014/02", self.pasta.name)
+
+    def test_mes_inexistente(self):
+        """
+        verifica se um mês que não existe é ignorado, e se nada é devolvido quando o primeiro mês não existe.
+        """
+        meses = {mes for _, mes, _ in iter_data_by_dates("2014/02", "2014/03", path=self.pasta.name)}
+        self.assertEqual(meses, {"02"})
+        self.assertEqual(list(iter_data_by_dates("2014/03", "2014/04", path=self.pasta.name)), [])
+
+    def test_tamanho_invalido(self):
+        """
+        verifica se nada é devolvido caso o tamanho dos blocos seja inválido.
+        """
+        self.assertEqual(list(iter_data_by_dates("2014/01", "2014/02", path=self.pasta.name, chunksize="2")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Esse módulo tem como objetivo verificar o funcionamento da função 'mascara_de_filtros', que pertence
+ao módulo 'utils.py'. A função recebe um dataframe e as condições de várias colunas (valores, listas,
+intervalos e nulos) e retorna, sem copiar o dataframe, a máscara das linhas que satisfazem todas elas.
+"""
+
+import sys, os
+
+esse_caminho = os.path.dirname(os.path.abspath(__file__))
+caminho_functions = os.path.join(esse_caminho, "..", "..", "functions")
+sys.path.append(caminho_functions)
+
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from utils import mascara_de_filtros, concat_data_by_dates
+from catalogo import atualiza_catalogo, mes_pode_satisfazer
+
+
+class Test_Mascara_De_Filtros(unittest.TestCase):
+    """
+    a classe vai conter os diferentes testes feitos para a função
+    """
+    def setUp(self):
+        self.dados = pd.DataFrame({"PRINCIPIO_ATIVO": pd.Categorical(["CLOROQUINA", "ZOLPIDEM", "CLOROQUINA", None, "ZOLPIDEM"]),
+                                   "UF_VENDA": ["SP", "RJ", "MG", "SP", "SP"],
+                                   "IDADE": pd.array([70, 30, None, 65, 18], dtype="Int16")})
+
+    def test_condicoes(self):
+        """
+        verifica cada tipo de condição separadamente.
+        """
+        self.assertEqual(mascara_de_filtros(self.dados, {"UF_VENDA": "SP"}).tolist(), [True, False, False, True, True])
+        self.assertEqual(mascara_de_filtros(self.dados, {"UF_VENDA": ["RJ", "MG"]}).tolist(), [False, True, True, False, False])
+        self.assertEqual(mascara_de_filtros(self.dados, {"IDADE": (18, 30)}).tolist(), [False, True, False, False, True])
+        self.assertEqual(mascara_de_filtros(self.dados, {"IDADE": (None, 65)}).tolist(), [False, True, False, True, True])
+        self.assertEqual(mascara_de_filtros(self.dados, {"IDADE": None}).tolist(), [False, False, True, False, False])
+
+    def test_colunas_categoricas(self):
+        """
+        verifica as condições nas colunas categóricas, incluindo os nulos e valores que não são categorias.
+        """
+        self.assertEqual(mascara_de_filtros(self.dados, {"PRINCIPIO_ATIVO": ["ZOLPIDEM", None]}).tolist(), [False, True, False, True, True])
+        self.assertEqual(mascara_de_filtros(self.dados, {"PRINCIPIO_ATIVO": "IBUPROFENO"}).tolist(), [False] * 5)
+        self.assertEqual(mascara_de_filtros(self.dados, {"PRINCIPIO_ATIVO": ("D", None)}).tolist(), [False, True, False, False, True])
+
+    def test_varias_colunas(self):
+        """
+        verifica se as condições de várias colunas são combinadas e se o dataframe não é alterado.
+        """
+        mascara = mascara_de_filtros(self.dados, {"PRINCIPIO_ATIVO": "CLOROQUINA", "UF_VENDA": "SP", "IDADE": (60, None)})
+        self.assertEqual(type(mascara), np.ndarray)
+        self.assertEqual(np.flatnonzero(mascara).tolist(), [0])
+        self.assertEqual(len(self.dados), 5)
+
+    def test_filtro_invalido(self):
+        """
+        verifica se a função retorna None caso o dataframe, as colunas ou as condições sejam inválidos.
+        """
+        self.assertIsNone(mascara_de_filtros(42, {"IDADE": 30}))
+        self.assertIsNone(mascara_de_filtros(self.dados, {"COLUNA_INVÁLIDA": 30}))
+        self.assertIsNone(mascara_de_filtros(self.dados, ["IDADE"]))
+        self.assertIsNone(mascara_de_filtros(self.dados, {"UF_VENDA": (1, 2)}))
+
+    def test_leitura_filtrada(self):
+        """
+        verifica os intervalos e os nulos na leitura filtrada dos meses e na poda pelo catálogo.
+        """
+        with tempfile.TemporaryDirectory() as pasta:
+            self.dados.assign(ANO_VENDA=2014, MES_VENDA=1).to_csv(os.path.join(pasta, "Manipulados_2014_01.csv"), sep=";", index=False)
+            atualiza_catalogo("2014/01", "2014/01", pasta)
+            self.assertFalse(mes_pode_satisfazer("2014", "01", {"IDADE": (80, None)}, pasta))
+            self.assertTrue(mes_pode_satisfazer("2014", "01", {"PRINCIPIO_ATIVO": None}, pasta))
+
+            dados = concat_data_by_dates("2014/01", "2014/01", pasta, where={"IDADE": (60, None), "UF_VENDA": "SP"})
+            self.assertEqual(list(dados.index), [0, 3])
+            dados = concat_data_by_dates("2014/01", "2014/01", pasta, where={"PRINCIPIO_ATIVO": None})
+            self.assertEqual(list(dados.index), [3])
+
+
+if __name__ == "__main__":
+    unittest.main()